@@ -1,9 +1,26 @@
 import os
-from openai import OpenAI
-from typing import Dict, List, Any
+import time
+from typing import Dict, List, Any, Optional
 import json
+from metrics import LLM_REQUESTS, LLM_REQUEST_DURATION, LLM_TOKENS
+from trend_tracker import PlayerTrendTracker
+from tracing import span, traced
+from rules import evaluate_player, evaluate_roster, evaluate_team
+from valorant_economy import LOSS_REWARDS, EconomyTracker, save_outlook
+from valorant_kills import with_kill_stats
+from valorant_review import ValorantReviewAccumulator
+
+_client = None
+
+
+def get_openai_client():
+    """OpenAI client, built on the first LLM call so startup never pays for importing openai"""
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY", ""))
+    return _client
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY", ""))
 
 class AIAnalyzer:
     """AI-powered analysis engine for esports coaching insights"""
@@ -11,227 +28,135 @@ class AIAnalyzer:
     def __init__(self):
         self.has_openai = bool(os.getenv("OPENAI_API_KEY"))
     
-    def analyze_player_performance(self, player_name: str, stats: List[Dict]) -> Dict[str, Any]:
-        """Analyze individual player performance trends and patterns"""
+    @traced("analyzer.player_performance")
+    def analyze_player_performance(self, player_name: str, stats: List[Dict],
+                                   trends: Optional[PlayerTrendTracker] = None) -> Dict[str, Any]:
+        """
+        Analyze individual player performance trends and patterns
+
+        Args:
+            player_name: Name of the player to analyze
+            stats: Player game rows, oldest first
+            trends: Incrementally maintained tracker for this player. When omitted,
+                one is built from the last 10 games of `stats`.
+        """
         if not stats:
             return {"error": "No stats provided"}
-        
-        # Calculate trends
-        recent_stats = stats[-5:] if len(stats) >= 5 else stats
-        avg_kda = sum(s.get("kda", 0) for s in recent_stats) / len(recent_stats)
-        avg_cs = sum(s.get("cs_per_min", 0) for s in recent_stats) / len(recent_stats)
-        avg_vision = sum(s.get("vision_score", 0) for s in recent_stats) / len(recent_stats)
-        
+
         # Identify patterns
-        kda_trend = self._calculate_trend([s.get("kda", 0) for s in stats[-10:]])
-        performance_trend = self._calculate_trend([s.get("performance_score", 50) for s in stats[-10:]])
+        if trends is None:
+            trends = PlayerTrendTracker.from_history(stats[-10:])
         
-        # **NEW: Identify recurring mistakes**
-        recurring_mistakes = self._identify_recurring_mistakes(stats)
+        # One sweep over the history evaluates every insight and recurring-mistake rule
+        evaluation = evaluate_player(stats, trends.trend("kda"))
+        return self._player_analysis(player_name, trends, evaluation)
+    
+    @traced("analyzer.team_macro")
+    def analyze_team_macro(self, team_stats: List[Dict], player_stats: List[Dict]) -> Dict[str, Any]:
+        """Analyze team-level macro strategy and connect to player performance"""
+        if not team_stats:
+            return {"error": "No team stats provided"}
         
+        # Strategic insights and micro-to-macro connections come from the team rule table
+        evaluation = evaluate_team(team_stats, player_stats or [])
+        return self._team_analysis(team_stats, bool(player_stats), evaluation)
+    
+    @traced("analyzer.roster")
+    def analyze_roster(self, player_stats: Dict[str, List[Dict]], team_stats: List[Dict],
+                       trends: Optional[Dict[str, PlayerTrendTracker]] = None) -> Dict[str, Any]:
+        """
+        Every player's analysis plus the team macro analysis from one shared pass
+
+        Args:
+            player_stats: Game rows per player, oldest first
+            team_stats: Team rows, oldest first
+            trends: Incrementally maintained trackers by player name; players
+                without one get a tracker built from their last 10 games.
+
+        Returns {"players": {name: analysis}, "team_macro": analysis or None};
+        each entry is the same shape as analyze_player_performance /
+        analyze_team_macro return for the same data, but rule-based only: the
+        LLM commentary is added per request (add_ai_commentary,
+        add_ai_strategic_review) rather than for every player in the roster.
+        """
+        trends = trends or {}
+        trackers = {
+            name: trends.get(name) or PlayerTrendTracker.from_history(stats[-10:])
+            for name, stats in player_stats.items() if stats
+        }
+        evaluation = evaluate_roster(
+            player_stats, team_stats, {name: tracker.trend("kda") for name, tracker in trackers.items()}
+        )
+        players = {
+            name: self._player_analysis(name, trackers[name], player_evaluation, ai=False)
+            for name, player_evaluation in evaluation["players"].items()
+        }
+        team_macro = None
+        if evaluation["team"] is not None:
+            team_macro = self._team_analysis(team_stats, bool(players), evaluation["team"], ai=False)
+        return {"players": players, "team_macro": team_macro}
+    
+    def _player_analysis(self, player_name: str, trends: PlayerTrendTracker, evaluation: Dict[str, Any],
+                         ai: bool = True) -> Dict[str, Any]:
+        values = evaluation["values"]
         analysis = {
             "player_name": player_name,
             "recent_averages": {
-                "kda": round(avg_kda, 2),
-                "cs_per_min": round(avg_cs, 1),
-                "vision_score": round(avg_vision, 1)
+                "kda": round(values["avg_kda"], 2),
+                "cs_per_min": round(values["avg_cs"], 1),
+                "vision_score": round(values["avg_vision"], 1)
             },
             "trends": {
-                "kda_trend": kda_trend,
-                "performance_trend": performance_trend
+                "kda_trend": values["kda_trend"],
+                "performance_trend": trends.trend("performance_score"),
+                "details": trends.snapshot()
             },
-            "insights": [],
-            "recurring_mistakes": recurring_mistakes  # NEW
+            "insights": evaluation["insights"],
+            "recurring_mistakes": evaluation["recurring_mistakes"]
         }
         
-        # Generate insights
-        if avg_kda < 2.5:
-            analysis["insights"].append({
-                "type": "concern",
-                "category": "Combat",
-                "message": f"KDA below optimal threshold. Current: {avg_kda:.2f}",
-                "recommendation": "Focus on positioning in team fights and reducing unnecessary deaths"
-            })
-        
-        if avg_vision < 30 and any(s.get("role") in ["Jungle", "Support"] for s in stats):
-            analysis["insights"].append({
-                "type": "concern",
-                "category": "Vision Control",
-                "message": f"Vision score needs improvement. Current: {avg_vision:.1f}",
-                "recommendation": "Increase ward placement frequency, especially before objectives"
-            })
-        
-        if kda_trend == "declining":
-            analysis["insights"].append({
-                "type": "warning",
-                "category": "Performance Trend",
-                "message": "KDA showing declining trend over last 10 games",
-                "recommendation": "Review recent VODs for recurring mistakes in decision-making"
-            })
-        elif kda_trend == "improving":
-            analysis["insights"].append({
-                "type": "positive",
-                "category": "Performance Trend",
-                "message": "KDA showing improvement trend - keep up the momentum",
-                "recommendation": "Continue current practice regimen"
-            })
-        
-        # AI-enhanced analysis if available
+        if ai:
+            self.add_ai_commentary(player_name, analysis)
+        return analysis
+    
+    def add_ai_commentary(self, player_name: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """AI-enhanced player analysis if available: adds ai_commentary to a rule-based analysis"""
         if self.has_openai:
             try:
                 ai_insight = self._generate_ai_insight(player_name, analysis)
                 analysis["ai_commentary"] = ai_insight
             except:
                 pass
-        
         return analysis
     
-    def analyze_team_macro(self, team_stats: List[Dict], player_stats: List[Dict]) -> Dict[str, Any]:
-        """Analyze team-level macro strategy and connect to player performance"""
-        if not team_stats:
-            return {"error": "No team stats provided"}
-        
+    def _team_analysis(self, team_stats: List[Dict], has_player_stats: bool, evaluation: Dict[str, Any],
+                       ai: bool = True) -> Dict[str, Any]:
         recent_matches = team_stats[-10:] if len(team_stats) >= 10 else team_stats
-        
-        # Calculate macro metrics
-        win_rate = sum(1 for m in recent_matches if m.get("win", False)) / len(recent_matches)
-        avg_dragons = sum(m.get("dragons_secured", 0) for m in recent_matches) / len(recent_matches)
-        avg_barons = sum(m.get("barons_secured", 0) for m in recent_matches) / len(recent_matches)
-        first_blood_rate = sum(1 for m in recent_matches if m.get("first_blood", False)) / len(recent_matches)
+        values = evaluation["values"]
         
         analysis = {
-            "win_rate": round(win_rate * 100, 1),
+            "win_rate": round(values["win_rate"] * 100, 1),
             "objective_control": {
-                "avg_dragons": round(avg_dragons, 1),
-                "avg_barons": round(avg_barons, 2),
-                "first_blood_rate": round(first_blood_rate * 100, 1)
+                "avg_dragons": round(values["avg_dragons"], 1),
+                "avg_barons": round(values["avg_barons"], 2),
+                "first_blood_rate": round(values["first_blood_rate"] * 100, 1)
             },
-            "strategic_insights": [],
-            "player_macro_connections": []
+            "strategic_insights": evaluation["strategic_insights"],
+            "player_macro_connections": evaluation["player_macro_connections"] if has_player_stats else []
         }
         
-        # Strategic insights
-        if win_rate < 0.45:
-            analysis["strategic_insights"].append({
-                "type": "critical",
-                "category": "Win Rate",
-                "message": f"Win rate at {win_rate*100:.1f}% - below competitive threshold",
-                "recommendation": "Schedule strategic review session. Focus on draft phase and early game plans"
-            })
-        
-        if avg_dragons < 2.0:
-            analysis["strategic_insights"].append({
-                "type": "concern",
-                "category": "Objective Priority",
-                "message": "Dragon control below optimal level",
-                "recommendation": "Improve bot lane priority and jungle pathing around dragon spawn timers"
-            })
-        
-        if first_blood_rate < 0.35:
-            analysis["strategic_insights"].append({
-                "type": "warning",
-                "category": "Early Game",
-                "message": "Low first blood rate indicates passive early game",
-                "recommendation": "Work on level 2-3 power spikes and aggressive lane trading"
-            })
-        
-        # Connect player performance to macro
-        if player_stats:
-            # ENHANCED: Deep micro-to-macro connections - KEY HACKATHON REQUIREMENT
-            
-            # Analyze jungle impact on objectives
-            jungler_stats = [s for s in player_stats if s.get("role") == "Jungle"]
-            if jungler_stats:
-                avg_jungle_vision = sum(s.get("vision_score", 0) for s in jungler_stats[-5:]) / min(5, len(jungler_stats))
-                avg_jungle_kda = sum(s.get("kda", 0) for s in jungler_stats[-5:]) / min(5, len(jungler_stats))
-                
-                if avg_jungle_vision < 35 and avg_dragons < 2.0:
-                    analysis["player_macro_connections"].append({
-                        "player_role": "Jungle",
-                        "issue": "Low vision control correlating with poor dragon control",
-                        "micro_pattern": f"Jungler averaging {avg_jungle_vision:.1f} vision score",
-                        "macro_impact": "Limited vision around objectives leading to lost neutral objectives and ambushes",
-                        "recommendation": "Jungler should prioritize deep wards 1 minute before dragon spawns. Ward enemy jungle entrance and river bushes.",
-                        "severity": "critical"
-                    })
-                
-                if avg_jungle_kda < 2.0:
-                    analysis["player_macro_connections"].append({
-                        "player_role": "Jungle",
-                        "issue": "Jungler dying frequently in enemy jungle",
-                        "micro_pattern": f"Jungler KDA {avg_jungle_kda:.2f} - likely invading without vision",
-                        "macro_impact": "Jungle deaths lead to lost map pressure, stolen camps, and objective disadvantage",
-                        "recommendation": "Avoid blind invades. Track enemy jungler position. Request lane priority before invading.",
-                        "severity": "high"
-                    })
-            
-            # Analyze ADC/Support synergy impact on bot lane pressure
-            adc_stats = [s for s in player_stats if s.get("role") == "ADC"]
-            support_stats = [s for s in player_stats if s.get("role") == "Support"]
-            
-            if adc_stats and support_stats:
-                avg_adc_deaths = sum(s.get("deaths", 0) for s in adc_stats[-5:]) / min(5, len(adc_stats))
-                avg_support_vision = sum(s.get("vision_score", 0) for s in support_stats[-5:]) / min(5, len(support_stats))
-                
-                if avg_adc_deaths >= 4 and avg_support_vision < 60:
-                    analysis["player_macro_connections"].append({
-                        "player_role": "Bot Lane",
-                        "issue": "ADC high deaths + Support low vision = lost bot priority",
-                        "micro_pattern": f"ADC dying {avg_adc_deaths:.1f}x/game, Support {avg_support_vision:.0f} vision",
-                        "macro_impact": "Lost bot priority prevents dragon control and loses map pressure for entire team",
-                        "recommendation": "Support: Ward deeper. ADC: Play safer, respect enemy jungle proximity. Coordinate backs together.",
-                        "severity": "critical"
-                    })
-            
-            # Analyze mid lane roaming impact
-            mid_stats = [s for s in player_stats if s.get("role") == "Mid"]
-            if mid_stats:
-                avg_mid_assists = sum(s.get("assists", 0) for s in mid_stats[-5:]) / min(5, len(mid_stats))
-                avg_mid_cs = sum(s.get("cs_per_min", 0) for s in mid_stats[-5:]) / min(5, len(mid_stats))
-                
-                if avg_mid_assists < 4 and first_blood_rate < 0.35:
-                    analysis["player_macro_connections"].append({
-                        "player_role": "Mid",
-                        "issue": "Low roam presence affecting early game across map",
-                        "micro_pattern": f"Mid averaging {avg_mid_assists:.1f} assists - minimal roaming",
-                        "macro_impact": "Mid staying in lane allows enemy mid to roam freely and snowball sidelanes",
-                        "recommendation": "Coordinate roams with jungler. Push wave then roam on cannon waves. Use TP for bot lane plays.",
-                        "severity": "medium"
-                    })
-                
-                if avg_mid_cs < 6.5 and avg_mid_assists > 7:
-                    analysis["player_macro_connections"].append({
-                        "player_role": "Mid",
-                        "issue": "Over-roaming sacrificing personal farm and levels",
-                        "micro_pattern": f"Mid low CS ({avg_mid_cs:.1f}/min) but high assists ({avg_mid_assists:.1f})",
-                        "macro_impact": "Mid falls behind in gold/XP, reducing team fight impact and creating scaling disadvantage",
-                        "recommendation": "Balance roaming with farm. Only roam with high-success plays. Fast-push waves before leaving lane.",
-                        "severity": "medium"
-                    })
-            
-            # Analyze top lane TP usage and split push pressure
-            top_stats = [s for s in player_stats if s.get("role") == "Top"]
-            if top_stats and win_rate < 0.45:
-                avg_top_kda = sum(s.get("kda", 0) for s in top_stats[-5:]) / min(5, len(top_stats))
-                
-                if avg_top_kda > 3.0 and win_rate < 0.45:
-                    analysis["player_macro_connections"].append({
-                        "player_role": "Top",
-                        "issue": "Top performing well individually but team still losing",
-                        "micro_pattern": f"Top has good KDA ({avg_top_kda:.2f}) despite team struggles",
-                        "macro_impact": "Top lane winning but not translating to map pressure - possible TP timing issues or poor split push decisions",
-                        "recommendation": "Use TP for bot lane/dragon fights. Apply split push pressure when team is safe. Join team for baron setups.",
-                        "severity": "medium"
-                    })
-        
-        # AI-enhanced macro analysis
+        if ai:
+            self.add_ai_strategic_review(analysis, recent_matches)
+        return analysis
+    
+    def add_ai_strategic_review(self, analysis: Dict[str, Any], recent_matches: List[Dict]) -> Dict[str, Any]:
+        """AI-enhanced macro analysis if available: adds ai_strategic_review to a rule-based analysis"""
         if self.has_openai:
             try:
                 ai_macro = self._generate_macro_ai_insight(analysis, recent_matches)
                 analysis["ai_strategic_review"] = ai_macro
             except:
                 pass
-        
         return analysis
     
     def generate_match_insights(self, match_data: Dict) -> Dict[str, Any]:
@@ -285,100 +210,41 @@ class AIAnalyzer:
         
         return insights
     
+    @traced("analyzer.recurring_mistakes")
     def _identify_recurring_mistakes(self, stats: List[Dict]) -> List[Dict[str, Any]]:
         """Identify patterns of recurring mistakes across multiple games - KEY HACKATHON REQUIREMENT"""
-        if len(stats) < 3:
-            return []
-        
-        mistakes = []
-        recent_games = stats[-10:] if len(stats) >= 10 else stats
-        
-        # Pattern 1: Consistently high death count (dying early/often)
-        high_death_games = sum(1 for s in recent_games if s.get("deaths", 0) >= 5)
-        if high_death_games >= len(recent_games) * 0.6:  # 60% of games
-            mistakes.append({
-                "pattern": "High Death Count",
-                "frequency": f"{high_death_games}/{len(recent_games)} games",
-                "severity": "critical",
-                "description": "Player consistently dies 5+ times per game",
-                "impact": "High death count leads to gold deficit, lost map pressure, and missed objectives",
-                "recommendation": "Review positioning in team fights. Avoid face-checking bushes. Ward deeper before objectives."
-            })
-        
-        # Pattern 2: Low CS/min consistently
-        role = recent_games[0].get("role", "") if recent_games else ""
-        if role in ["ADC", "Mid", "Top"]:
-            low_cs_games = sum(1 for s in recent_games if s.get("cs_per_min", 0) < 6.5)
-            if low_cs_games >= len(recent_games) * 0.5:
-                mistakes.append({
-                    "pattern": "Poor CS Management",
-                    "frequency": f"{low_cs_games}/{len(recent_games)} games",
-                    "severity": "high",
-                    "description": f"{role} player consistently below 6.5 CS/min",
-                    "impact": "Low CS leads to gold deficit, delayed item spikes, reduced team fight impact",
-                    "recommendation": "Practice last-hitting in practice tool. Focus on wave management. Don't roam at cost of waves."
-                })
-        
-        # Pattern 3: Low vision score (for jungle/support)
-        if role in ["Jungle", "Support"]:
-            low_vision_games = sum(1 for s in recent_games if s.get("vision_score", 0) < 40)
-            if low_vision_games >= len(recent_games) * 0.6:
-                mistakes.append({
-                    "pattern": "Insufficient Vision Control",
-                    "frequency": f"{low_vision_games}/{len(recent_games)} games",
-                    "severity": "high",
-                    "description": f"{role} consistently below 40 vision score",
-                    "impact": "Poor vision control leads to ganks, lost objectives, and unsafe rotations",
-                    "recommendation": "Ward before every objective. Sweep enemy vision. Buy more control wards (aim for 2+ per back)."
-                })
-        
-        # Pattern 4: Low damage output
-        low_damage_games = sum(1 for s in recent_games if s.get("damage_dealt", 10000) < 12000)
-        if low_damage_games >= len(recent_games) * 0.5 and role in ["ADC", "Mid"]:
-            mistakes.append({
-                "pattern": "Low Damage Output",
-                "frequency": f"{low_damage_games}/{len(recent_games)} games",
-                "severity": "medium",
-                "description": "Carry role with consistently low damage to champions",
-                "impact": "Low damage means team can't secure kills or win team fights effectively",
-                "recommendation": "Position more aggressively in fights. Focus on damage uptime. Review target selection."
-            })
-        
-        # Pattern 5: KDA decline over time
-        if len(stats) >= 10:
-            first_half_kda = sum(s.get("kda", 0) for s in stats[:5]) / 5
-            second_half_kda = sum(s.get("kda", 0) for s in stats[-5:]) / 5
-            if second_half_kda < first_half_kda * 0.7:  # 30% decline
-                mistakes.append({
-                    "pattern": "Performance Decline",
-                    "frequency": "Recent trend",
-                    "severity": "critical",
-                    "description": f"KDA dropped from {first_half_kda:.2f} to {second_half_kda:.2f}",
-                    "impact": "Declining performance suggests burnout, meta adjustment issues, or mechanical decline",
-                    "recommendation": "Take a break. Review recent patch changes. Watch VODs to identify new bad habits."
-                })
-        
-        return mistakes
+        return evaluate_player(stats)["recurring_mistakes"]
     
-    def _calculate_trend(self, values: List[float]) -> str:
-        """Calculate if values are improving, declining, or stable"""
-        if len(values) < 3:
-            return "insufficient_data"
-        
-        first_half = values[:len(values)//2]
-        second_half = values[len(values)//2:]
-        
-        avg_first = sum(first_half) / len(first_half)
-        avg_second = sum(second_half) / len(second_half)
-        
-        diff_percent = ((avg_second - avg_first) / avg_first) * 100 if avg_first > 0 else 0
-        
-        if diff_percent > 10:
-            return "improving"
-        elif diff_percent < -10:
-            return "declining"
-        else:
-            return "stable"
+    def _chat_completion(self, helper: str, system_prompt: str, prompt: str, max_tokens: int = 150) -> str:
+        """Run one LLM completion, recording latency, outcome and token usage per helper"""
+        started = time.perf_counter()
+        with span("llm.completion", helper=helper, model="gpt-4o-mini") as llm_span:
+            try:
+                response = get_openai_client().chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=0.7
+                )
+            except Exception:
+                LLM_REQUESTS.inc(helper=helper, status="error")
+                raise
+            finally:
+                LLM_REQUEST_DURATION.observe(time.perf_counter() - started, helper=helper)
+            
+            LLM_REQUESTS.inc(helper=helper, status="ok")
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+                completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+                LLM_TOKENS.inc(prompt_tokens, helper=helper, kind="prompt")
+                LLM_TOKENS.inc(completion_tokens, helper=helper, kind="completion")
+                llm_span.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        
+        return response.choices[0].message.content.strip()
     
     def _generate_ai_insight(self, player_name: str, analysis: Dict) -> str:
         """Generate AI-powered commentary using OpenAI"""
@@ -393,17 +259,12 @@ Trends: KDA {analysis['trends']['kda_trend']}, Performance {analysis['trends']['
 
 Provide one paragraph of actionable coaching advice (2-3 sentences)."""
             
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a professional esports coach providing data-driven insights."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=0.7
+            return self._chat_completion(
+                "_generate_ai_insight",
+                "You are a professional esports coach providing data-driven insights.",
+                prompt,
+                max_tokens=150
             )
-            
-            return response.choices[0].message.content.strip()
         except Exception as e:
             return f"AI analysis temporarily unavailable: {str(e)}"
     
@@ -422,21 +283,18 @@ First Blood Rate: {analysis['objective_control']['first_blood_rate']}%
 
 Provide strategic coaching recommendations (one paragraph, 3-4 sentences)."""
             
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a professional esports team strategist analyzing macro play patterns."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200,
-                temperature=0.7
+            return self._chat_completion(
+                "_generate_macro_ai_insight",
+                "You are a professional esports team strategist analyzing macro play patterns.",
+                prompt,
+                max_tokens=200
             )
-            
-            return response.choices[0].message.content.strip()
         except Exception as e:
             return f"AI strategic analysis temporarily unavailable: {str(e)}"
     
-    def generate_personalized_insights(self, player_name: str, match_data: Dict[str, Any], game: str = "lol") -> Dict[str, Any]:
+    @traced("analyzer.personalized_insights")
+    def generate_personalized_insights(self, player_name: str, match_data: Dict[str, Any], game: str = "lol",
+                                       ai: bool = True) -> Dict[str, Any]:
         """
         Main Prompt 1: Generate personalized, data-backed insights for a player
         Analyzes match data to provide direct feedback with supporting data
@@ -445,6 +303,7 @@ Provide strategic coaching recommendations (one paragraph, 3-4 sentences)."""
             player_name: Name of the player to analyze
             match_data: Complete match data including rounds/events
             game: "lol" for League of Legends or "valorant" for VALORANT
+            ai: Add the LLM commentary (add_ai_commentary_to_insights) when available
         """
         insights = {
             "player_name": player_name,
@@ -461,6 +320,20 @@ Provide strategic coaching recommendations (one paragraph, 3-4 sentences)."""
             # League of Legends analysis
             insights = self._analyze_lol_player(player_name, match_data)
         
+        if ai:
+            self.add_ai_commentary_to_insights(player_name, insights, game)
+        return insights
+    
+    def add_ai_commentary_to_insights(self, player_name: str, insights: Dict[str, Any], game: str = "lol") -> Dict[str, Any]:
+        """AI-enhanced insight if available: adds ai_commentary to rule-based personalized insights"""
+        if self.has_openai and "error" not in insights:
+            try:
+                if game == "valorant":
+                    insights["ai_commentary"] = self._generate_valorant_ai_insight(player_name, insights)
+                else:
+                    insights["ai_commentary"] = self._generate_lol_ai_insight(player_name, insights)
+            except:
+                pass
         return insights
     
     def _analyze_valorant_player(self, player_name: str, match_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -478,6 +351,8 @@ Provide strategic coaching recommendations (one paragraph, 3-4 sentences)."""
         team_name = None
         
         for round_data in match_data.get("rounds", []):
+            # Rounds with kill events get KAST, first deaths and opening duels derived from them
+            round_data = with_kill_stats(round_data)
             for team in ["attackers", "defenders"]:
                 for player in round_data.get(team, []):
                     if player.get("name", "").lower() == player_name.lower():
@@ -487,7 +362,8 @@ Provide strategic coaching recommendations (one paragraph, 3-4 sentences)."""
                             "has_kast": player.get("kast", True),
                             "deaths": player.get("deaths", 0),
                             "kills": player.get("kills", 0),
-                            "first_death": player.get("first_death", False)
+                            "first_death": player.get("first_death", False),
+                            "opening_duel": player.get("opening_duel")
                         })
                         team_name = round_data.get(f"{team}_team_name")
         
@@ -546,18 +422,20 @@ Provide strategic coaching recommendations (one paragraph, 3-4 sentences)."""
                     "action": "Avoid predictable angles. Use utility before peeking. Request teammate support for opening duels."
                 })
         
+        # Opening duels won and lost (only known from kill events)
+        opening_duels = [r["opening_duel"] for r in player_rounds if r.get("opening_duel")]
+        if opening_duels:
+            opening_wins = opening_duels.count("won")
+            insights["data_points"].append({
+                "metric": "Opening Duels",
+                "value": f"{opening_wins}/{len(opening_duels)} won ({opening_wins / len(opening_duels) * 100:.0f}%)",
+                "context": f"{player_name} fought the opening duel in {len(opening_duels)}/{total_rounds} rounds"
+            })
+        
         # Data Point 3: Kill participation rate
         total_team_kills = sum(r.get("kills", 0) for r in player_rounds)
         player_total_kills = sum(r.get("kills", 0) for r in player_rounds)
         
-        # AI-enhanced insight if available
-        if self.has_openai:
-            try:
-                ai_insight = self._generate_valorant_ai_insight(player_name, insights)
-                insights["ai_commentary"] = ai_insight
-            except:
-                pass
-        
         return insights
     
     def _analyze_lol_player(self, player_name: str, match_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -644,17 +522,11 @@ Provide strategic coaching recommendations (one paragraph, 3-4 sentences)."""
                     "action": "Review fight positioning. Focus on staying alive while dealing consistent damage."
                 })
         
-        # AI-enhanced insight if available
-        if self.has_openai:
-            try:
-                ai_insight = self._generate_lol_ai_insight(player_name, insights)
-                insights["ai_commentary"] = ai_insight
-            except:
-                pass
-        
         return insights
     
-    def generate_macro_review_agenda(self, match_data: Dict[str, Any], game: str = "lol") -> Dict[str, Any]:
+    @traced("analyzer.macro_review")
+    def generate_macro_review_agenda(self, match_data: Dict[str, Any], game: str = "lol",
+                                     ai: bool = True) -> Dict[str, Any]:
         """
         Main Prompt 2: Generate an automated Game Review Agenda
         Takes concluded match data and highlights critical decision points and errors
@@ -662,99 +534,45 @@ Provide strategic coaching recommendations (one paragraph, 3-4 sentences)."""
         Args:
             match_data: Complete match data with events/rounds
             game: "lol" for League of Legends or "valorant" for VALORANT
+            ai: Add the LLM summary (add_ai_summary) when available
         """
         if game == "valorant":
-            return self._generate_valorant_review(match_data)
+            review = self._generate_valorant_review(match_data)
         else:
-            return self._generate_lol_review(match_data)
+            review = self._generate_lol_review(match_data)
+        
+        if ai:
+            self.add_ai_summary(review, game)
+        return review
+    
+    def add_ai_summary(self, review: Dict[str, Any], game: str = "lol") -> Dict[str, Any]:
+        """AI-enhanced review if available: adds ai_summary to a rule-based review agenda"""
+        if self.has_openai and "error" not in review:
+            try:
+                ai_review = self._generate_ai_macro_review(review, game)
+                review["ai_summary"] = ai_review
+            except:
+                pass
+        return review
     
     def _generate_valorant_review(self, match_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate VALORANT game review agenda"""
-        review = {
+        # Same accumulator live ingestion updates round by round (see valorant_review.py)
+        return ValorantReviewAccumulator.from_match(match_data).review()
+    
+    @traced("analyzer.valorant_economy")
+    def analyze_valorant_economy(self, match_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reconstruct both teams' credits round by round and flag rounds where a
+        different buy would have raised the expected win rate
+        """
+        report = EconomyTracker.replay(match_data.get("rounds", [])).report()
+        return {
             "match_id": match_data.get("match_id", "unknown"),
-            "match_type": match_data.get("match_type", "BO1"),
             "opponent": match_data.get("opponent", "Unknown"),
             "map": match_data.get("map", "Unknown"),
-            "final_score": match_data.get("final_score", "0-0"),
-            "agenda_items": []
+            **report
         }
-        
-        rounds = match_data.get("rounds", [])
-        
-        # 1. Pistol Round Performance
-        pistol_rounds = [r for r in rounds if r.get("round_num", 0) in [1, 13]]
-        pistol_wins = sum(1 for r in pistol_rounds if r.get("team_won", False))
-        
-        review["agenda_items"].append({
-            "category": "Pistol Rounds",
-            "status": "won_both" if pistol_wins == 2 else "lost_both" if pistol_wins == 0 else "split",
-            "detail": f"Won {pistol_wins}/2 pistol rounds",
-            "notes": "Review pistol round setups and compositions" if pistol_wins < 2 else "Strong pistol performance"
-        })
-        
-        # 2. Eco Management
-        force_buys = [r for r in rounds if r.get("buy_type") == "force" and r.get("round_num", 0) == 2]
-        if force_buys:
-            force_success = sum(1 for r in force_buys if r.get("team_won", False))
-            if force_success == 0:
-                review["agenda_items"].append({
-                    "category": "Eco Management",
-                    "status": "concern",
-                    "detail": "Unsuccessful force-buy on Round 2 led to bonus round loss (Round 3)",
-                    "notes": "Review force-buy vs. save criteria. Consider full save after lost pistol."
-                })
-        
-        # 3. Mid-Round Execution
-        late_pushes = [r for r in rounds if r.get("time_remaining", 30) < 20 and not r.get("team_won", False)]
-        if len(late_pushes) >= 4:
-            review["agenda_items"].append({
-                "category": "Mid-Round Calls",
-                "status": "critical",
-                "detail": f"{len(late_pushes)}/25 rounds saw late execute (<20s) resulting in losses",
-                "notes": "Improve decision-making speed. Earlier site commitment or gather intel sooner."
-            })
-        
-        # 4. Ultimate Economy
-        orbs_collected = match_data.get("team_orbs_collected", 0)
-        enemy_orbs = match_data.get("enemy_orbs_collected", 0)
-        
-        if orbs_collected < enemy_orbs * 0.7:
-            review["agenda_items"].append({
-                "category": "Ultimate Economy",
-                "status": "concern",
-                "detail": f"Only {orbs_collected} orbs collected vs {enemy_orbs} by enemy",
-                "notes": "Prioritize orb collection. Rotate for orbs during slow rounds. Ultimate advantage is crucial."
-            })
-        
-        # 5. Site Success Rates
-        site_attacks = {}
-        for round_data in rounds:
-            site = round_data.get("target_site", "Unknown")
-            won = round_data.get("team_won", False)
-            if site not in site_attacks:
-                site_attacks[site] = {"attempts": 0, "wins": 0}
-            site_attacks[site]["attempts"] += 1
-            site_attacks[site]["wins"] += 1 if won else 0
-        
-        for site, data in site_attacks.items():
-            success_rate = (data["wins"] / data["attempts"] * 100) if data["attempts"] > 0 else 0
-            if success_rate < 30 and data["attempts"] >= 3:
-                review["agenda_items"].append({
-                    "category": f"Site Control - {site}",
-                    "status": "concern",
-                    "detail": f"Low success rate on {site} site ({success_rate:.0f}% - {data['wins']}/{data['attempts']})",
-                    "notes": f"Review {site} site execution. Consider alternative strategies or improved utility usage."
-                })
-        
-        # AI-enhanced review if available
-        if self.has_openai:
-            try:
-                ai_review = self._generate_ai_macro_review(review, "valorant")
-                review["ai_summary"] = ai_review
-            except:
-                pass
-        
-        return review
     
     def _generate_lol_review(self, match_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate League of Legends game review agenda"""
@@ -832,16 +650,9 @@ Provide strategic coaching recommendations (one paragraph, 3-4 sentences)."""
                 "notes": "Increase ward placement frequency. Support and Jungle need 50+ vision score."
             })
         
-        # AI-enhanced review if available
-        if self.has_openai:
-            try:
-                ai_review = self._generate_ai_macro_review(review, "lol")
-                review["ai_summary"] = ai_review
-            except:
-                pass
-        
         return review
     
+    @traced("analyzer.predict_scenario")
     def predict_hypothetical_outcome(self, scenario: Dict[str, Any], game: str = "lol") -> Dict[str, Any]:
         """
         Main Prompt 3: Predict outcomes of hypothetical 'what if' scenarios
@@ -884,7 +695,10 @@ Provide strategic coaching recommendations (one paragraph, 3-4 sentences)."""
             
             # Calculate probabilities based on historical data
             retake_success_rate = 0.15  # 3v5 retakes rarely succeed
-            save_weapon_value = 3 * 2900  # 3 rifles saved
+            # Next round from the economy model: the survivors keep their rifles
+            # and everyone spends the loss bonus (or the credits given)
+            outlook = save_outlook(3, scenario.get("credits", LOSS_REWARDS[1]))
+            save_weapon_value = outlook["saved_value"]
             
             prediction["original_action"] = {
                 "action": "Attempt 3v5 retake",
@@ -894,13 +708,13 @@ Provide strategic coaching recommendations (one paragraph, 3-4 sentences)."""
             }
             
             # Alternative: Save weapons
-            next_round_win_rate_full_buy = 0.60  # With saved rifles
-            next_round_win_rate_eco = 0.35  # If forced to eco
+            next_round_win_rate_full_buy = outlook["with_save"]  # With saved rifles
+            next_round_win_rate_eco = outlook["broken_buy"]  # If forced to rebuy
             
             prediction["alternative_action"] = {
                 "action": "Save 3 rifles",
                 "success_probability": f"{next_round_win_rate_full_buy*100:.0f}%",
-                "expected_value": f"High - {next_round_win_rate_full_buy*100:.0f}% chance to win next gun round vs {next_round_win_rate_eco*100:.0f}% on eco",
+                "expected_value": f"High - {next_round_win_rate_full_buy*100:.0f}% chance to win next gun round vs {next_round_win_rate_eco*100:.0f}% on a broken buy",
                 "outcome": "Concede round, maintain weapon economy for next"
             }
             
@@ -1019,17 +833,12 @@ Data:
 
 Provide 2-3 sentences of actionable coaching advice."""
             
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a professional VALORANT coach providing data-driven insights."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=0.7
+            return self._chat_completion(
+                "_generate_valorant_ai_insight",
+                "You are a professional VALORANT coach providing data-driven insights.",
+                prompt,
+                max_tokens=150
             )
-            
-            return response.choices[0].message.content.strip()
         except Exception as e:
             return f"AI analysis temporarily unavailable: {str(e)}"
     
@@ -1048,17 +857,12 @@ Data:
 
 Provide 2-3 sentences of actionable coaching advice."""
             
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a professional LoL coach providing data-driven insights."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=0.7
+            return self._chat_completion(
+                "_generate_lol_ai_insight",
+                "You are a professional LoL coach providing data-driven insights.",
+                prompt,
+                max_tokens=150
             )
-            
-            return response.choices[0].message.content.strip()
         except Exception as e:
             return f"AI analysis temporarily unavailable: {str(e)}"
     
@@ -1079,17 +883,12 @@ Provide 2-3 sentences of actionable coaching advice."""
 
 Provide a 2-3 sentence strategic summary focusing on top priorities."""
             
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": f"You are a professional {game.upper()} coach reviewing team performance."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=0.7
+            return self._chat_completion(
+                "_generate_ai_macro_review",
+                f"You are a professional {game.upper()} coach reviewing team performance.",
+                prompt,
+                max_tokens=150
             )
-            
-            return response.choices[0].message.content.strip()
         except Exception as e:
             return f"AI summary temporarily unavailable: {str(e)}"
     
@@ -1110,16 +909,11 @@ Analysis: {recommendation}
 
 Provide additional strategic context in 2-3 sentences."""
             
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": f"You are a professional {game.upper()} strategist analyzing game decisions."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=0.7
+            return self._chat_completion(
+                "_generate_ai_prediction",
+                f"You are a professional {game.upper()} strategist analyzing game decisions.",
+                prompt,
+                max_tokens=150
             )
-            
-            return response.choices[0].message.content.strip()
         except Exception as e:
             return f"AI analysis temporarily unavailable: {str(e)}"
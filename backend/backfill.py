@@ -0,0 +1,196 @@
+"""
+Bulk historical backfill from GRID into the local stats store.
+
+Pages through GRID allSeries for a title (optionally narrowed to a tournament
+and/or date range), downloads each series end-state with bounded concurrency
+and a request rate limit, and runs it through the same processing as
+/series/{series_id}/insights. Progress is checkpointed after every page so an
+interrupted run resumes where it stopped.
+
+Usage (from the backend directory):
+    python backfill.py --title lol --from 2024-01-01 --to 2024-06-30 --concurrency 4 --rate 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Optional
+
+from grid_client import GridClient
+
+TITLE_IDS = {"lol": 3, "league": 3, "valorant": 21}
+
+
+class RateLimiter:
+    """Spaces request starts so that at most `rate` begin per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class Checkpoint:
+    """JSON checkpoint of the page cursor and completed series for one backfill query"""
+
+    def __init__(self, path: str, query: Dict[str, Any]):
+        self.path = path
+        self.query = query
+        self.after: Optional[str] = None
+        self.completed = set()
+        self.failed: Dict[str, str] = {}
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as f:
+            state = json.load(f)
+        if state.get("query") != self.query:
+            raise SystemExit(
+                f"Checkpoint {self.path} belongs to a different query {state.get('query')}. "
+                "Use another --checkpoint path or delete it."
+            )
+        self.after = state.get("after")
+        self.completed = set(state.get("completed", []))
+        self.failed = state.get("failed", {})
+        return True
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "query": self.query,
+                "after": self.after,
+                "completed": sorted(self.completed),
+                "failed": self.failed
+            }, f)
+        os.replace(tmp_path, self.path)
+
+
+async def run_backfill(args: argparse.Namespace) -> Dict[str, Any]:
+    # Imported here so --help works without loading the API module
+    import workers
+    from main import ingest_grid_end_state
+
+    title_id = TITLE_IDS.get(str(args.title).lower()) or int(args.title)
+    query = {
+        "title_id": title_id,
+        "tournament_id": args.tournament,
+        "from": args.start_from,
+        "to": args.start_to
+    }
+
+    checkpoint = Checkpoint(args.checkpoint, query)
+    if checkpoint.load():
+        print(f"Resuming from checkpoint: {len(checkpoint.completed)} series already processed")
+
+    grid = GridClient()
+    limiter = RateLimiter(args.rate)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    processed = 0
+    failed = 0
+    started = time.perf_counter()
+
+    async def backfill_series(series_id: str, scheduled: Optional[str] = None) -> None:
+        nonlocal processed, failed
+        async with semaphore:
+            await limiter.wait()
+            try:
+                end_state = await grid.get_series_end_state(series_id)
+                if scheduled and isinstance(end_state, dict) and not end_state.get("startedAt"):
+                    # Date undated end states by the series' scheduled start rather than leaving them undated
+                    end_state = {**end_state, "startedAt": scheduled}
+                # Parsed on the worker pool and written on a thread, so other downloads keep going
+                await ingest_grid_end_state(end_state, series_id)
+                checkpoint.completed.add(series_id)
+                checkpoint.failed.pop(series_id, None)
+                processed += 1
+            except Exception as e:
+                checkpoint.failed[series_id] = str(e)
+                failed += 1
+
+    try:
+        # Retry series that failed in a previous run before moving on
+        if checkpoint.failed:
+            await asyncio.gather(*(backfill_series(series_id) for series_id in list(checkpoint.failed)))
+
+        # Pages are prefetched while the current page's end-states download
+        pages = grid.iter_series_pages(
+            title_id,
+            page_size=args.page_size,
+            after=checkpoint.after,
+            tournament_id=args.tournament,
+            start_from=args.start_from,
+            start_to=args.start_to
+        )
+        async for page in pages:
+            pending = [s for s in page["series"] if s.get("id") and s["id"] not in checkpoint.completed]
+            truncated = False
+            if args.max_series and len(pending) > args.max_series - processed:
+                pending = pending[:max(0, args.max_series - processed)]
+                truncated = True
+            await asyncio.gather(*(backfill_series(s["id"], s.get("startTimeScheduled")) for s in pending))
+
+            # Only move past a page once all of its series were attempted
+            if not truncated:
+                checkpoint.after = page["end_cursor"]
+            checkpoint.save()
+
+            elapsed = time.perf_counter() - started
+            print(
+                f"Page done: {processed} processed, {failed} failed, "
+                f"{processed / elapsed if elapsed > 0 else 0:.2f} series/sec"
+            )
+
+            if truncated or (args.max_series and processed >= args.max_series):
+                await pages.aclose()
+                break
+    finally:
+        # Persist completed series even when interrupted mid-page
+        checkpoint.save()
+        workers.pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "processed": processed,
+        "failed": failed,
+        "elapsed_seconds": round(elapsed, 2),
+        "series_per_second": round(processed / elapsed, 2) if elapsed > 0 else 0
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill historical GRID series into the stats store")
+    parser.add_argument("--title", default="lol", help="Title: lol, valorant or a numeric GRID title ID (default: lol)")
+    parser.add_argument("--tournament", default=None, help="Only series from this GRID tournament ID")
+    parser.add_argument("--from", dest="start_from", default=None, help="Earliest scheduled start (ISO-8601)")
+    parser.add_argument("--to", dest="start_to", default=None, help="Latest scheduled start (ISO-8601)")
+    parser.add_argument("--page-size", type=int, default=50, help="Series per allSeries page (default: 50)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent end-state downloads (default: 4)")
+    parser.add_argument("--rate", type=float, default=5.0, help="Max GRID requests started per second, 0 for unlimited (default: 5)")
+    parser.add_argument("--max-series", type=int, default=0, help="Stop after this many series (default: no limit)")
+    parser.add_argument("--checkpoint", default="backfill_checkpoint.json", help="Checkpoint file path")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        summary = asyncio.run(run_backfill(args))
+    except KeyboardInterrupt:
+        print("Interrupted - rerun the same command to resume from the last checkpoint")
+        sys.exit(130)
+    print(json.dumps(summary, indent=2))
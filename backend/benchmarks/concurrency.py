@@ -0,0 +1,230 @@
+"""
+Event-loop responsiveness while heavy analyses run.
+
+For each worker mode (see workers.py) the API is started under uvicorn in
+its own process, against the stub GRID server in another, and light
+endpoints (GET /, /players, /grid/status) are probed at a fixed arrival
+rate, first on an idle server and then while closed-loop clients keep heavy
+work running:
+
+- GET /series/{id}/insights on fresh series ids. The stub answers
+  GetSeriesDetails without a series, so every call downloads and ingests an
+  end state of `--games` games (parse on the worker pool, SQLite write on a
+  thread).
+- GET /roster/analysis, recomputed after every ingest.
+- POST /assistant/macro-review with a LoL review.
+
+A flat light p99 (loaded/idle ratio near 1) means heavy work is off the
+event loop. `inline` runs everything on the loop and is the baseline.
+Separate processes keep the load generator and the stub from competing with
+the API for its GIL; they still share the machine's cores, so run on a host
+with more cores than `--pool-size` for representative numbers.
+
+Usage (from the backend directory):
+    python -m benchmarks.concurrency
+    python -m benchmarks.concurrency --modes inline,process --heavy-clients 8 --games 30 --max-p99-ratio 3
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.generators import SyntheticData
+from benchmarks.load_test import Recorder
+from benchmarks.reporting import run_metadata, summarize, write_results
+from benchmarks.stub_grid import free_port, grid_env
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIGHT_PATHS = ["/", "/players", "/grid/status"]
+_WORKER_TASKS_LINE = re.compile(r'^worker_tasks_total\{pool="(\w+)",task="([^"]+)"\} (\S+)$', re.MULTILINE)
+
+
+def start_server(args: List[str], env: Dict[str, str], url: str, log_path: str) -> subprocess.Popen:
+    """Start a server process and wait until `url` answers"""
+    log = open(log_path, "w")
+    proc = subprocess.Popen([sys.executable, *args], cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{' '.join(args)} exited with {proc.returncode}; see {log_path}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError(f"{' '.join(args)} did not start; see {log_path}")
+
+
+def stop_server(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+async def probe_light(client: httpx.AsyncClient, rate: float, duration: float) -> Dict[str, Any]:
+    """Open-loop light requests at `rate`/s; latency includes any wait for the event loop"""
+    samples: List[float] = []
+    paths = itertools.cycle(LIGHT_PATHS)
+
+    async def one(path: str) -> None:
+        started = time.perf_counter_ns()
+        try:
+            await client.get(path)
+        finally:
+            samples.append((time.perf_counter_ns() - started) / 1e6)
+
+    started = time.perf_counter()
+    deadline = started + duration
+    next_arrival = started
+    tasks = []
+    while next_arrival < deadline:
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+        tasks.append(asyncio.create_task(one(next(paths))))
+        next_arrival += 1.0 / rate
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return summarize(samples, time.perf_counter() - started)
+
+
+async def heavy_load(client: httpx.AsyncClient, recorder: Recorder, clients: int,
+                     stop: asyncio.Event, review: Dict[str, Any]) -> None:
+    counter = itertools.count()
+    requests = [
+        ("GET /series/{id}/insights", "GET", lambda: f"/series/concurrency-{next(counter)}/insights", None),
+        ("GET /roster/analysis", "GET", lambda: "/roster/analysis", None),
+        ("POST /assistant/macro-review", "POST", lambda: "/assistant/macro-review", {"match_data": review, "game": "lol"}),
+    ]
+
+    async def user(offset: int) -> None:
+        for i in itertools.count(offset):
+            if stop.is_set():
+                return
+            label, method, path, body = requests[i % len(requests)]
+            started = time.perf_counter_ns()
+            try:
+                response = await client.request(method, path(), json=body)
+                outcome = str(response.status_code)
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+            recorder.record("heavy", label, (time.perf_counter_ns() - started) / 1e6, outcome)
+
+    await asyncio.gather(*(user(i) for i in range(clients)))
+
+
+async def measure_mode(base_url: str, args: argparse.Namespace, review: Dict[str, Any]) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.heavy_clients + 64, max_keepalive_connections=args.heavy_clients + 64)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        # Give the roster something to analyze
+        for i in range(args.series):
+            await client.get(f"/series/seed-{i}/insights")
+        idle = await probe_light(client, args.light_rate, args.duration)
+
+        recorder = Recorder()
+        stop = asyncio.Event()
+        started = time.perf_counter()
+        load = asyncio.create_task(heavy_load(client, recorder, args.heavy_clients, stop, review))
+        # Let workers warm up and the heavy clients reach steady state before probing
+        await asyncio.sleep(args.warmup)
+        loaded = await probe_light(client, args.light_rate, args.duration)
+        stop.set()
+        await load
+        heavy = recorder.report(time.perf_counter() - started)
+
+        worker_tasks: Dict[str, float] = {}
+        for pool, _, count in _WORKER_TASKS_LINE.findall((await client.get("/metrics")).text):
+            worker_tasks[pool] = worker_tasks.get(pool, 0) + float(count)
+
+    return {
+        "idle": idle,
+        "loaded": loaded,
+        "p99_ratio": round(loaded["p99_ms"] / idle["p99_ms"], 2) if idle["p99_ms"] else None,
+        "heavy": heavy["requests"],
+        "worker_tasks_by_pool": worker_tasks
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Light-endpoint latency while heavy analyses run, per worker mode")
+    parser.add_argument("--modes", default="inline,thread,process", help="Worker modes to compare (default: inline,thread,process)")
+    parser.add_argument("--pool-size", type=int, default=2, help="WORKER_POOL_SIZE for the API (default: 2)")
+    parser.add_argument("--heavy-clients", type=int, default=4, help="Concurrent heavy clients (default: 4)")
+    parser.add_argument("--light-rate", type=float, default=50.0, help="Light requests per second (default: 50)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per probe (default: 10)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of heavy load before probing (default: 2)")
+    parser.add_argument("--games", type=int, default=30, help="Games per ingested end state (default: 30)")
+    parser.add_argument("--series", type=int, default=20, help="Series ingested before probing (default: 20)")
+    parser.add_argument("--seed", type=int, default=9)
+    parser.add_argument("--max-p99-ratio", type=float, default=None,
+                        help="Fail when a pooled mode's loaded/idle light p99 exceeds this ratio")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/concurrency-<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    review = SyntheticData(args.seed).lol_review_match(5, 200)
+    work_dir = tempfile.mkdtemp(prefix="c9-concurrency-")
+
+    stub_port = free_port()
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    stub = start_server(
+        ["-m", "benchmarks.stub_grid", "--port", str(stub_port), "--seed", str(args.seed),
+         "--games", str(args.games), "--no-series-details"],
+        dict(os.environ), f"{stub_url}/docs", os.path.join(work_dir, "stub_grid.log")
+    )
+
+    results = {"meta": run_metadata(**vars(args)), "concurrency": {}}
+    exit_code = 0
+    try:
+        for mode in modes:
+            env = dict(os.environ)
+            env.update(grid_env(stub_url))
+            env.pop("OPENAI_API_KEY", None)
+            env.update({
+                "STATS_DB_PATH": os.path.join(work_dir, f"{mode}.db"),
+                "TRACE_EXPORT": "off",
+                "WORKER_MODE": mode,
+                "WORKER_POOL_SIZE": str(args.pool_size)
+            })
+            port = free_port()
+            api = start_server(
+                ["-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+                 "--log-level", "warning", "--no-access-log"],
+                env, f"http://127.0.0.1:{port}/", os.path.join(work_dir, f"api-{mode}.log")
+            )
+            try:
+                result = asyncio.run(measure_mode(f"http://127.0.0.1:{port}", args, review))
+            finally:
+                stop_server(api)
+            results["concurrency"][mode] = result
+
+            idle, loaded = result["idle"], result["loaded"]
+            print(f"{mode}: light p50 {idle['p50_ms']} -> {loaded['p50_ms']} ms, "
+                  f"p99 {idle['p99_ms']} -> {loaded['p99_ms']} ms (x{result['p99_ratio']}), "
+                  f"worker tasks {result['worker_tasks_by_pool']}")
+            for label, summary in result["heavy"].items():
+                print(f"  {label}: {summary['throughput_per_sec']} req/s, p50 {summary['p50_ms']} ms, outcomes {summary['outcomes']}")
+            if args.max_p99_ratio and mode != "inline" and (result["p99_ratio"] or 0) > args.max_p99_ratio:
+                print(f"FAIL: {mode} light p99 grew x{result['p99_ratio']} under load (max x{args.max_p99_ratio:g})")
+                exit_code = 1
+    finally:
+        stop_server(stub)
+
+    path = write_results(results, args.output, "concurrency")
+    print(f"Results written to {path}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+Synthetic GRID-shaped data seeded from data/sample_*.json.
+
+Rosters, champions/agents, stat magnitudes and event shapes come from the
+sample files; everything else is drawn from a seeded RNG, so the same seed
+always yields the same data at any scale.
+"""
+import json
+import os
+import random
+import zlib
+from typing import Any, Dict, List
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
+
+OPPONENTS = ["Team Liquid", "100 Thieves", "FlyQuest", "NRG", "Dignitas", "Shopify Rebellion", "Immortals", "Sentinels"]
+SITES = ["A", "B", "C"]
+BUY_TYPES = ["full", "full", "full", "force", "eco", "half"]
+
+
+def load_sample(name: str) -> Dict[str, Any]:
+    with open(os.path.join(DATA_DIR, name)) as f:
+        return json.load(f)
+
+
+def _jitter(rng: random.Random, value: float, spread: float = 0.25) -> float:
+    return max(0.0, rng.gauss(value, value * spread))
+
+
+class SyntheticData:
+    """Deterministic generators for ingestion payloads, stat histories and match data"""
+
+    def __init__(self, seed: int = 9):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.lol_sample = load_sample("sample_cloud9_match.json")
+        self.valorant_sample = load_sample("sample_valorant_match.json")
+
+        # LoL roster: role -> (player, champion pool, stat template)
+        self.lol_roster: Dict[str, Dict[str, Any]] = {}
+        for game in self.lol_sample["games"]:
+            for player in game["blue_team"]["players"]:
+                slot = self.lol_roster.setdefault(player["role"], {
+                    "name": player["summonerName"], "champions": [], "stats": player["stats"]
+                })
+                if player["championName"] not in slot["champions"]:
+                    slot["champions"].append(player["championName"])
+
+        # VALORANT roster: (name, agent) from the first round
+        first_round = self.valorant_sample["rounds"][0]
+        self.valorant_roster = [(p["name"], p["agent"]) for p in first_round["attackers"]]
+
+    def _rng_for(self, key: str) -> random.Random:
+        # Per-entity RNG so e.g. a series' payload doesn't depend on request order
+        return random.Random(zlib.crc32(f"{self.seed}:{key}".encode()))
+
+    # --- LoL ingestion (process_grid_end_state input) ---------------------
+
+    def _lol_team(self, rng: random.Random, name: str, won: bool, duration_min: float, own_roster: bool) -> Dict[str, Any]:
+        players = []
+        for role, slot in self.lol_roster.items():
+            player_name = slot["name"] if own_roster else f"{name.split()[0][:4]}{role}"
+            stats = {k: int(_jitter(rng, v)) for k, v in slot["stats"].items()}
+            stats["totalMinionsKilled"] = int(stats["totalMinionsKilled"] * duration_min / 31)
+            players.append({
+                "summonerName": player_name,
+                "role": role,
+                "championName": rng.choice(slot["champions"]),
+                "stats": stats
+            })
+        kills = sum(p["stats"]["kills"] for p in players)
+        return {
+            "name": name,
+            "stats": {
+                "win": won,
+                "kills": kills,
+                "deaths": sum(p["stats"]["deaths"] for p in players),
+                "dragons": rng.randint(2, 4) if won else rng.randint(0, 2),
+                "barons": rng.randint(0, 2) if won else rng.randint(0, 1),
+                "towers": rng.randint(6, 11) if won else rng.randint(1, 6),
+                "firstBlood": rng.random() < (0.6 if won else 0.4)
+            },
+            "players": players
+        }
+
+    def lol_end_state(self, series_id: str, games: int = 3) -> Dict[str, Any]:
+        """One series in the end-state shape process_grid_end_state reads"""
+        rng = self._rng_for(f"lol:{series_id}")
+        opponent = rng.choice(OPPONENTS)
+        game_rows = []
+        for game_number in range(games):
+            duration = int(_jitter(rng, 1950, 0.15))
+            won = rng.random() < 0.55
+            teams = [
+                self._lol_team(rng, "Cloud9", won, duration / 60, True),
+                self._lol_team(rng, opponent, not won, duration / 60, False)
+            ]
+            game_rows.append({
+                "gameDuration": duration,
+                "startedAt": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{(18 + game_number) % 24:02d}:00:00Z",
+                "teams": teams
+            })
+        return {"id": series_id, "tournament": self.lol_sample["tournament"], "games": game_rows}
+
+    def lol_series_ids(self, count: int) -> List[str]:
+        return [f"bench-{self.seed}-{i}" for i in range(count)]
+
+    # --- Analyzer inputs ---------------------------------------------------
+
+    def player_history(self, player_name: str, games: int, role: str = "Jungle") -> List[Dict[str, Any]]:
+        """Per-game rows in the player_stats_cache shape, oldest first"""
+        rng = self._rng_for(f"history:{player_name}:{games}")
+        template = self.lol_roster.get(role, next(iter(self.lol_roster.values())))["stats"]
+        rows = []
+        for i in range(games):
+            kills = int(_jitter(rng, template["kills"]))
+            deaths = int(_jitter(rng, max(template["deaths"], 1), 0.6))
+            assists = int(_jitter(rng, template["assists"]))
+            rows.append({
+                "match_id": f"{player_name}-{i}",
+                "player_name": player_name,
+                "role": role,
+                "kills": kills,
+                "deaths": deaths,
+                "assists": assists,
+                "kda": round((kills + assists) / deaths, 2) if deaths else float(kills + assists),
+                "cs_per_min": round(_jitter(rng, template["totalMinionsKilled"] / 31, 0.15), 1),
+                "vision_score": int(_jitter(rng, template["visionScore"])),
+                "damage_dealt": int(_jitter(rng, template["totalDamageDealtToChampions"])),
+                "gold_earned": int(_jitter(rng, template["goldEarned"])),
+                "performance_score": round(min(100.0, _jitter(rng, 62, 0.2)), 1)
+            })
+        return rows
+
+    def team_history(self, games: int) -> List[Dict[str, Any]]:
+        """Per-series rows in the team_stats_cache shape"""
+        rng = self._rng_for(f"team:{games}")
+        return [
+            {
+                "match_id": f"team-{i}",
+                "win": rng.random() < 0.55,
+                "dragons_secured": round(rng.uniform(0.5, 4), 2),
+                "barons_secured": round(rng.uniform(0, 1.5), 2),
+                "towers_destroyed": round(rng.uniform(2, 10), 2),
+                "first_blood": rng.random() < 0.5,
+                "avg_game_duration": round(_jitter(rng, 32, 0.15), 1),
+                "win_rate": rng.choice([0.0, 0.33, 0.5, 0.67, 1.0])
+            }
+            for i in range(games)
+        ]
+
+    def all_player_history(self, games_per_player: int) -> List[Dict[str, Any]]:
+        return [
+            row
+            for role, slot in self.lol_roster.items()
+            for row in self.player_history(slot["name"], games_per_player, role)
+        ]
+
+    def lol_review_match(self, games: int = 3, events_per_game: int = 10) -> Dict[str, Any]:
+        """Sample-shaped LoL match (blue_team games + events) scaled to more games and events"""
+        rng = self._rng_for(f"lol-review:{games}:{events_per_game}")
+        sample = self.lol_sample
+        players = [p["summonerName"] for p in sample["games"][0]["blue_team"]["players"]]
+        match = {
+            "series_id": f"bench-review-{games}-{events_per_game}",
+            "tournament": sample["tournament"],
+            "teams": sample["teams"],
+            "games": [
+                {**sample["games"][i % len(sample["games"])], "game_number": i + 1}
+                for i in range(games)
+            ],
+            "events": {
+                "ganks": [],
+                "first_drake": {"secured": rng.random() < 0.5, "timestamp": 300, "type": "cloud"},
+                "baron_fights": [],
+                "isolated_deaths": [],
+                "teleport_uses": []
+            }
+        }
+        events = match["events"]
+        for _ in range(games * events_per_game):
+            timestamp = rng.randint(120, 2400)
+            kind = rng.randrange(4)
+            if kind == 0:
+                events["ganks"].append({
+                    "jungler": self.lol_roster["Jungle"]["name"], "lane": rng.choice(["top", "mid", "bot"]),
+                    "timestamp": timestamp, "success": rng.random() < 0.5
+                })
+            elif kind == 1:
+                events["baron_fights"].append({
+                    "timestamp": timestamp, "result": rng.choice(["won", "lost"]), "unspent_gold": rng.randint(0, 5000)
+                })
+            elif kind == 2:
+                events["isolated_deaths"].append({
+                    "player": rng.choice(players), "timestamp": timestamp,
+                    "location": rng.choice(["Top Lane", "Bot Lane", "Mid Lane", "Jungle"]),
+                    "objective": rng.choice(["Baron spawn", "Drake spawn", "Herald"])
+                })
+            else:
+                events["teleport_uses"].append({
+                    "player": self.lol_roster["Top"]["name"], "timestamp": timestamp,
+                    "type": rng.choice(["flank", "save tower"]), "successful": rng.random() < 0.6
+                })
+        return match
+
+    @staticmethod
+    def _valorant_kill_events(rng: random.Random, players: List[Dict[str, Any]], team: str,
+                              enemies: List[str], opponent: str) -> List[Dict[str, Any]]:
+        events = []
+        enemies_alive = list(enemies)
+        for player in players:
+            for _ in range(player["kills"]):
+                if not enemies_alive:
+                    break
+                victim = enemies_alive.pop(rng.randrange(len(enemies_alive)))
+                assists = [p["name"] for p in players if p is not player and rng.random() < 0.15]
+                events.append({"time": round(rng.uniform(5, 100), 1), "killer": player["name"], "victim": victim,
+                               "assists": assists, "killer_team": team, "victim_team": opponent})
+            if player["deaths"]:
+                events.append({"time": round(rng.uniform(5, 100), 1), "killer": rng.choice(enemies),
+                               "victim": player["name"], "assists": [], "killer_team": opponent, "victim_team": team})
+        events.sort(key=lambda event: event["time"])
+        return events
+
+    def valorant_match(self, rounds: int = 24, kill_events: bool = False) -> Dict[str, Any]:
+        """
+        Sample-shaped VALORANT match with `rounds` rounds (halves swap at round
+        13); with `kill_events`, each round also carries timestamped kills
+        consistent with its players' kills and deaths
+        """
+        rng = self._rng_for(f"valorant:{rounds}")
+        # Separate stream, so adding kill events doesn't change anything else
+        kill_rng = self._rng_for(f"valorant-kills:{rounds}")
+        sample = self.valorant_sample
+        team, opponent = sample["teams"][0], sample["teams"][1]
+        enemies = [f"{opponent} {i}" for i in range(1, 6)]
+        round_rows = []
+        wins = 0
+        for round_num in range(1, rounds + 1):
+            won = rng.random() < 0.5
+            wins += won
+            side = "attackers" if round_num <= 12 or round_num > 24 else "defenders"
+            players = []
+            for name, agent in self.valorant_roster:
+                kills = rng.choice([0, 0, 1, 1, 2, 3])
+                died = rng.random() < (0.4 if won else 0.75)
+                players.append({
+                    "name": name, "agent": agent,
+                    "kast": bool(kills) or not died or rng.random() < 0.3,
+                    "kills": kills, "deaths": int(died),
+                    "first_death": False
+                })
+            dead = [p for p in players if p["deaths"]]
+            if dead:
+                rng.choice(dead)["first_death"] = True
+            round_rows.append({
+                "round_num": round_num,
+                "team_won": won,
+                "buy_type": "pistol" if round_num in (1, 13) else rng.choice(BUY_TYPES),
+                "target_site": rng.choice(SITES),
+                "time_remaining": rng.randint(0, 45),
+                "won_by": side if won else ("defenders" if side == "attackers" else "attackers"),
+                f"{side}_team_name": team,
+                side: players
+            })
+            if kill_events:
+                round_rows[-1]["kill_events"] = self._valorant_kill_events(kill_rng, players, team, enemies, opponent)
+        return {
+            "match_id": f"bench-valorant-{rounds}",
+            "match_type": sample["match_type"],
+            "tournament": sample["tournament"],
+            "teams": sample["teams"],
+            "opponent": opponent,
+            "map": sample["map"],
+            "final_score": f"{wins}-{rounds - wins}",
+            "team_orbs_collected": rng.randint(rounds // 5, rounds // 2),
+            "enemy_orbs_collected": rng.randint(rounds // 5, rounds // 2),
+            "rounds": round_rows
+        }
+
+    # --- GRID Central Data --------------------------------------------------
+
+    def series_nodes(self, title_id: int, count: int) -> List[Dict[str, Any]]:
+        """allSeries nodes, newest first"""
+        rng = self._rng_for(f"nodes:{title_id}:{count}")
+        tournament = self.lol_sample["tournament"] if title_id == 3 else self.valorant_sample["tournament"]
+        return [
+            {
+                "id": f"bench-{self.seed}-{i}" if title_id == 3 else f"bench-{self.seed}-t{title_id}-{i}",
+                "startTimeScheduled": f"2024-{12 - (i // 28) % 12:02d}-{28 - i % 28:02d}T18:00:00Z",
+                "title": {"id": str(title_id), "name": "LoL" if title_id == 3 else "VALORANT"},
+                "tournament": {"id": str(zlib.crc32(tournament.encode()) % 10000), "name": tournament},
+                "teams": [{"baseInfo": {"name": "Cloud9"}}, {"baseInfo": {"name": rng.choice(OPPONENTS)}}],
+                "format": {"name": "best-of-3"}
+            }
+            for i in range(count)
+        ]
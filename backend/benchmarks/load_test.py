@@ -0,0 +1,284 @@
+"""
+Load-test harness for capacity planning.
+
+Starts a stub GRID server, a stub OpenAI-compatible server and the API
+(uvicorn, in this process) wired to both, then replays a weighted mix of
+dashboard, series and assistant traffic and reports throughput, latency
+percentiles and error rates per scenario and per request.
+
+Closed loop by default (`--concurrency` virtual users, optional think time);
+`--rate` switches to an open loop with a fixed arrival rate, which keeps
+queueing delay visible once the app saturates.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_test --duration 60 --concurrency 50
+    python -m benchmarks.load_test --rate 200 --mix dashboard=6,series=3,assistant=1 \\
+        --grid-latency-ms 80 --grid-error-rate 0.02 --llm-latency-ms 600
+    # Against a separately started server (run the stubs with their own __main__):
+    python -m benchmarks.load_test --target http://localhost:8000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.generators import SyntheticData
+from benchmarks.reporting import compare, run_metadata, summarize, write_results
+from benchmarks.stub_grid import ServerThread, StubGridConfig, create_stub_grid_app, grid_env
+from benchmarks.stub_llm import StubLLMConfig, create_stub_llm_app, llm_env
+
+Request = Tuple[str, str, str, Optional[Dict[str, Any]]]  # (label, method, path, json body)
+
+
+def build_scenarios(data: SyntheticData, series_ids: List[str]) -> Dict[str, Callable[[random.Random], Request]]:
+    """Scenario name -> request factory; each factory picks one request of that traffic class"""
+    valorant_match = data.valorant_match(24)
+    lol_match = data.lol_review_match(3, 10)
+    players = [slot["name"] for slot in data.lol_roster.values()]
+
+    def dashboard(rng: random.Random) -> Request:
+        return rng.choice([
+            ("GET /dashboard/lol", "GET", "/dashboard/lol", None),
+            ("GET /dashboard/valorant", "GET", "/dashboard/valorant", None),
+            ("GET /team/macro-analysis", "GET", "/team/macro-analysis", None),
+            ("GET /player/{name}/analysis", "GET", f"/player/{rng.choice(players)}/analysis", None),
+        ])
+
+    def series(rng: random.Random) -> Request:
+        return rng.choice([
+            ("GET /series/recent/{game}", "GET", "/series/recent/lol?limit=20", None),
+            ("GET /series/multi-game", "GET", "/series/multi-game?title_ids=3,21&limit=10", None),
+            ("GET /series/{id}/insights", "GET", f"/series/{rng.choice(series_ids)}/insights", None),
+        ])
+
+    def assistant(rng: random.Random) -> Request:
+        return rng.choice([
+            ("POST /assistant/personalized-insights", "POST", "/assistant/personalized-insights",
+             {"player_name": "OXY", "match_data": valorant_match, "game": "valorant"}),
+            ("POST /assistant/macro-review", "POST", "/assistant/macro-review",
+             {"match_data": rng.choice([valorant_match, lol_match]), "game": rng.choice(["valorant", "lol"])}),
+            ("POST /assistant/predict-scenario", "POST", "/assistant/predict-scenario",
+             {"game": "valorant", "scenario": {"round": 22, "score": "10-11", "situation": "3v5 retake", "site": "C"}}),
+        ])
+
+    return {"dashboard": dashboard, "series": series, "assistant": assistant}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+class Recorder:
+    """Per-scenario and per-request latency samples and outcome counts"""
+
+    def __init__(self):
+        self.samples: Dict[Tuple[str, str], List[float]] = {}
+        self.outcomes: Dict[Tuple[str, str], Dict[str, int]] = {}
+
+    def record(self, scenario: str, label: str, latency_ms: float, outcome: str) -> None:
+        key = (scenario, label)
+        self.samples.setdefault(key, []).append(latency_ms)
+        counts = self.outcomes.setdefault(key, {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+
+    def _summary(self, keys: List[Tuple[str, str]], wall_seconds: float) -> Dict[str, Any]:
+        samples = [ms for key in keys for ms in self.samples[key]]
+        outcomes: Dict[str, int] = {}
+        for key in keys:
+            for outcome, count in self.outcomes[key].items():
+                outcomes[outcome] = outcomes.get(outcome, 0) + count
+        # 4xx are the client's fault (e.g. no data yet); 5xx and transport errors count against the app
+        errors = sum(n for outcome, n in outcomes.items() if not outcome.startswith(("2", "4")))
+        summary = summarize(samples, wall_seconds)
+        summary["outcomes"] = outcomes
+        summary["error_rate"] = round(errors / max(len(samples), 1), 4)
+        return summary
+
+    def report(self, wall_seconds: float) -> Dict[str, Any]:
+        scenarios = sorted({scenario for scenario, _ in self.samples})
+        return {
+            "overall": self._summary(list(self.samples), wall_seconds),
+            "scenarios": {
+                scenario: self._summary([k for k in self.samples if k[0] == scenario], wall_seconds)
+                for scenario in scenarios
+            },
+            "requests": {
+                f"{scenario} {label}": self._summary([(scenario, label)], wall_seconds)
+                for scenario, label in sorted(self.samples)
+            }
+        }
+
+
+async def run_load(base_url: str, scenarios: Dict[str, Callable], weights: Dict[str, float], duration: float,
+                   concurrency: int, rate: Optional[float], think_ms: float, seed: int) -> Dict[str, Any]:
+    names = [name for name in weights if name in scenarios]
+    if not names:
+        raise SystemExit(f"--mix must name at least one of: {', '.join(scenarios)}")
+    scenario_weights = [weights[name] for name in names]
+    recorder = Recorder()
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        async def one_request() -> None:
+            scenario = rng.choices(names, scenario_weights)[0]
+            label, method, path, body = scenarios[scenario](rng)
+            started = time.perf_counter_ns()
+            try:
+                response = await client.request(method, path, json=body)
+                outcome = str(response.status_code)
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+            recorder.record(scenario, label, (time.perf_counter_ns() - started) / 1e6, outcome)
+
+        started = time.perf_counter()
+        deadline = started + duration
+
+        if rate:
+            # Open loop: arrivals on a fixed schedule regardless of response times
+            in_flight = set()
+            next_arrival = started
+            while next_arrival < deadline:
+                await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+                task = asyncio.create_task(one_request())
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                next_arrival += 1.0 / rate
+            if in_flight:
+                await asyncio.wait(in_flight)
+        else:
+            async def user() -> None:
+                while time.perf_counter() < deadline:
+                    await one_request()
+                    if think_ms:
+                        await asyncio.sleep(rng.uniform(0, 2 * think_ms) / 1000)
+            await asyncio.gather(*(user() for _ in range(concurrency)))
+
+        wall_seconds = time.perf_counter() - started
+
+    return recorder.report(wall_seconds)
+
+
+async def warm_up(base_url: str) -> None:
+    """Give the dashboards something to show before measuring"""
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+        for game in ("lol", "valorant"):
+            await client.post(f"/dashboard/{game}/update", params={"series_id": "warmup"})
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Drive the API with a dashboard/series/assistant traffic mix")
+    parser.add_argument("--target", default=None, help="Existing API base URL (default: start the app in-process with stubs)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load (default: 30)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users / max connections (default: 20)")
+    parser.add_argument("--rate", type=float, default=None, help="Open-loop arrivals per second (default: closed loop)")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean think time between a user's requests")
+    parser.add_argument("--mix", default="dashboard=5,series=3,assistant=2", help="Scenario weights")
+    parser.add_argument("--seed", type=int, default=9)
+    parser.add_argument("--series", type=int, default=100, help="Series ingested before the run (in-process only)")
+    parser.add_argument("--grid-latency-ms", type=float, default=50.0)
+    parser.add_argument("--grid-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--grid-error-rate", type=float, default=0.0)
+    parser.add_argument("--grid-games", type=int, default=3, help="Games per end-state payload")
+    parser.add_argument("--grid-rate-limit", type=float, default=0.0,
+                        help="GridClient requests/sec quota (default: 0 = unlimited)")
+    parser.add_argument("--llm-latency-ms", type=float, default=400.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=400.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--no-llm", action="store_true", help="Run the assistant without LLM calls")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/load-<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="Baseline load result to compare p50 latencies against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    data = SyntheticData(args.seed)
+    series_ids = data.lol_series_ids(max(args.series, 1))
+    servers: List[ServerThread] = []
+    stub_grid_app = stub_llm_app = None
+
+    try:
+        if args.target:
+            base_url = args.target.rstrip("/")
+        else:
+            stub_grid_app = create_stub_grid_app(StubGridConfig(
+                args.seed, games_per_series=args.grid_games, latency_ms=args.grid_latency_ms,
+                latency_jitter_ms=args.grid_jitter_ms, error_rate=args.grid_error_rate
+            ))
+            stub_llm_app = create_stub_llm_app(StubLLMConfig(
+                args.llm_latency_ms, args.llm_jitter_ms, args.llm_error_rate, args.seed
+            ))
+            stub_grid = ServerThread(stub_grid_app).start()
+            stub_llm = ServerThread(stub_llm_app).start()
+            servers += [stub_grid, stub_llm]
+
+            # Configure the app before it is imported: GRID/OpenAI URLs and the store are read at import time
+            os.environ.update(grid_env(stub_grid.base_url))
+            os.environ["GRID_RATE_LIMIT"] = str(args.grid_rate_limit)
+            os.environ.update(llm_env(stub_llm.base_url))
+            os.environ["STATS_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="c9-load-"), "load.db")
+            os.environ["TRACE_EXPORT"] = "off"
+            import main as app_module
+            if args.no_llm:
+                app_module.ai_analyzer.has_openai = False
+            for series_id in series_ids[:args.series]:
+                app_module.process_grid_end_state(data.lol_end_state(series_id, args.grid_games), series_id)
+
+            api = ServerThread(app_module.app).start()
+            servers.append(api)
+            base_url = api.base_url
+
+        asyncio.run(warm_up(base_url))
+        mode = f"open loop at {args.rate}/s" if args.rate else f"closed loop, {args.concurrency} users"
+        print(f"Load test against {base_url}: {args.duration:g}s, {mode}, mix {args.mix}")
+        report = asyncio.run(run_load(
+            base_url, build_scenarios(data, series_ids), parse_mix(args.mix), args.duration,
+            args.concurrency, args.rate, args.think_ms, args.seed
+        ))
+    finally:
+        for server in reversed(servers):
+            server.stop()
+
+    results = {"meta": run_metadata(**vars(args)), **report}
+    if stub_grid_app is not None:
+        results["stubs"] = {
+            "grid_requests": stub_grid_app.state.requests,
+            "grid_injected_errors": stub_grid_app.state.errors,
+            "llm_requests": stub_llm_app.state.requests
+        }
+
+    overall = report["overall"]
+    print(f"Overall: {overall['count']} requests, {overall.get('throughput_per_sec', 0)} req/s, "
+          f"p50 {overall['p50_ms']} ms, p95 {overall['p95_ms']} ms, p99 {overall['p99_ms']} ms, "
+          f"error rate {overall['error_rate']:.2%}")
+    for name, summary in report["requests"].items():
+        print(f"  {name}: {summary['count']} req, {summary.get('throughput_per_sec', 0)} req/s, "
+              f"p50 {summary['p50_ms']} ms, p99 {summary['p99_ms']} ms, outcomes {summary['outcomes']}")
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            results["comparison"] = compare(results, json.load(f))
+        for change in results["comparison"]:
+            print(f"  {change['benchmark']}: {change['change_percent']:+.1f}%{' REGRESSION' if change['regression'] else ''}")
+        exit_code = 1 if any(change["regression"] for change in results["comparison"]) else 0
+
+    path = write_results(results, args.output, "load")
+    print(f"Results written to {path}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
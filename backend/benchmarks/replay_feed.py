@@ -0,0 +1,117 @@
+"""
+Local replay of VALORANT matches as live event feeds.
+
+Serves GET /live/series/{match_id}/events as newline-delimited JSON in the
+live_ingest.py event format: series-started, one round-ended per round
+(preceded by its kill events, if the round has kill_events, and followed by an
+orbs event whenever the interpolated orb totals move), then series-ended,
+`interval` seconds apart. ?after=<sequence> resumes mid-match, as the API
+does after a reconnect, and `drop_every` closes the stream every N events to
+exercise that path.
+
+Matches come from match_data files (default: data/sample_valorant_match.json,
+served under its match_id) or are generated for `synthetic-<rounds>` ids
+(`synthetic-<rounds>-kills` adds kill events).
+
+Usage (from the backend directory):
+    python -m benchmarks.replay_feed --port 8090 --interval 2
+    LIVE_FEED_URL="http://127.0.0.1:8090/live/series/{match_id}/events" uvicorn main:app
+    curl -X POST localhost:8000/live/valorant/demo_c9_valorant_2024/follow
+"""
+import asyncio
+import json
+import os
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+
+from benchmarks.generators import DATA_DIR, SyntheticData
+
+_SYNTHETIC_ID = re.compile(r"^synthetic-(\d+)(-kills)?$")
+
+
+def match_events(match_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """A concluded match_data document replayed as a sequence of live events"""
+    rounds = match_data.get("rounds", [])
+    team_orbs = match_data.get("team_orbs_collected", 0)
+    enemy_orbs = match_data.get("enemy_orbs_collected", 0)
+
+    events: List[Dict[str, Any]] = [{
+        "type": "series-started",
+        "match": {key: match_data.get(key) for key in ("match_id", "match_type", "opponent", "map", "tournament")
+                  if match_data.get(key) is not None}
+    }]
+    orbs = (0, 0)
+    for i, round_data in enumerate(rounds, start=1):
+        # Kill events go out as they would happen, ahead of the round result
+        kills = round_data.get("kill_events") or []
+        for kill in kills:
+            events.append({"type": "kill", "round_num": round_data.get("round_num", i), "kill": kill})
+        if kills:
+            round_data = {key: value for key, value in round_data.items() if key != "kill_events"}
+        events.append({"type": "round-ended", "round": round_data})
+        # Only final totals are recorded, so spread them evenly over the rounds
+        current = (round(team_orbs * i / len(rounds)), round(enemy_orbs * i / len(rounds)))
+        if current != orbs:
+            orbs = current
+            events.append({"type": "orbs", "team_orbs_collected": orbs[0], "enemy_orbs_collected": orbs[1]})
+    if orbs != (team_orbs, enemy_orbs):
+        events.append({"type": "orbs", "team_orbs_collected": team_orbs, "enemy_orbs_collected": enemy_orbs})
+    events.append({"type": "series-ended", "final_score": match_data.get("final_score")})
+
+    for sequence, event in enumerate(events, start=1):
+        event["sequence"] = sequence
+    return events
+
+
+def create_replay_app(match_files: Optional[List[str]] = None, interval: float = 1.0,
+                      drop_every: int = 0, seed: int = 9) -> FastAPI:
+    app = FastAPI(title="Live feed replay")
+    data = SyntheticData(seed)
+    matches: Dict[str, Dict[str, Any]] = {}
+    for path in match_files or [os.path.join(DATA_DIR, "sample_valorant_match.json")]:
+        with open(path) as f:
+            match = json.load(f)
+        matches[match.get("match_id", os.path.basename(path))] = match
+
+    def find(match_id: str) -> Dict[str, Any]:
+        synthetic = _SYNTHETIC_ID.match(match_id)
+        if synthetic:
+            rounds, kills = int(synthetic.group(1)), bool(synthetic.group(2))
+            return {**data.valorant_match(rounds, kill_events=kills), "match_id": match_id}
+        if match_id not in matches:
+            raise HTTPException(status_code=404, detail=f"No match {match_id} to replay")
+        return matches[match_id]
+
+    @app.get("/live/series/{match_id}/events")
+    async def events(match_id: str, after: int = 0):
+        pending = [event for event in match_events(find(match_id)) if event["sequence"] > after]
+
+        async def stream() -> AsyncIterator[bytes]:
+            for sent, event in enumerate(pending, start=1):
+                yield json.dumps(event).encode() + b"\n"
+                if drop_every and sent % drop_every == 0 and sent < len(pending):
+                    return
+                await asyncio.sleep(interval)
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay VALORANT matches as live event feeds")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--match", action="append", dest="matches",
+                        help="match_data JSON file to serve (repeatable; default: data/sample_valorant_match.json)")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between events (default: 1)")
+    parser.add_argument("--drop-every", type=int, default=0, help="Close the stream every N events (default: never)")
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args()
+    uvicorn.run(create_replay_app(args.matches, args.interval, args.drop_every, args.seed),
+                host="127.0.0.1", port=args.port)
@@ -0,0 +1,82 @@
+"""Latency summaries, run metadata and JSON result files shared by the benchmark and load-test runners"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples_ms: List[float], wall_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """min/mean/p50/p95/p99/max in milliseconds, plus throughput when wall time is known"""
+    values = sorted(samples_ms)
+    summary = {
+        "count": len(values),
+        "min_ms": round(values[0], 3) if values else 0.0,
+        "mean_ms": round(sum(values) / len(values), 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
+    if wall_seconds:
+        summary["throughput_per_sec"] = round(len(values) / wall_seconds, 2)
+    return summary
+
+
+def run_metadata(**settings) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": settings
+    }
+
+
+def write_results(results: Dict[str, Any], path: Optional[str], prefix: str) -> str:
+    if not path:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    p50 change for every benchmark present in both runs; entries slower than
+    baseline by more than `threshold` are marked as regressions
+    """
+    changes = []
+    for section in ("functions", "endpoints", "scenarios"):
+        for name, result in current.get(section, {}).items():
+            before = baseline.get(section, {}).get(name)
+            if not before or not before.get("p50_ms"):
+                continue
+            change = (result["p50_ms"] - before["p50_ms"]) / before["p50_ms"]
+            changes.append({
+                "benchmark": f"{section}/{name}",
+                "baseline_p50_ms": before["p50_ms"],
+                "p50_ms": result["p50_ms"],
+                "change_percent": round(change * 100, 1),
+                "regression": change > threshold
+            })
+    return changes
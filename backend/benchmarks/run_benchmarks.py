@@ -0,0 +1,275 @@
+"""
+Reproducible benchmarks for the analyzer and ingestion hot paths.
+
+Times process_grid_end_state, analyze_player_performance, analyze_team_macro,
+analyze_roster, _generate_valorant_review, kill-event KAST derivation, the
+VALORANT economy replay, live VALORANT round updates and _generate_lol_review
+on synthetic data at several scales, then drives every HTTP endpoint
+concurrently with the app served by uvicorn against the stub GRID server. LLM calls are disabled so
+results measure our own code; the load-test harness covers the LLM path.
+
+Usage (from the backend directory):
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --series 2000 --concurrency 32 --compare benchmarks/results/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.generators import SyntheticData
+from benchmarks.reporting import compare, run_metadata, summarize, write_results
+from benchmarks.stub_grid import ServerThread, StubGridConfig, create_stub_grid_app, grid_env
+from live_ingest import LiveSession
+from similarity import PlayerSimilarityIndex
+
+
+def time_calls(fn: Callable, args_list: List[Tuple], repeat: int = 1) -> Dict[str, Any]:
+    """Call fn(*args) for every args tuple, `repeat` times, and summarize per-call latency"""
+    samples = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for args in args_list:
+            call_started = time.perf_counter_ns()
+            fn(*args)
+            samples.append((time.perf_counter_ns() - call_started) / 1e6)
+    return summarize(samples, time.perf_counter() - started)
+
+
+def run_function_benchmarks(main, data: SyntheticData, series: int, repeat: int) -> Dict[str, Any]:
+    analyzer = main.ai_analyzer
+    results = {}
+
+    end_states = [(data.lol_end_state(series_id), series_id) for series_id in data.lol_series_ids(series)]
+    results[f"process_grid_end_state[series={series}]"] = time_calls(main.process_grid_end_state, end_states)
+
+    for games in (10, 50, 1000):
+        history = data.player_history("Blaber", games)
+        name = f"analyze_player_performance[games={games}]"
+        results[name] = time_calls(analyzer.analyze_player_performance, [("Blaber", history)], repeat * 20)
+
+    for games in (50, 1000):
+        team_rows = data.team_history(games)
+        player_rows = data.all_player_history(games)
+        name = f"analyze_team_macro[games={games}]"
+        results[name] = time_calls(analyzer.analyze_team_macro, [(team_rows, player_rows)], repeat * 20)
+
+    player_stats = main.player_stats_cache
+    name = f"analyze_roster[players={len(player_stats)}]"
+    results[name] = time_calls(
+        analyzer.analyze_roster, [(player_stats, main.team_stats_cache, main.player_trends)], repeat * 4
+    )
+
+    for rounds in (24, 240, 2400):
+        match = data.valorant_match(rounds)
+        name = f"_generate_valorant_review[rounds={rounds}]"
+        results[name] = time_calls(analyzer._generate_valorant_review, [(match,)], repeat * 20)
+
+    # KAST, trades and opening duels derived from kill events: O(events)
+    for rounds in (24, 2400):
+        match = data.valorant_match(rounds, kill_events=True)
+        name = f"_analyze_valorant_player[kill_events,rounds={rounds}]"
+        results[name] = time_calls(analyzer._analyze_valorant_player, [("OXY", match)], repeat * 20)
+
+    # Economy replay: every round's credits plus the vectorized buy evaluation
+    for rounds in (24, 30):
+        match = data.valorant_match(rounds)
+        name = f"analyze_valorant_economy[rounds={rounds}]"
+        results[name] = time_calls(analyzer.analyze_valorant_economy, [(match,)], repeat * 20)
+
+    # Live ingestion: one round folded in, then the agenda read, at any match length
+    for rounds in (24, 2400):
+        session = LiveSession(f"bench-live-{rounds}")
+        for round_data in data.valorant_match(rounds)["rounds"]:
+            session.state.add_round(round_data)
+        next_round = {"round_num": rounds + 1, "team_won": False, "buy_type": "full", "target_site": "B", "time_remaining": 12}
+        name = f"live_round_update+agenda[rounds={rounds}]"
+        results[name] = time_calls(
+            lambda: (session.apply({"type": "round-ended", "round": next_round}), session.agenda()), [()], repeat * 200
+        )
+
+    # Similarity search: top-10 over a role pool, brute force (or KD-tree with scipy)
+    index = PlayerSimilarityIndex()
+    roles = list(data.lol_roster)
+    index.ingest(row for i in range(10000) for row in data.player_history(f"{roles[i % len(roles)]}{i}", 20, roles[i % len(roles)]))
+    query = f"{roles[0]}0"
+    for k in (1, 10):
+        name = f"similar_players[players=10000,k={k}]"
+        results[name] = time_calls(index.similar, [(query, k)], repeat * 200)
+
+    for games, events in ((3, 10), (5, 200), (5, 2000)):
+        match = data.lol_review_match(games, events)
+        name = f"_generate_lol_review[games={games},events_per_game={events}]"
+        results[name] = time_calls(analyzer._generate_lol_review, [(match,)], repeat * 20)
+
+    for name, result in results.items():
+        print(f"  {name}: p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms")
+    return results
+
+
+def endpoint_cases(data: SyntheticData, opponent: str) -> List[Tuple[str, str, str, Optional[Dict[str, Any]]]]:
+    """
+    (name, method, path, json body) for every API endpoint except the
+    profiler; `opponent` is a team the app has a scouting profile for
+    """
+    valorant_match = data.valorant_match(24)
+    lol_match = data.lol_review_match(3, 10)
+    return [
+        ("GET /", "GET", "/", None),
+        ("GET /metrics", "GET", "/metrics", None),
+        ("GET /players", "GET", "/players", None),
+        ("GET /player/{name}/stats", "GET", "/player/Blaber/stats", None),
+        ("GET /player/{name}/history", "GET", "/player/Blaber/history?limit=50", None),
+        ("GET /player/{name}/analysis", "GET", "/player/Blaber/analysis", None),
+        ("GET /player/{name}/similar", "GET", "/player/Blaber/similar?k=10", None),
+        ("GET /series/recent", "GET", "/series/recent?limit=20", None),
+        ("GET /series/recent/{game}", "GET", "/series/recent/lol?limit=20", None),
+        ("GET /series/multi-game", "GET", "/series/multi-game?title_ids=3,21&limit=10", None),
+        ("GET /series/{id}/insights", "GET", "/series/bench-http-1/insights", None),
+        ("GET /grid/status", "GET", "/grid/status", None),
+        ("GET /team/macro-analysis", "GET", "/team/macro-analysis", None),
+        ("GET /roster/analysis", "GET", "/roster/analysis", None),
+        ("GET /opponent/{team}/profile", "GET", f"/opponent/{opponent}/profile", None),
+        ("GET /opponents", "GET", "/opponents", None),
+        ("GET /matches/recent", "GET", "/matches/recent", None),
+        ("GET /dashboard/{game}", "GET", "/dashboard/lol", None),
+        ("POST /dashboard/{game}/update", "POST", "/dashboard/lol/update?series_id=bench-http-1", None),
+        ("POST /assistant/personalized-insights", "POST", "/assistant/personalized-insights",
+         {"player_name": "OXY", "match_data": valorant_match, "game": "valorant"}),
+        ("POST /assistant/macro-review[valorant]", "POST", "/assistant/macro-review",
+         {"match_data": valorant_match, "game": "valorant"}),
+        ("POST /assistant/macro-review[lol]", "POST", "/assistant/macro-review",
+         {"match_data": lol_match, "game": "lol"}),
+        ("GET /assistant/reviews/{id}", "GET", f"/assistant/reviews/{valorant_match['match_id']}?game=valorant", None),
+        ("POST /assistant/valorant-economy", "POST", "/assistant/valorant-economy", {"match_data": valorant_match}),
+        ("POST /assistant/valorant-series", "POST", "/assistant/valorant-series",
+         {"series": {"series_id": "bench-series", "match_type": "BO3",
+                     "maps": [valorant_match, data.valorant_match(22), data.valorant_match(26)]}}),
+        ("POST /assistant/predict-scenario", "POST", "/assistant/predict-scenario",
+         {"game": "valorant", "scenario": {"round": 22, "score": "10-11", "situation": "3v5 retake", "site": "C"}}),
+        ("POST /live/valorant/{id}/events", "POST", "/live/valorant/bench-live/events",
+         {"events": [{"type": "round-ended", "round": round_data} for round_data in valorant_match["rounds"][:3]]}),
+        ("GET /live/valorant/{id}/agenda", "GET", "/live/valorant/bench-live/agenda", None),
+        ("GET /live/valorant/{id}/economy", "GET", "/live/valorant/bench-live/economy", None),
+    ]
+
+
+async def drive_endpoint(client: httpx.AsyncClient, method: str, path: str, body: Optional[Dict[str, Any]],
+                         requests: int, concurrency: int, expected_status: int = 200) -> Dict[str, Any]:
+    """Latency and throughput of one endpoint; any status other than `expected_status` is an error"""
+    samples: List[float] = []
+    statuses: Dict[str, int] = {}
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter_ns()
+            try:
+                response = await client.request(method, path, json=body)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            samples.append((time.perf_counter_ns() - started) / 1e6)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(samples, time.perf_counter() - started)
+    result["statuses"] = statuses
+    result["error_rate"] = round(sum(n for s, n in statuses.items() if s != str(expected_status)) / max(len(samples), 1), 4)
+    return result
+
+
+async def run_endpoint_benchmarks(base_url: str, data: SyntheticData, requests: int, concurrency: int) -> Dict[str, Any]:
+    results = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        # Profile a team that was actually ingested, so the case times a hit rather than a 404
+        teams = (await client.get("/opponents")).json()
+        opponent = next((team for team in teams if team != "Cloud9"), teams[0] if teams else "Cloud9")
+        for name, method, path, body in endpoint_cases(data, opponent):
+            # Warm up (first GRID call per series populates caches, etc.)
+            await client.request(method, path, json=body)
+            results[name] = await drive_endpoint(client, method, path, body, requests, concurrency)
+            r = results[name]
+            print(f"  {name}: {r['throughput_per_sec']} req/s, p50 {r['p50_ms']} ms, p99 {r['p99_ms']} ms, "
+                  f"statuses {r['statuses']}, error rate {r['error_rate']}")
+    return results
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark analyzer, ingestion and HTTP endpoints")
+    parser.add_argument("--seed", type=int, default=9, help="Synthetic data seed (default: 9)")
+    parser.add_argument("--series", type=int, default=200, help="Series ingested through process_grid_end_state (default: 200)")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeat factor for analyzer benchmarks (default: 5)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent HTTP clients (default: 16)")
+    parser.add_argument("--grid-latency-ms", type=float, default=20.0, help="Stub GRID response latency (default: 20)")
+    parser.add_argument("--skip-http", action="store_true", help="Only run function benchmarks")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/bench-<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="Baseline result file to compare p50 latencies against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regression threshold for --compare (default: 0.10)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    data = SyntheticData(args.seed)
+
+    stub = ServerThread(create_stub_grid_app(StubGridConfig(args.seed, latency_ms=args.grid_latency_ms))).start()
+    db_dir = tempfile.mkdtemp(prefix="c9-bench-")
+
+    # Configure the app before it is imported: GRID URLs, quota and the store are read at import time
+    os.environ.update(grid_env(stub.base_url))
+    os.environ["STATS_DB_PATH"] = os.path.join(db_dir, "bench.db")
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ["TRACE_EXPORT"] = "off"
+    import main as app_module
+    app_module.ai_analyzer.has_openai = False
+
+    results = {
+        "meta": run_metadata(**vars(args)),
+        "functions": {},
+        "endpoints": {}
+    }
+
+    print("Function benchmarks")
+    results["functions"] = run_function_benchmarks(app_module, data, args.series, args.repeat)
+
+    if not args.skip_http:
+        print(f"HTTP benchmarks ({args.requests} requests x {args.concurrency} concurrent per endpoint)")
+        api = ServerThread(app_module.app).start()
+        try:
+            results["endpoints"] = asyncio.run(
+                run_endpoint_benchmarks(api.base_url, data, args.requests, args.concurrency)
+            )
+        finally:
+            api.stop()
+    stub.stop()
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        results["comparison"] = compare(results, baseline, args.threshold)
+        for change in results["comparison"]:
+            marker = "REGRESSION" if change["regression"] else ""
+            print(f"  {change['benchmark']}: {change['change_percent']:+.1f}% {marker}")
+        if any(change["regression"] for change in results["comparison"]):
+            exit_code = 1
+
+    path = write_results(results, args.output, "bench")
+    print(f"Results written to {path}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Cold-start benchmark: how long `import main` takes in a fresh interpreter.
+
+Runs `python -X importtime -c "import main"` several times, takes the best
+cumulative time for `main`, lists the slowest top-level imports and peak
+RSS, and fails when the import exceeds the budget or when a module that
+must stay lazy (openai, pandas, numpy, httpx) is imported at startup.
+
+Usage (from the backend directory):
+    python -m benchmarks.startup
+    python -m benchmarks.startup --budget-ms 600 --runs 5
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.reporting import run_metadata, write_results
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET_MS = 750.0
+# Heavy dependencies that must only load on first use
+LAZY_MODULES = ("openai", "pandas", "numpy", "httpx")
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _child_env(db_path: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    # Startup must not depend on an OpenAI key being configured
+    env.pop("OPENAI_API_KEY", None)
+    env["STATS_DB_PATH"] = db_path
+    env["TRACE_EXPORT"] = "off"
+    return env
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) for every line of -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def measure_once(db_path: str) -> Dict[str, Any]:
+    code = "import resource, main; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=_child_env(db_path), capture_output=True, text=True, timeout=120
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import main failed:\n{proc.stderr[-2000:]}")
+
+    rows = parse_importtime(proc.stderr)
+    main_row = next(row for row in rows if row[0] == "main" and row[3] == 0)
+    # Direct imports of main are the lines at depth 1 that appear before main's own line
+    main_index = rows.index(main_row)
+    children = []
+    for module, self_us, cumulative_us, depth in reversed(rows[:main_index]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((module, cumulative_us))
+    imported = {row[0] for row in rows}
+    return {
+        "import_main_ms": main_row[2] / 1000,
+        "peak_rss_mb": round(int(proc.stdout.strip().splitlines()[-1]) / 1024, 1),
+        "top_imports": [
+            {"module": module, "cumulative_ms": round(us / 1000, 1)}
+            for module, us in sorted(children, key=lambda item: item[1], reverse=True)[:10]
+        ],
+        "eager_lazy_modules": sorted(m for m in LAZY_MODULES if m in imported)
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure and enforce the API cold-start import budget")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to start; best run counts (default: 3)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Max cumulative `import main` time (default: {DEFAULT_BUDGET_MS:g})")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/startup-<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    db_path = os.path.join(tempfile.mkdtemp(prefix="c9-startup-"), "startup.db")
+    runs = [measure_once(db_path) for _ in range(args.runs)]
+    best = min(runs, key=lambda run: run["import_main_ms"])
+
+    print(f"import main: best {best['import_main_ms']:.1f} ms of {args.runs} runs "
+          f"(budget {args.budget_ms:g} ms), peak RSS {best['peak_rss_mb']} MB")
+    for entry in best["top_imports"]:
+        print(f"  {entry['module']}: {entry['cumulative_ms']} ms")
+
+    failures = []
+    if best["import_main_ms"] > args.budget_ms:
+        failures.append(f"import main took {best['import_main_ms']:.1f} ms, budget is {args.budget_ms:g} ms")
+    if best["eager_lazy_modules"]:
+        failures.append(f"imported at startup but should load on first use: {', '.join(best['eager_lazy_modules'])}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+
+    results = {
+        "meta": run_metadata(**vars(args)),
+        "startup": {
+            "best": best,
+            "runs_ms": [round(run["import_main_ms"], 1) for run in runs],
+            "failures": failures
+        }
+    }
+    path = write_results(results, args.output, "startup")
+    print(f"Results written to {path}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
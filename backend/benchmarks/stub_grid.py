@@ -0,0 +1,187 @@
+"""
+Local stand-in for GRID Central Data (GraphQL) and File Download.
+
+Answers the operations GridClient sends (GetRecentSeries, GetSeriesPage,
+GetMultiTitleSeries, GetSeriesDetails) and end-state downloads with
+deterministic synthetic data, so benchmarks and load tests never touch the
+real API. Point the app at it with GRID_CENTRAL_DATA_URL and
+GRID_FILE_DOWNLOAD_URL (see `grid_env`).
+"""
+import asyncio
+import random
+import re
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.generators import SyntheticData
+
+
+class StubGridConfig:
+    """
+    Knobs: fixed plus uniformly jittered latency, the share of requests that
+    fail (alternating 503 and 429 with Retry-After), and payload size via
+    games per end-state download. With `series_details=False`,
+    GetSeriesDetails answers without a series, so /series/{id}/insights falls
+    back to downloading and ingesting the end state.
+    """
+
+    def __init__(self, seed: int = 9, series_per_title: int = 500, games_per_series: int = 3,
+                 latency_ms: float = 0.0, latency_jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 series_details: bool = True):
+        self.seed = seed
+        self.series_per_title = series_per_title
+        self.games_per_series = games_per_series
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.series_details = series_details
+
+
+def create_stub_grid_app(config: Optional[StubGridConfig] = None) -> FastAPI:
+    config = config or StubGridConfig()
+    data = SyntheticData(config.seed)
+    nodes_by_title: Dict[int, list] = {}
+    app = FastAPI(title="Stub GRID")
+    app.state.config = config
+    app.state.requests = 0
+    app.state.errors = 0
+    rng = random.Random(config.seed)
+
+    def nodes(title_id: int) -> list:
+        if title_id not in nodes_by_title:
+            nodes_by_title[title_id] = data.series_nodes(title_id, config.series_per_title)
+        return nodes_by_title[title_id]
+
+    def page(title_id: int, first: int, after: Optional[str]) -> Dict[str, Any]:
+        start = int(after) if after else 0
+        window = nodes(title_id)[start:start + first]
+        end = start + len(window)
+        return {
+            "pageInfo": {"hasNextPage": end < config.series_per_title, "endCursor": str(end) if window else None},
+            "edges": [{"cursor": str(start + i + 1), "node": node} for i, node in enumerate(window)]
+        }
+
+    async def simulate_conditions() -> Optional[JSONResponse]:
+        """Sleep for the configured latency; return an error response for the configured share of requests"""
+        app.state.requests += 1
+        delay_ms = config.latency_ms + rng.uniform(0, config.latency_jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+        if config.error_rate > 0 and rng.random() < config.error_rate:
+            app.state.errors += 1
+            if app.state.errors % 2:
+                return JSONResponse({"message": "stub: service unavailable"}, status_code=503)
+            return JSONResponse({"message": "stub: rate limited"}, status_code=429, headers={"Retry-After": "1"})
+        return None
+
+    @app.post("/central-data/graphql")
+    async def graphql(request: Request):
+        failure = await simulate_conditions()
+        if failure is not None:
+            return failure
+        body = await request.json()
+        query = body.get("query", "")
+        variables = body.get("variables") or {}
+        operation = re.search(r"\bquery\s+(\w+)", query)
+        operation = operation.group(1) if operation else ""
+
+        if operation == "GetMultiTitleSeries":
+            limit = int(variables.get("limit", 10))
+            aliases = re.findall(r"\bt(\d+):\s*allSeries", query)
+            return {"data": {f"t{title_id}": page(int(title_id), limit, None) for title_id in aliases}}
+
+        if operation in ("GetRecentSeries", "GetSeriesPage"):
+            title_id = int(variables.get("titleId") or (variables.get("filter") or {}).get("titleId") or 3)
+            return {"data": {"allSeries": page(title_id, int(variables.get("first", 10)), variables.get("after"))}}
+
+        if operation == "GetSeriesDetails":
+            if not config.series_details:
+                return {"data": {"series": None}}
+            series_id = str(variables.get("seriesId"))
+            end_state = data.lol_end_state(series_id, 1)
+            return {"data": {"series": {
+                "id": series_id,
+                "name": f"Cloud9 vs {end_state['games'][0]['teams'][1]['name']}",
+                "tournament": {"name": end_state["tournament"]},
+                "teams": [{"name": team["name"]} for team in end_state["games"][0]["teams"]]
+            }}}
+
+        return {"errors": [{"message": f"Stub GRID does not implement operation '{operation}'"}]}
+
+    @app.get("/file-download/end-state/grid/series/{series_id}")
+    async def end_state(series_id: str):
+        failure = await simulate_conditions()
+        if failure is not None:
+            return failure
+        return data.lol_end_state(series_id, config.games_per_series)
+
+    return app
+
+
+def grid_env(base_url: str) -> Dict[str, str]:
+    """Environment that points GridClient at a stub and lifts the client-side quota"""
+    return {
+        "GRID_API_KEY": "stub",
+        "GRID_CENTRAL_DATA_URL": f"{base_url}/central-data/graphql",
+        "GRID_FILE_DOWNLOAD_URL": f"{base_url}/file-download/end-state/grid/series/",
+        "GRID_RATE_LIMIT": "0",
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ServerThread:
+    """Runs an ASGI app under uvicorn in a daemon thread (own event loop)"""
+
+    def __init__(self, app, port: Optional[int] = None):
+        self.port = port or free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.server = uvicorn.Server(uvicorn.Config(
+            app, host="127.0.0.1", port=self.port, log_level="warning", access_log=False
+        ))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def start(self) -> "ServerThread":
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.thread.is_alive():
+                raise RuntimeError(f"Server on port {self.port} failed to start")
+            time.sleep(0.02)
+        return self
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the stub GRID server")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--seed", type=int, default=9)
+    parser.add_argument("--series", type=int, default=500, help="Series per title (default: 500)")
+    parser.add_argument("--games", type=int, default=3, help="Games per end-state download (payload size)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered 503/429")
+    parser.add_argument("--no-series-details", action="store_true",
+                        help="Answer GetSeriesDetails without a series (forces the end-state fallback)")
+    args = parser.parse_args()
+    config = StubGridConfig(
+        args.seed, args.series, args.games,
+        latency_ms=args.latency_ms, latency_jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        series_details=not args.no_series_details
+    )
+    uvicorn.run(create_stub_grid_app(config), host="127.0.0.1", port=args.port)
@@ -0,0 +1,86 @@
+"""
+Local OpenAI-compatible chat completion server.
+
+Implements POST /v1/chat/completions with a canned answer, realistic usage
+counts and configurable latency/error rate. Point the app at it with
+OPENAI_BASE_URL (see `llm_env`); the OpenAI client reads it at construction.
+"""
+import asyncio
+import random
+import time
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class StubLLMConfig:
+    def __init__(self, latency_ms: float = 400.0, latency_jitter_ms: float = 400.0,
+                 error_rate: float = 0.0, seed: int = 9):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.seed = seed
+
+
+def create_stub_llm_app(config: Optional[StubLLMConfig] = None) -> FastAPI:
+    config = config or StubLLMConfig()
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Stub LLM")
+    app.state.config = config
+    app.state.requests = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        app.state.requests += 1
+        body = await request.json()
+        delay_ms = config.latency_ms + rng.uniform(0, config.latency_jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+        if config.error_rate > 0 and rng.random() < config.error_rate:
+            return JSONResponse(
+                {"error": {"message": "stub: overloaded", "type": "server_error"}}, status_code=503
+            )
+
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in body.get("messages", []))
+        completion_tokens = min(int(body.get("max_tokens") or 150), 60 + rng.randint(0, 60))
+        content = " ".join(["Focus on trading deaths for objectives and tightening mid-round calls."] * 3)
+        return {
+            "id": f"chatcmpl-stub-{app.state.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                # ~4 characters per token
+                "prompt_tokens": prompt_chars // 4,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_chars // 4 + completion_tokens
+            }
+        }
+
+    return app
+
+
+def llm_env(base_url: str) -> Dict[str, str]:
+    """Environment that points the OpenAI client at a stub"""
+    return {"OPENAI_API_KEY": "stub", "OPENAI_BASE_URL": f"{base_url}/v1"}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the stub OpenAI-compatible server")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--latency-ms", type=float, default=400.0)
+    parser.add_argument("--jitter-ms", type=float, default=400.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    config = StubLLMConfig(args.latency_ms, args.jitter_ms, args.error_rate)
+    uvicorn.run(create_stub_llm_app(config), host="127.0.0.1", port=args.port)
@@ -0,0 +1,234 @@
+"""
+Draft analytics maintained at ingest time.
+
+Counters of [games, wins] are kept by (player, pick), (team, composition) and
+(opponent, pick), where a pick is a LoL champion or a VALORANT agent and a
+composition is a team's five picks in one game (plus the map for VALORANT).
+Each ingest updates the counters and re-materializes the views of the
+players and teams it touched, so the /draft/* endpoints are dictionary
+lookups instead of scans over history.
+
+Compositions rarely repeat, so a team's view keeps only its TOP_COMPOSITIONS
+most played, maintained incrementally (counts only grow); any single
+composition can still be looked up directly.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+COMFORT_MIN_GAMES = 3  # games on a pick before it can be a comfort pick
+COMFORT_PICKS = 3
+TOP_COMPOSITIONS = 20
+
+Composition = Tuple[Optional[str], Tuple[str, ...]]  # (map, sorted picks)
+
+
+def _key(name: str) -> str:
+    return name.strip().lower()
+
+
+def valorant_pick_rows(map_data: Dict[str, Any], match_id: str, won: Optional[bool] = None) -> List[Dict[str, Any]]:
+    """
+    player_games rows for one VALORANT map's agent picks (every listed
+    player's agent in their first round), stored with the agent as champion
+    """
+    rows: Dict[str, Dict[str, Any]] = {}
+    if won is None:
+        wins = sum(1 for round_data in map_data.get("rounds", []) if round_data.get("team_won"))
+        won = wins * 2 > len(map_data.get("rounds", []))
+    for round_data in map_data.get("rounds", []):
+        for side in ("attackers", "defenders"):
+            team = round_data.get(f"{side}_team_name")
+            if not team:
+                continue
+            for player in round_data.get(side) or ():
+                if player.get("name") and player.get("agent") and player["name"] not in rows:
+                    rows[player["name"]] = {
+                        "match_id": match_id, "game": "valorant", "player_name": player["name"],
+                        "team": team, "opponent": next((t for t in map_data.get("teams") or () if t != team), None),
+                        "tournament": map_data.get("tournament"), "champion": player["agent"],
+                        "map": map_data.get("map"),
+                        # Round results are ours; the opponent's side, if listed, won the rest
+                        "win": (not won) if team == map_data.get("opponent") else won
+                    }
+    return list(rows.values())
+
+
+def _rates(games: int, wins: int, total: int) -> Dict[str, Any]:
+    return {
+        "games": games,
+        "wins": wins,
+        "win_rate": round(wins / games * 100, 1) if games else 0.0,
+        "pick_rate": round(games / total * 100, 1) if total else 0.0
+    }
+
+
+class _PickCounts:
+    """[games, wins] per pick for one player or team, over `games` games"""
+
+    __slots__ = ("name", "games", "picks")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.games = 0
+        self.picks: Dict[str, List[int]] = {}
+
+    def add(self, pick: str, win: bool) -> None:
+        counts = self.picks.setdefault(pick, [0, 0])
+        counts[0] += 1
+        counts[1] += win
+
+    def ranked(self) -> List[Dict[str, Any]]:
+        ranked = sorted(self.picks.items(), key=lambda item: (-item[1][0], -item[1][1], item[0]))
+        return [{"pick": pick, **_rates(games, wins, self.games)} for pick, (games, wins) in ranked]
+
+
+class _TeamCompositions:
+    """[games, wins] per composition for one team, plus its most played"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.games = 0
+        self.compositions: Dict[Composition, List[int]] = {}
+        self.top: List[Composition] = []
+
+    def add(self, composition: Composition, win: bool) -> None:
+        self.games += 1
+        counts = self.compositions.setdefault(composition, [0, 0])
+        counts[0] += 1
+        counts[1] += win
+        if composition not in self.top:
+            if len(self.top) < TOP_COMPOSITIONS:
+                self.top.append(composition)
+            elif counts[0] > self.compositions[self.top[-1]][0]:
+                self.top[-1] = composition
+            else:
+                return
+        self.top.sort(key=lambda comp: (-self.compositions[comp][0], -self.compositions[comp][1]))
+
+    def entry(self, composition: Composition) -> Optional[Dict[str, Any]]:
+        counts = self.compositions.get(composition)
+        if counts is None:
+            return None
+        map_name, picks = composition
+        entry = {"composition": list(picks), **_rates(counts[0], counts[1], self.games)}
+        if map_name is not None:
+            entry["map"] = map_name
+        return entry
+
+
+class DraftAnalytics:
+    def __init__(self):
+        # (game, key) -> counters
+        self._players: Dict[Tuple[str, str], _PickCounts] = {}
+        self._opponents: Dict[Tuple[str, str], _PickCounts] = {}
+        self._teams: Dict[Tuple[str, str], _TeamCompositions] = {}
+        # (game, key) -> materialized view
+        self._player_views: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._opponent_views: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._team_views: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._seen_picks = set()
+
+    def ingest(self, player_games: Iterable[Dict[str, Any]]) -> int:
+        """
+        Fold player-game rows (player_name, team, champion or agent, win,
+        match_id, game, map for VALORANT) into the counters; returns rows counted
+        """
+        players = set()
+        teams = set()
+        # (game, team key, match_id) -> (team name, map, win, picks)
+        lineups: Dict[Tuple[str, str, Any], Tuple[str, Optional[str], bool, List[str]]] = {}
+        counted = 0
+        for row in player_games:
+            pick = row.get("champion") or row.get("agent")
+            if not pick or pick == "Unknown" or not row.get("player_name"):
+                continue
+            dedupe_key = (row.get("match_id"), row["player_name"])
+            if dedupe_key in self._seen_picks:
+                continue
+            self._seen_picks.add(dedupe_key)
+            counted += 1
+            game = row.get("game") or "lol"
+            win = bool(row.get("win"))
+
+            player_key = (game, _key(row["player_name"]))
+            player = self._players.get(player_key)
+            if player is None:
+                player = self._players[player_key] = _PickCounts(row["player_name"])
+            player.games += 1
+            player.add(pick, win)
+            players.add(player_key)
+
+            if row.get("team"):
+                team_key = (game, _key(row["team"]))
+                lineup = lineups.setdefault((game, team_key[1], row.get("match_id")),
+                                            (row["team"], row.get("map"), win, []))
+                lineup[3].append(pick)
+                teams.add(team_key)
+
+        for (game, team_key, _), (team_name, map_name, win, picks) in lineups.items():
+            key = (game, team_key)
+            opponent = self._opponents.get(key)
+            if opponent is None:
+                opponent = self._opponents[key] = _PickCounts(team_name)
+            opponent.games += 1
+            for pick in picks:
+                opponent.add(pick, win)
+            compositions = self._teams.get(key)
+            if compositions is None:
+                compositions = self._teams[key] = _TeamCompositions(team_name)
+            compositions.add((map_name, tuple(sorted(picks))), win)
+
+        for key in players:
+            self._player_views[key] = self._materialize_player(key)
+        for key in teams:
+            self._opponent_views[key] = self._materialize_opponent(key)
+            self._team_views[key] = self._materialize_team(key)
+        return counted
+
+    def load(self, store) -> int:
+        """Rebuild counters from a StatsStore at startup"""
+        return self.ingest(store.iter_player_games())
+
+    def _materialize_player(self, key: Tuple[str, str]) -> Dict[str, Any]:
+        player = self._players[key]
+        picks = player.ranked()
+        return {
+            "player_name": player.name,
+            "game": key[0],
+            "games": player.games,
+            "picks": picks,
+            "comfort_picks": [pick for pick in picks if pick["games"] >= COMFORT_MIN_GAMES][:COMFORT_PICKS]
+        }
+
+    def _materialize_opponent(self, key: Tuple[str, str]) -> Dict[str, Any]:
+        team = self._opponents[key]
+        return {"team": team.name, "game": key[0], "games": team.games, "picks": team.ranked()}
+
+    def _materialize_team(self, key: Tuple[str, str]) -> Dict[str, Any]:
+        team = self._teams[key]
+        return {
+            "team": team.name,
+            "game": key[0],
+            "games": team.games,
+            "distinct_compositions": len(team.compositions),
+            "compositions": [team.entry(composition) for composition in team.top]
+        }
+
+    def player(self, player_name: str, game: str = "lol") -> Optional[Dict[str, Any]]:
+        """Pick and win rates per champion/agent, and comfort picks"""
+        return self._player_views.get((game, _key(player_name)))
+
+    def opponent_picks(self, team: str, game: str = "lol") -> Optional[Dict[str, Any]]:
+        """What a team picks and how each pick fares, for drafting against them"""
+        return self._opponent_views.get((game, _key(team)))
+
+    def compositions(self, team: str, game: str = "lol") -> Optional[Dict[str, Any]]:
+        """A team's most played compositions and their win rates"""
+        return self._team_views.get((game, _key(team)))
+
+    def composition(self, team: str, picks: List[str], game: str = "lol",
+                    map_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Games and win rate of one exact composition"""
+        compositions = self._teams.get((game, _key(team)))
+        if compositions is None:
+            return None
+        return compositions.entry((map_name, tuple(sorted(picks))))
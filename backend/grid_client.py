@@ -1,6 +1,16 @@
-import httpx
+import asyncio
+import json
 import os
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
+from resilience import (
+    CircuitBreaker, EndpointCounters, GridUnavailableError, ResponseCache, TokenBucket, backoff_delay
+)
+from metrics import GRID_REQUESTS, GRID_REQUEST_DURATION, GRID_RESPONSE_BYTES, record_cache_lookup
+from tracing import span
 
 load_dotenv()
 
@@ -8,6 +18,136 @@ GRID_API_KEY = os.getenv("GRID_API_KEY")
 GRID_CENTRAL_DATA_URL = os.getenv("GRID_CENTRAL_DATA_URL", "https://api.grid.gg/central-data/graphql")
 GRID_FILE_DOWNLOAD_URL = os.getenv("GRID_FILE_DOWNLOAD_URL", "https://api.grid.gg/file-download/end-state/grid/series/")
 
+# Resilience settings - size the bucket to the GRID quota for this API key
+GRID_RATE_LIMIT = float(os.getenv("GRID_RATE_LIMIT", "10"))  # requests per second
+GRID_RATE_BURST = float(os.getenv("GRID_RATE_BURST", "20"))
+GRID_MAX_RETRIES = int(os.getenv("GRID_MAX_RETRIES", "3"))
+GRID_BACKOFF_BASE = float(os.getenv("GRID_BACKOFF_BASE", "0.5"))  # seconds
+GRID_BACKOFF_MAX = float(os.getenv("GRID_BACKOFF_MAX", "20"))  # seconds
+GRID_BREAKER_THRESHOLD = int(os.getenv("GRID_BREAKER_THRESHOLD", "5"))
+GRID_BREAKER_RESET = float(os.getenv("GRID_BREAKER_RESET", "30"))  # seconds
+# Last-good responses kept for outages, bounded by their body bytes (end states are large)
+GRID_CACHE_MAX_BYTES = int(os.getenv("GRID_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Shared by every GridClient: the quota and GRID's health are per API key, not per client
+_rate_limiter = TokenBucket(GRID_RATE_LIMIT, GRID_RATE_BURST)
+_breakers = {
+    "central-data": CircuitBreaker(GRID_BREAKER_THRESHOLD, GRID_BREAKER_RESET),
+    "file-download": CircuitBreaker(GRID_BREAKER_THRESHOLD, GRID_BREAKER_RESET),
+}
+_counters = {endpoint: EndpointCounters() for endpoint in _breakers}
+_response_cache = ResponseCache(max_bytes=GRID_CACHE_MAX_BYTES)
+
+# One connection pool per event loop: building an AsyncClient per request costs
+# an SSL context (~ms of CPU on the loop) and a fresh connection every call
+_http_client = None
+_http_client_loop = None
+
+
+def _shared_http_client():
+    global _http_client, _http_client_loop
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient()
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared connection pool (app shutdown)"""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+@lru_cache(maxsize=64)
+def graphql_operation_name(query: str) -> str:
+    """Operation name of a GraphQL document, used as the metrics label"""
+    match = re.search(r"\b(?:query|mutation)\s+(\w+)", query)
+    return match.group(1) if match else "anonymous"
+
+
+def grid_resilience_status() -> Dict[str, Any]:
+    """Breaker states, per-endpoint counters and limiter/cache state"""
+    return {
+        "endpoints": {
+            endpoint: {
+                "circuit_state": breaker.state,
+                "times_opened": breaker.times_opened,
+                **_counters[endpoint].as_dict()
+            }
+            for endpoint, breaker in _breakers.items()
+        },
+        "rate_limiter": {
+            "rate_per_second": _rate_limiter.rate,
+            "burst": _rate_limiter.capacity,
+            "waits": _rate_limiter.waits
+        },
+        "cached_responses": len(_response_cache),
+        "cached_response_bytes": _response_cache.total_bytes
+    }
+
+# Selectable allSeries node fields and the GraphQL selection each one expands to
+SERIES_FIELD_SELECTIONS = {
+    "id": "id",
+    "startTimeScheduled": "startTimeScheduled",
+    "title": "title { id name }",
+    "tournament": "tournament { id name }",
+    "teams": "teams { baseInfo { name } }",
+    "format": "format { name }",
+}
+DEFAULT_SERIES_FIELDS = ("id", "title", "tournament")
+
+
+@lru_cache(maxsize=256)
+def compile_series_batch_query(title_ids: Tuple[int, ...], fields: Tuple[str, ...]) -> str:
+    """
+    Build (once per title set and field selection) an aliased GraphQL document
+    that fetches allSeries for several titles in a single round trip.
+
+    Titles are inlined as literals so the document is fully determined by its
+    cache key; only the page size is a variable.
+    """
+    unknown = [f for f in fields if f not in SERIES_FIELD_SELECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown series fields: {', '.join(unknown)}")
+
+    selection = "\n".join(f"        {SERIES_FIELD_SELECTIONS[f]}" for f in fields)
+    blocks = []
+    for title_id in title_ids:
+        blocks.append(f"""
+  t{title_id}: allSeries(
+    first: $limit,
+    filter: {{ titleId: "{title_id}", types: ESPORTS }}
+    orderBy: StartTimeScheduled
+    orderDirection: DESC
+  ) {{
+    edges {{
+      cursor
+      node {{
+{selection}
+      }}
+    }}
+  }}""")
+
+    return "query GetMultiTitleSeries($limit: Int!) {" + "".join(blocks) + "\n}"
+
+
+def parse_series_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Turn a comma-separated field list into a normalized selection tuple ('id' is always included)"""
+    if not fields:
+        return DEFAULT_SERIES_FIELDS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in SERIES_FIELD_SELECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown series fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id"] + requested))
+
 class GridClient:
     def __init__(self):
         self.headers = {
@@ -15,11 +155,107 @@ class GridClient:
             "Content-Type": "application/json"
         }
 
-    async def get_recent_series(self, title_id: int = 3): # Default to LoL (3)
+    async def _request_json(self, endpoint: str, method: str, url: str, cache_key: Any,
+                            forbidden_message: str, operation: str, timeout: float = 30.0, **kwargs) -> Any:
+        """
+        Send a GRID request through the shared rate limiter, retry policy and the
+        endpoint's circuit breaker, returning the decoded JSON body
+
+        429/5xx/transport errors are retried with jittered exponential backoff
+        (honoring Retry-After). If they persist, or the circuit is open, the last
+        good response for the same request is served; without one,
+        GridUnavailableError is raised.
+        """
+        # Deferred so importing the API module doesn't pay for httpx until GRID is first called
+        import httpx
+
+        breaker = _breakers[endpoint]
+        counters = _counters[endpoint]
+        counters.requests += 1
+
+        if not breaker.allow_request():
+            counters.short_circuited += 1
+            return self._serve_cached(endpoint, cache_key, "circuit open")
+
+        settled = False
+        try:
+            last_error = None
+            for attempt in range(GRID_MAX_RETRIES + 1):
+                await _rate_limiter.acquire()
+                retry_after = None
+                started = time.perf_counter()
+                try:
+                    with span("grid.request", endpoint=endpoint, query=operation, attempt=attempt) as request_span:
+                        response = await _shared_http_client().request(
+                            method, url, headers=self.headers, timeout=timeout, **kwargs
+                        )
+                        request_span.set(status=response.status_code, bytes=len(response.content))
+                except httpx.TransportError as e:
+                    GRID_REQUEST_DURATION.observe(time.perf_counter() - started, endpoint=endpoint, query=operation)
+                    GRID_REQUESTS.inc(endpoint=endpoint, query=operation, status="transport_error")
+                    counters.transport_errors += 1
+                    last_error = f"{type(e).__name__}: {e}"
+                else:
+                    GRID_REQUEST_DURATION.observe(time.perf_counter() - started, endpoint=endpoint, query=operation)
+                    GRID_REQUESTS.inc(endpoint=endpoint, query=operation, status=str(response.status_code))
+                    GRID_RESPONSE_BYTES.observe(len(response.content), endpoint=endpoint, query=operation)
+                    if response.status_code == 200:
+                        with span("grid.json_decode", endpoint=endpoint, query=operation):
+                            data = response.json()
+                        breaker.record_success()
+                        settled = True
+                        counters.successes += 1
+                        _response_cache.put((endpoint, cache_key), data, len(response.content))
+                        return data
+
+                    if response.status_code not in RETRYABLE_STATUS:
+                        # GRID answered; the request itself is the problem
+                        breaker.record_success()
+                        settled = True
+                        counters.failures += 1
+                        if response.status_code == 403:
+                            raise Exception(forbidden_message)
+                        raise Exception(f"GRID request failed with status {response.status_code}: {response.text}")
+
+                    retry_after = response.headers.get("Retry-After")
+                    if response.status_code == 429:
+                        counters.rate_limited += 1
+                    else:
+                        counters.server_errors += 1
+                    last_error = f"status {response.status_code}"
+
+                if attempt < GRID_MAX_RETRIES:
+                    counters.retries += 1
+                    delay = backoff_delay(attempt, GRID_BACKOFF_BASE, GRID_BACKOFF_MAX, retry_after)
+                    if retry_after is not None:
+                        # Hold every caller back, not just this one
+                        _rate_limiter.penalize(delay)
+                    await asyncio.sleep(delay)
+
+            breaker.record_failure()
+            settled = True
+            counters.failures += 1
+            return self._serve_cached(endpoint, cache_key, last_error)
+        finally:
+            if not settled:
+                # Cancelled or unexpected error mid-request: free a half-open trial slot
+                breaker.release_trial()
+
+    def _serve_cached(self, endpoint: str, cache_key: Any, reason: str) -> Any:
+        cached = _response_cache.get((endpoint, cache_key))
+        record_cache_lookup("grid_response", cached is not None)
+        if cached is None:
+            _counters[endpoint].cache_misses += 1
+            raise GridUnavailableError(f"GRID {endpoint} unavailable ({reason}) and no cached response")
+        _counters[endpoint].served_from_cache += 1
+        return cached
+
+    async def get_recent_series(self, title_id: int = 3, first: int = 10, after: str = None): # Default to LoL (3)
         query = """
-        query GetRecentSeries($titleId: ID!) {
+        query GetRecentSeries($titleId: ID!, $first: Int!, $after: Cursor) {
           allSeries(
-            first: 10,
+            first: $first,
+            after: $after,
             filter: {
               titleId: $titleId
               types: ESPORTS
@@ -27,7 +263,12 @@ class GridClient:
             orderBy: StartTimeScheduled
             orderDirection: DESC
           ) {
+            pageInfo {
+              hasNextPage
+              endCursor
+            }
             edges {
+              cursor
               node {
                 id
                 tournament {
@@ -38,22 +279,130 @@ class GridClient:
           }
         }
         """
-        variables = {"titleId": str(title_id)}
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                GRID_CENTRAL_DATA_URL,
-                json={"query": query, "variables": variables},
-                headers=self.headers
-            )
-            if response.status_code == 403:
-                 raise Exception("403 Forbidden: GRID API key lacks 'Central Data' permissions")
-            response.raise_for_status()
-            data = response.json()
-            if "errors" in data:
-                error_msgs = [err.get("message", "Unknown error") for err in data["errors"]]
-                if any("forbidden" in msg.lower() or "permission" in msg.lower() for msg in error_msgs):
-                     raise Exception(f"403 Forbidden: GRID API permissions error - {error_msgs[0]}")
-            return data
+        variables = {"titleId": str(title_id), "first": first, "after": after}
+        data = await self._post_graphql(query, variables, raise_on_errors=False)
+        if "errors" in data:
+            error_msgs = [err.get("message", "Unknown error") for err in data["errors"]]
+            if any("forbidden" in msg.lower() or "permission" in msg.lower() for msg in error_msgs):
+                 raise Exception(f"403 Forbidden: GRID API permissions error - {error_msgs[0]}")
+        return data
+
+    async def _post_graphql(self, query: str, variables: dict, timeout: float = 30.0, raise_on_errors: bool = True):
+        """POST a GraphQL document to Central Data and return the decoded body"""
+        data = await self._request_json(
+            "central-data",
+            "POST",
+            GRID_CENTRAL_DATA_URL,
+            cache_key=(query, json.dumps(variables, sort_keys=True)),
+            forbidden_message="403 Forbidden: GRID API key lacks 'Central Data' permissions",
+            operation=graphql_operation_name(query),
+            timeout=timeout,
+            json={"query": query, "variables": variables}
+        )
+        if "errors" in data and raise_on_errors:
+            error_msgs = [err.get("message", "Unknown error") for err in data["errors"]]
+            if any("forbidden" in msg.lower() or "permission" in msg.lower() for msg in error_msgs):
+                raise Exception(f"403 Forbidden: GRID API permissions error - {error_msgs[0]}")
+            raise Exception(f"GraphQL Error: {error_msgs[0]}")
+        return data
+
+    async def get_series_page(self, title_id: int = 3, first: int = 50, after: str = None,
+                              tournament_id: str = None, start_from: str = None, start_to: str = None):
+        """
+        Fetch one page of allSeries, newest first
+
+        Returns {"series": [node, ...], "has_next_page": bool, "end_cursor": str}
+        """
+        query = """
+        query GetSeriesPage($first: Int!, $after: Cursor, $filter: SeriesFilter) {
+          allSeries(
+            first: $first,
+            after: $after,
+            filter: $filter
+            orderBy: StartTimeScheduled
+            orderDirection: DESC
+          ) {
+            pageInfo {
+              hasNextPage
+              endCursor
+            }
+            edges {
+              cursor
+              node {
+                id
+                startTimeScheduled
+                title {
+                  id
+                  name
+                }
+                tournament {
+                  id
+                  name
+                }
+              }
+            }
+          }
+        }
+        """
+        series_filter = {"titleId": str(title_id), "types": "ESPORTS"}
+        if tournament_id:
+            series_filter["tournamentId"] = str(tournament_id)
+        if start_from or start_to:
+            series_filter["startTimeScheduled"] = {}
+            if start_from:
+                series_filter["startTimeScheduled"]["gte"] = start_from
+            if start_to:
+                series_filter["startTimeScheduled"]["lte"] = start_to
+
+        variables = {"first": first, "after": after, "filter": series_filter}
+        data = await self._post_graphql(query, variables)
+
+        all_series = (data.get("data") or {}).get("allSeries") or {}
+        page_info = all_series.get("pageInfo") or {}
+        edges = all_series.get("edges", [])
+        return {
+            "edges": edges,
+            "series": [edge.get("node", {}) for edge in edges],
+            "has_next_page": bool(page_info.get("hasNextPage")),
+            "end_cursor": page_info.get("endCursor")
+        }
+
+    async def iter_series_pages(self, title_id: int = 3, page_size: int = 50, after: str = None, **filters):
+        """
+        Async iterator over allSeries pages, following cursors until the last page
+
+        The next page is requested as soon as the current one arrives, so the
+        caller's processing of a page overlaps the round trip for the next.
+        Accepts the same filters as get_series_page.
+        """
+        next_page = asyncio.ensure_future(self.get_series_page(title_id, first=page_size, after=after, **filters))
+        try:
+            while next_page is not None:
+                page = await next_page
+                next_page = None
+                if page["has_next_page"] and page["end_cursor"]:
+                    next_page = asyncio.ensure_future(
+                        self.get_series_page(title_id, first=page_size, after=page["end_cursor"], **filters)
+                    )
+                yield page
+        finally:
+            # Caller stopped early - drop the prefetched page
+            if next_page is not None and not next_page.done():
+                next_page.cancel()
+
+    async def iter_series(self, title_id: int = 3, page_size: int = 50, after: str = None, limit: int = None, **filters):
+        """Async iterator over allSeries edges (each with its cursor), optionally capped at `limit`"""
+        yielded = 0
+        pages = self.iter_series_pages(title_id, page_size=page_size, after=after, **filters)
+        try:
+            async for page in pages:
+                for edge in page["edges"]:
+                    yield edge
+                    yielded += 1
+                    if limit is not None and yielded >= limit:
+                        return
+        finally:
+            await pages.aclose()
 
     async def get_series_details_graphql(self, series_id: str):
         """Fetch series details via GraphQL - simplified query"""
@@ -72,87 +421,50 @@ class GridClient:
         }
         """
         variables = {"seriesId": str(series_id)}
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                GRID_CENTRAL_DATA_URL,
-                json={"query": query, "variables": variables},
-                headers=self.headers
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"GraphQL request failed with status {response.status_code}: {response.text}")
-            
-            data = response.json()
-            
-            if "errors" in data:
-                error_details = data['errors'][0] if data['errors'] else {}
-                raise Exception(f"GraphQL Error: {error_details.get('message', 'Unknown error')}")
-            
-            return data
+        return await self._post_graphql(query, variables)
 
     async def get_series_end_state(self, series_id: str):
         url = f"{GRID_FILE_DOWNLOAD_URL}{series_id}"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers=self.headers
-            )
-            if response.status_code == 403:
-                raise Exception(f"403 Forbidden: GRID API key lacks 'File Download' permissions for series {series_id}")
-            response.raise_for_status()
-            return response.json()
-
-    async def get_multiple_games_series(self, title_ids: list[int], limit_per_game: int = 10):
-        """Fetch recent series from multiple games simultaneously"""
-        import asyncio
-        
-        async def fetch_game_series(title_id: int):
-            try:
-                query = """
-                query GetRecentSeries($titleId: ID!, $limit: Int!) {
-                  allSeries(
-                    first: $limit,
-                    filter: {
-                      titleId: $titleId
-                      types: ESPORTS
-                    }
-                    orderBy: StartTimeScheduled
-                    orderDirection: DESC
-                  ) {
-                    edges {
-                      node {
-                        id
-                        title {
-                          id
-                          name
-                        }
-                        tournament {
-                          name
-                        }
-                      }
-                    }
-                  }
-                }
-                """
-                variables = {"titleId": str(title_id), "limit": limit_per_game}
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(
-                        GRID_CENTRAL_DATA_URL,
-                        json={"query": query, "variables": variables},
-                        headers=self.headers
-                    )
-                    if response.status_code == 403:
-                        return {"title_id": title_id, "error": "403 Forbidden", "data": None}
-                    response.raise_for_status()
-                    data = response.json()
-                    if "errors" in data:
-                        return {"title_id": title_id, "error": data["errors"][0].get("message"), "data": None}
-                    return {"title_id": title_id, "error": None, "data": data}
-            except Exception as e:
-                return {"title_id": title_id, "error": str(e), "data": None}
-        
-        # Fetch all games concurrently
-        tasks = [fetch_game_series(title_id) for title_id in title_ids]
-        results = await asyncio.gather(*tasks)
-        
+        return await self._request_json(
+            "file-download",
+            "GET",
+            url,
+            cache_key=str(series_id),
+            forbidden_message=f"403 Forbidden: GRID API key lacks 'File Download' permissions for series {series_id}",
+            operation="end-state"
+        )
+
+    async def get_multiple_games_series(self, title_ids: List[int], limit_per_game: int = 10,
+                                        fields: Tuple[str, ...] = DEFAULT_SERIES_FIELDS) -> List[Dict]:
+        """
+        Fetch recent series for several titles in one aliased GraphQL request
+
+        Returns one entry per title: {"title_id", "error", "data"}, where data has
+        the same {"data": {"allSeries": {...}}} shape as a single-title query.
+        """
+        title_ids = list(dict.fromkeys(title_ids))
+        query = compile_series_batch_query(tuple(title_ids), tuple(fields))
+
+        try:
+            data = await self._post_graphql(query, {"limit": limit_per_game}, raise_on_errors=False)
+        except Exception as e:
+            error = "403 Forbidden" if "403" in str(e) else str(e)
+            return [{"title_id": title_id, "error": error, "data": None} for title_id in title_ids]
+
+        # Attribute GraphQL errors to the alias (title) they came from
+        errors_by_alias = {}
+        for err in data.get("errors", []):
+            path = err.get("path") or []
+            alias = path[0] if path else None
+            errors_by_alias.setdefault(alias, err.get("message", "Unknown error"))
+
+        body = data.get("data") or {}
+        results = []
+        for title_id in title_ids:
+            alias = f"t{title_id}"
+            error = errors_by_alias.get(alias) or (errors_by_alias.get(None) if body.get(alias) is None else None)
+            if body.get(alias) is None:
+                results.append({"title_id": title_id, "error": error or "No data returned", "data": None})
+            else:
+                results.append({"title_id": title_id, "error": error, "data": {"data": {"allSeries": body[alias]}}})
         return results
@@ -0,0 +1,244 @@
+"""
+In-process job queue for long-running analyses.
+
+Clients submit a job, get its ID back immediately and then poll it or
+subscribe to its updates, instead of holding an HTTP request open for a
+season-long analysis. No broker: jobs live in this process's memory.
+
+- Bounded concurrency: JOB_WORKERS jobs run at once; at most JOB_MAX_QUEUED
+  wait, beyond which submit raises QueueFullError.
+- Priorities: every "live" job is started before any "batch" job, FIFO
+  within a priority.
+- Retention: finished jobs (and their results) are kept for JOB_RESULT_TTL
+  seconds, then forgotten.
+- Cancellation: a queued job is dropped; a running job's handler is
+  cancelled. Work already handed to a worker process finishes there, but its
+  result is discarded.
+
+Handlers are `async def handler(job, params)`; they may call
+`job.report(progress, stage)` and return the result, which is stored as is.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import tracing
+from metrics import JOBS, JOB_DURATION, JOBS_QUEUED
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "1000"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))  # seconds
+
+PRIORITIES = {"live": 0, "batch": 1}
+TERMINAL_STATES = ("succeeded", "failed", "cancelled")
+
+Handler = Callable[["Job", Dict[str, Any]], Awaitable[Any]]
+
+
+class QueueFullError(Exception):
+    """Raised by submit() when JOB_MAX_QUEUED jobs are already waiting"""
+
+
+class Job:
+    def __init__(self, kind: str, params: Dict[str, Any], priority: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.priority = priority
+        self.status = "queued"
+        self.progress = 0.0
+        self.stage: Optional[str] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Bumped on every change; subscribers wait for it to move past what they last saw
+        self.version = 0
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATES
+
+    def _touch(self) -> None:
+        self.version += 1
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def report(self, progress: float, stage: Optional[str] = None) -> None:
+        """Progress update from the handler: 0.0-1.0 and an optional stage label"""
+        self.progress = max(0.0, min(1.0, progress))
+        if stage is not None:
+            self.stage = stage
+        self._touch()
+
+    async def wait_for_change(self, seen_version: int, timeout: Optional[float] = None) -> bool:
+        """Wait until version > seen_version; False on timeout"""
+        if self.version > seen_version:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def summary(self) -> Dict[str, Any]:
+        """Everything but the result"""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "priority": self.priority,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "stage": self.stage,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "version": self.version
+        }
+
+
+class JobQueue:
+    def __init__(self, workers: int = JOB_WORKERS, max_queued: int = JOB_MAX_QUEUED,
+                 result_ttl: float = JOB_RESULT_TTL):
+        self.worker_count = max(1, workers)
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self._handlers: Dict[str, Handler] = {}
+        self._default_priority: Dict[str, str] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._workers: List[asyncio.Task] = []
+
+    def register(self, kind: str, handler: Handler, priority: str = "batch") -> None:
+        self._handlers[kind] = handler
+        self._default_priority[kind] = priority
+
+    @property
+    def kinds(self) -> List[str]:
+        return sorted(self._handlers)
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self) -> None:
+        for job in self._jobs.values():
+            if not job.done:
+                self.cancel(job.id)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _queued_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == "queued")
+
+    def _purge_expired(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, kind: str, params: Optional[Dict[str, Any]] = None, priority: Optional[str] = None) -> Job:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind '{kind}'. Must be one of: {', '.join(self.kinds)}")
+        priority = priority or self._default_priority[kind]
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of: {', '.join(PRIORITIES)}")
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        self._purge_expired()
+        if self._queued_count() >= self.max_queued:
+            raise QueueFullError(f"{self.max_queued} jobs already queued")
+
+        job = Job(kind, params or {}, priority)
+        self._jobs[job.id] = job
+        self._queue.put_nowait((PRIORITIES[priority], next(self._sequence), job.id))
+        JOBS.inc(kind=kind, status="queued")
+        JOBS_QUEUED.inc(priority=priority)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        self._purge_expired()
+        return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return job
+        if job.status == "queued":
+            # Left in the heap; the worker that pops it skips it
+            JOBS_QUEUED.dec(priority=job.priority)
+            self._finish(job, "cancelled")
+        elif job._task is not None:
+            job._task.cancel()
+        return job
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        if job.done:
+            return
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        if status == "succeeded":
+            job.progress = 1.0
+        job._touch()
+        JOBS.inc(kind=job.kind, status=status)
+        if job.started_at is not None:
+            JOB_DURATION.observe(job.finished_at - job.started_at, kind=job.kind)
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            JOBS_QUEUED.dec(priority=job.priority)
+            job.status = "running"
+            job.started_at = time.time()
+            job._touch()
+            job._task = asyncio.ensure_future(self._run(job))
+            try:
+                await asyncio.shield(job._task)
+            except asyncio.CancelledError:
+                if not job._task.done():
+                    # The worker itself is being stopped
+                    job._task.cancel()
+                    raise
+            finally:
+                # No-op unless cancelled before the handler ran or the worker is stopping
+                self._finish(job, "cancelled")
+                job._task = None
+
+    async def _run(self, job: Job) -> None:
+        with tracing.trace(f"job {job.kind}", job_id=job.id, priority=job.priority):
+            try:
+                result = await self._handlers[job.kind](job, job.params)
+            except asyncio.CancelledError:
+                self._finish(job, "cancelled")
+            except Exception as e:
+                logger.exception("Job %s (%s) failed", job.id, job.kind)
+                self._finish(job, "failed", error=str(e) or type(e).__name__)
+            else:
+                self._finish(job, "succeeded", result=result)
+
+
+queue = JobQueue()
@@ -0,0 +1,222 @@
+"""
+Live in-series VALORANT ingestion.
+
+A LiveSession follows one match as it is played. Each round updates a
+ValorantReviewAccumulator in O(1), so the review agenda (pistols, round-2
+force buys, late-execute losses, site success, orbs) is current between
+rounds, maps or during timeouts, not only after the match.
+
+Events are JSON objects with a `type` and an increasing `sequence`:
+    {"sequence": 1, "type": "series-started", "match": {"match_id", "match_type", "opponent", "map"}}
+    {"sequence": 2, "type": "kill", "round_num": 1, "kill": {"time": 23.4, "killer": ..., "victim": ...}}
+    {"sequence": 3, "type": "round-ended", "round": {...}}  # a match_data["rounds"] entry
+    {"sequence": 4, "type": "orbs", "team_orbs_collected": 4, "enemy_orbs_collected": 5}
+    {"sequence": 5, "type": "series-ended", "final_score": "13-11"}
+Kills are indexed by time as they arrive (see valorant_kills.py) and attached
+to their round when it ends, unless the round carries its own kill_events, so
+KAST, first deaths and trades come from the kills. Unknown types and events
+with a non-integer sequence are ignored; events at or below the last applied
+sequence are skipped, so replays and reconnects are idempotent.
+
+They arrive either pushed to the API (POST /live/valorant/{match_id}/events)
+or pulled from a feed: newline-delimited JSON streamed from `feed_url`,
+resumed with ?after=<last sequence> after a dropped connection (see
+benchmarks/replay_feed.py for a local replay server).
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import LIVE_EVENTS, LIVE_FEED_RECONNECTS
+from resilience import backoff_delay
+from valorant_kills import RoundKillIndex
+from valorant_review import ValorantReviewAccumulator
+
+logger = logging.getLogger(__name__)
+
+LIVE_FEED_URL = os.getenv("LIVE_FEED_URL", "")  # template with {match_id}
+LIVE_FEED_READ_TIMEOUT = float(os.getenv("LIVE_FEED_READ_TIMEOUT", "60"))  # seconds without a line
+LIVE_FEED_MAX_RETRIES = int(os.getenv("LIVE_FEED_MAX_RETRIES", "10"))  # reconnects without a new event
+
+
+class LiveSession:
+    def __init__(self, match_id: str, feed_url: Optional[str] = None,
+                 on_update: Optional[Callable[["LiveSession"], None]] = None):
+        self.match_id = match_id
+        self.feed_url = feed_url
+        self.on_update = on_update
+        self.state = ValorantReviewAccumulator(match_id)
+        self.status = "waiting"  # waiting -> live -> ended, or stopped / failed
+        self.last_sequence = 0
+        self.events_applied = 0
+        self.started_at = time.time()
+        self.updated_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        # round_num -> kills seen before its round-ended event
+        self._kills: Dict[int, RoundKillIndex] = {}
+
+    def apply(self, event: Dict[str, Any]) -> bool:
+        """Apply one event; False if it was skipped as already applied or unknown"""
+        sequence = event.get("sequence")
+        if sequence is not None and (not isinstance(sequence, int) or isinstance(sequence, bool)):
+            LIVE_EVENTS.inc(type="invalid")
+            return False
+        if sequence is not None:
+            if sequence <= self.last_sequence:
+                return False
+            self.last_sequence = sequence
+
+        event_type = event.get("type")
+        state = self.state
+        if event_type == "round-ended" and isinstance(event.get("round"), dict):
+            round_data = event["round"]
+            kills = self._kills.pop(round_data.get("round_num"), None)
+            if kills and not round_data.get("kill_events"):
+                round_data = {**round_data, "kill_events": kills.events}
+            state.add_round(round_data)
+        elif event_type == "kill" and isinstance(event.get("kill"), dict):
+            self._kills.setdefault(event.get("round_num"), RoundKillIndex()).add(event["kill"])
+        elif event_type == "orbs":
+            state.set_orbs(event.get("team_orbs_collected", state.team_orbs),
+                           event.get("enemy_orbs_collected", state.enemy_orbs))
+        elif event_type == "series-started":
+            match = event.get("match") or {}
+            state.match_type = match.get("match_type", state.match_type)
+            state.opponent = match.get("opponent", state.opponent)
+            state.map = match.get("map", state.map)
+        elif event_type == "series-ended":
+            state.final_score = event.get("final_score", state.score)
+            self.status = "ended"
+        else:
+            LIVE_EVENTS.inc(type="ignored")
+            return False
+
+        if self.status == "waiting":
+            self.status = "live"
+        self.events_applied += 1
+        self.updated_at = time.time()
+        LIVE_EVENTS.inc(type=event_type)
+        if self.on_update is not None:
+            self.on_update(self)
+        return True
+
+    def agenda(self) -> Dict[str, Any]:
+        """The review agenda for the rounds played so far, plus session status"""
+        return {**self.state.review(), "live": self.summary()}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "match_id": self.match_id,
+            "status": self.status,
+            "rounds_played": self.state.rounds,
+            "score": self.state.score,
+            "last_sequence": self.last_sequence,
+            "events_applied": self.events_applied,
+            "feed_url": self.feed_url,
+            "started_at": self.started_at,
+            "updated_at": self.updated_at,
+            "error": self.error
+        }
+
+    async def follow(self) -> None:
+        """Stream the feed until the series ends, reconnecting from the last applied sequence"""
+        try:
+            await self._follow()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Anything but a feed error (e.g. an event the state can't apply) ends the session
+            self.status = "failed"
+            self.error = f"{type(e).__name__}: {e}"
+            logger.exception("Live feed for %s failed", self.match_id)
+
+    async def _follow(self) -> None:
+        # Deferred so importing the API module doesn't pay for httpx until a feed is followed
+        import httpx
+
+        failures = 0
+        timeout = httpx.Timeout(10.0, read=LIVE_FEED_READ_TIMEOUT)
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            while self.status not in ("ended", "stopped"):
+                try:
+                    params = {"after": self.last_sequence} if self.last_sequence else None
+                    async with client.stream("GET", self.feed_url, params=params) as response:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            event = json.loads(line) if line.strip() else None
+                            if isinstance(event, dict) and self.apply(event):
+                                failures = 0
+                            if self.status == "ended":
+                                return
+                    # The feed closed before the series ended: reconnect
+                    raise httpx.RemoteProtocolError("Feed closed before series-ended")
+                except (httpx.HTTPError, json.JSONDecodeError) as e:
+                    failures += 1
+                    if failures > LIVE_FEED_MAX_RETRIES:
+                        self.status = "failed"
+                        self.error = f"Feed unavailable after {LIVE_FEED_MAX_RETRIES} retries: {e}"
+                        logger.warning("Live feed for %s failed: %s", self.match_id, e)
+                        return
+                    LIVE_FEED_RECONNECTS.inc()
+                    retry_after = e.response.headers.get("Retry-After") if isinstance(e, httpx.HTTPStatusError) else None
+                    await asyncio.sleep(backoff_delay(failures - 1, 0.5, 10.0, retry_after))
+
+
+class LiveIngestor:
+    """Live sessions by match id"""
+
+    def __init__(self, on_update: Optional[Callable[[LiveSession], None]] = None):
+        self.on_update = on_update
+        self._sessions: Dict[str, LiveSession] = {}
+
+    def session(self, match_id: str) -> LiveSession:
+        """The session for `match_id`, created (without a feed) if needed"""
+        if match_id not in self._sessions:
+            self._sessions[match_id] = LiveSession(match_id, on_update=self.on_update)
+        return self._sessions[match_id]
+
+    def get(self, match_id: str) -> Optional[LiveSession]:
+        return self._sessions.get(match_id)
+
+    def follow(self, match_id: str, feed_url: Optional[str] = None) -> LiveSession:
+        """Start (or keep) following a match's feed in the background"""
+        feed_url = feed_url or (LIVE_FEED_URL.format(match_id=match_id) if LIVE_FEED_URL else None)
+        if not feed_url:
+            raise ValueError("feed_url is required when LIVE_FEED_URL is not set")
+        session = self.session(match_id)
+        if session._task is not None and not session._task.done():
+            return session
+        session.feed_url = feed_url
+        if session.status in ("stopped", "failed"):
+            session.status = "live" if session.events_applied else "waiting"
+            session.error = None
+        session._task = asyncio.ensure_future(session.follow())
+        return session
+
+    def stop(self, match_id: str) -> Optional[LiveSession]:
+        session = self._sessions.get(match_id)
+        if session is None:
+            return None
+        if session._task is not None and not session._task.done():
+            session._task.cancel()
+        if session.status != "ended":
+            session.status = "stopped"
+        return session
+
+    def remove(self, match_id: str) -> Optional[LiveSession]:
+        session = self.stop(match_id)
+        self._sessions.pop(match_id, None)
+        return session
+
+    def list(self) -> List[LiveSession]:
+        return sorted(self._sessions.values(), key=lambda session: session.started_at, reverse=True)
+
+    async def shutdown(self) -> None:
+        tasks = [s._task for s in self._sessions.values() if s._task is not None and not s._task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,19 +1,66 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Match
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-import pandas as pd
+from datetime import datetime, timezone
 import os
 import json
-from grid_client import GridClient
+import time
+import asyncio
+import hmac
+from grid_client import GridClient, close_http_client, parse_series_fields, grid_resilience_status
+from resilience import GridUnavailableError, ResponseCache
+import metrics
+import tracing
+from profiler import SamplingProfiler, DEFAULT_INTERVAL, MAX_DURATION
 from ai_analyzer import AIAnalyzer
+from trend_tracker import PlayerTrendTracker
+from stats_store import StatsStore
+from ingest import parse_grid_end_state, series_team_stats
+import workers
+import jobs
+from subscriptions import Subscriber, TopicHub
+from live_ingest import LiveIngestor
+from scouting import ScoutingAggregator
+from draft import DraftAnalytics, valorant_pick_rows
+from similarity import PlayerSimilarityIndex
+from valorant_series import analyze_map, map_digest, merge_series
+from review_store import REVIEW_VERSION, ReviewStore, match_digest, materialize_match, review_match_id
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="Cloud9 Assistant Coach API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Spawn analysis workers while the server starts accepting requests
+    workers.pool.start()
+    jobs.queue.start()
+    yield
+    await jobs.queue.stop()
+    await live_matches.shutdown()
+    workers.pool.shutdown()
+    await close_http_client()
+
+app = FastAPI(title="Cloud9 Assistant Coach API", lifespan=lifespan)
 grid = GridClient()
 ai_analyzer = AIAnalyzer()
+stats_store = StatsStore()
+profiler = SamplingProfiler()
+
+# Per-opponent scouting views, rebuilt from the persistent store on startup
+scouting = ScoutingAggregator()
+scouting.load(stats_store)
+
+# Pick / win-rate counters for the /draft/* endpoints, rebuilt the same way
+draft = DraftAnalytics()
+draft.load(stats_store)
+
+# Per-role player stat vectors for similarity search, rebuilt the same way
+similarity = PlayerSimilarityIndex()
+similarity.load(stats_store)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -24,6 +71,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def route_template(request: Request) -> str:
+    """Route path template (e.g. /player/{player_name}/stats) to keep metric labels bounded"""
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", request.url.path)
+    return "unmatched"
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    route = route_template(request)
+    method = request.method
+    metrics.HTTP_REQUESTS_IN_FLIGHT.inc(method=method, route=route)
+    started = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        metrics.HTTP_REQUESTS_IN_FLIGHT.dec(method=method, route=route)
+        metrics.HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=method, route=route, status=status)
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    if not tracing.ENABLED:
+        return await call_next(request)
+    with tracing.trace(
+        "http.request",
+        traceparent=request.headers.get("traceparent"),
+        method=request.method,
+        route=route_template(request)
+    ) as root:
+        response = await call_next(request)
+        root.set(status=response.status_code)
+        if tracing.TRACE_SERVER_TIMING:
+            stages = tracing.current_trace_spans()
+            total_ms = (time.time_ns() - root.start_ns) / 1e6
+            header = tracing.server_timing(stages)
+            response.headers["Server-Timing"] = f"{header}, total;dur={total_ms:.1f}" if header else f"total;dur={total_ms:.1f}"
+            response.headers["Timing-Allow-Origin"] = "*"
+        return response
+
 # In-memory cache for GRID data - separated by game
 # Structure: { 'lol': { 'players': {}, 'team': [] }, 'valorant': { 'players': {}, 'team': [] } }
 game_data_cache = {
@@ -43,6 +133,96 @@ game_data_cache = {
 player_stats_cache = {}
 team_stats_cache = []
 
+# Incremental per-player trend state, updated once per ingested game
+player_trends: Dict[str, PlayerTrendTracker] = {}
+
+# Bumped whenever ingestion changes the player/team caches; memoized analyses
+# are valid only for the generation they were computed at
+ingest_generation = 0
+roster_analysis_cache: Dict[str, Any] = {"generation": -1, "analysis": None, "pending": None}
+
+# Per-map VALORANT series analyses by content digest, so reviewing a series
+# again with one more map only analyzes the new map (see valorant_series.py)
+valorant_map_cache = ResponseCache(int(os.getenv("VALORANT_MAP_CACHE_SIZE", "256")))
+
+# Review agendas and player insights materialized once per match and review
+# version (see review_store.py), fronted by an LRU of recently served entries
+reviews = ReviewStore()
+review_cache = ResponseCache(int(os.getenv("REVIEW_CACHE_SIZE", "128")))
+pending_reviews: Dict[Any, asyncio.Future] = {}
+
+def topic_snapshot(topic: str) -> Any:
+    """Current data for a subscription topic (see subscriptions.py); None if there is none yet"""
+    kind, name = topic.split(":", 1)
+    if kind == "game":
+        return build_dashboard(name) if name in game_data_cache else None
+    if kind == "team":
+        return scouting.profile(name)
+    if kind == "match":
+        session = live_matches.get(name)
+        return session.agenda() if session is not None else None
+    games = player_stats_cache.get(name)
+    if not games:
+        return None
+    # Games keyed by match so a new game is a small patch, not the whole list again
+    return {
+        "player_name": name,
+        "matches_played": len(games),
+        "avg_kda": round(sum(g.get("kda", 0) for g in games) / len(games), 2),
+        "avg_performance_score": round(sum(g.get("performance_score", 0) for g in games) / len(games), 1),
+        "games": {g["match_id"]: g for g in games}
+    }
+
+live_updates = TopicHub(topic_snapshot)
+
+# Live VALORANT matches, updated round by round; every applied event pushes the agenda to match:<id> subscribers
+live_matches = LiveIngestor(on_update=lambda session: live_updates.publish([f"match:{session.match_id}"]))
+
+async def run_analysis(fn, *args, encode_depth: int = 0):
+    """
+    Run an analyzer call off the event loop and return its result JSON-encoded
+    (see workers.encode_parts). Pure scoring goes to the worker pool; with an
+    LLM configured the call mostly waits on the network, so it runs on a
+    thread where its LLM metrics and spans stay in this process.
+    """
+    if ai_analyzer.has_openai:
+        return await workers.run_io(fn, *args, encode_depth=encode_depth)
+    return await workers.run(fn, *args, encode_depth=encode_depth)
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+async def roster_analysis() -> Dict[str, Any]:
+    """
+    Roster-wide player and team macro analysis, recomputed at most once per
+    ingest generation. Returned as encoded parts: {"players": {name: bytes},
+    "team_macro": {key: bytes} or b"null"}.
+    """
+    generation = ingest_generation
+    hit = roster_analysis_cache["generation"] == generation
+    metrics.record_cache_lookup("roster_analysis", hit)
+    if hit:
+        return roster_analysis_cache["analysis"]
+    
+    # Concurrent misses for the same generation share one computation
+    pending = roster_analysis_cache.get("pending")
+    if pending is None or pending[0] != generation:
+        # Rule-based only (no LLM calls), so always on the worker pool
+        task = asyncio.ensure_future(workers.run(
+            ai_analyzer.analyze_roster, dict(player_stats_cache), list(team_stats_cache), dict(player_trends),
+            encode_depth=2
+        ))
+        pending = roster_analysis_cache["pending"] = (generation, task)
+    try:
+        analysis = await pending[1]
+    finally:
+        if roster_analysis_cache.get("pending") is pending:
+            roster_analysis_cache["pending"] = None
+    if roster_analysis_cache["generation"] < generation:
+        roster_analysis_cache["analysis"] = analysis
+        roster_analysis_cache["generation"] = generation
+    return analysis
+
 class PlayerStat(BaseModel):
     player_name: str
     match_id: str
@@ -61,6 +241,11 @@ class MacroInsight(BaseModel):
 async def root():
     return {"message": "Cloud9 Assistant Coach API is running"}
 
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text-format metrics: HTTP routes, GRID calls, LLM calls and caches"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/players")
 async def get_players():
     # In a real scenario, we might fetch players from a specific team
@@ -76,6 +261,101 @@ async def get_player_stats(player_name: str):
     
     return player_stats_cache[player_name]
 
+@app.get("/player/{player_name}/history")
+async def get_player_history(
+    player_name: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    champion: Optional[str] = None,
+    role: Optional[str] = None,
+    opponent: Optional[str] = None,
+    tournament: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    fields: Optional[str] = None
+):
+    """
+    Query a player's persistent game history, newest first
+    
+    Parameters:
+    - start / end: Date range (ISO-8601 or unix timestamp), inclusive
+    - champion, role, opponent, tournament: Exact-match filters
+    - cursor: `next_cursor` from a previous page
+    - limit: Page size (1-500, default: 50)
+    - fields: Comma-separated list of fields to return (default: all)
+    """
+    if limit < 1 or limit > 500:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 500")
+    
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    
+    try:
+        page = stats_store.query_player_history(
+            player_name,
+            start=start,
+            end=end,
+            champion=champion,
+            role=role,
+            opponent=opponent,
+            tournament=tournament,
+            cursor=cursor,
+            limit=limit,
+            fields=field_list
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"player_name": player_name, **page}
+
+@app.get("/player/{player_name}/similar")
+async def get_similar_players(player_name: str, k: int = 10, role: Optional[str] = None):
+    """
+    The k players whose recent averages (kda, cs/min, vision, damage, gold,
+    performance score) look most like this player's, z-scored within role
+    
+    Parameters:
+    - k: Number of similar players (1-100, default: 10)
+    - role: Search another role's players (default: the player's own role)
+    """
+    if k < 1 or k > 100:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 100")
+    
+    with tracing.span("similarity.query", k=k):
+        result = similarity.similar(player_name, k, role)
+    if result is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No similarity data for {player_name}. Please analyze some GRID series with this player (and role) first."
+        )
+    
+    return result
+
+@app.post("/players/similar")
+async def get_similar_players_batch(request: Dict[str, Any]):
+    """
+    Similar players for several players in one pass
+    
+    Example request body:
+    {
+        "players": ["Blaber", "Jojopyun"],
+        "k": 5,
+        "role": null  # optional, as for GET /player/{player_name}/similar
+    }
+    """
+    players = request.get("players")
+    k = request.get("k", 10)
+    if not isinstance(players, list) or not players or not all(isinstance(name, str) for name in players):
+        raise HTTPException(status_code=400, detail="players must be a non-empty list of player names")
+    if not isinstance(k, int) or k < 1 or k > 100:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 100")
+    if request.get("role") is not None and not isinstance(request["role"], str):
+        raise HTTPException(status_code=400, detail="role must be a string")
+    
+    with tracing.span("similarity.query", k=k, players=len(players)):
+        results = similarity.similar_batch(players, k, request.get("role"))
+    
+    return {name: result for name, result in zip(players, results)}
+
 @app.get("/player/{player_name}/analysis")
 async def get_player_analysis(player_name: str):
     """Get AI-powered analysis of player performance"""
@@ -85,31 +365,97 @@ async def get_player_analysis(player_name: str):
             detail=f"No data available for {player_name}. Please analyze some GRID series first."
         )
     
+    # Served from the roster snapshot when it is current for the latest ingest;
+    # the snapshot is rule-based, so only this player's LLM commentary is added
+    if roster_analysis_cache["generation"] == ingest_generation:
+        body = (await roster_analysis())["players"][player_name]
+        if ai_analyzer.has_openai:
+            body = await workers.run_io(ai_analyzer.add_ai_commentary, player_name, json.loads(body), encode_depth=0)
+        return json_response(body)
+    
     stats = player_stats_cache[player_name]
-    analysis = ai_analyzer.analyze_player_performance(player_name, stats)
+    analysis = await run_analysis(ai_analyzer.analyze_player_performance, player_name, stats, player_trends.get(player_name))
     
-    return analysis
+    return json_response(analysis)
+
+@app.get("/roster/analysis")
+async def get_roster_analysis():
+    """
+    Every player's analysis and the team macro analysis in one response
+    
+    Computed in one shared pass over the player and team caches and memoized
+    until the next series is ingested. `generation` identifies the ingest
+    state the analysis was computed from. The analyses are rule-based; the
+    LLM commentary is served by /player/{name}/analysis and
+    /team/macro-analysis.
+    """
+    if not player_stats_cache and not team_stats_cache:
+        raise HTTPException(
+            status_code=404,
+            detail="No data available. Please analyze some GRID series first."
+        )
+    
+    generation = ingest_generation
+    analysis = await roster_analysis()
+    return json_response(workers.join_parts({"generation": workers.encode_json(generation), **analysis}))
+
+# GRID caps allSeries pages at 50 nodes; larger requests are paged through
+MAX_SERIES_PAGE_SIZE = 50
+MAX_SERIES_LIMIT = 500
+
+async def collect_series_edges(title_id: int, limit: int, after: Optional[str], page_size: int) -> Dict[str, Any]:
+    """Collect up to `limit` allSeries edges starting after `after`, plus the cursor to continue from"""
+    if limit < 1 or limit > MAX_SERIES_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_SERIES_LIMIT}")
+    if page_size < 1 or page_size > MAX_SERIES_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"page_size must be between 1 and {MAX_SERIES_PAGE_SIZE}")
+    
+    edges = []
+    has_next_page, end_cursor = True, after
+    # Pages are sized to what is still needed, so GRID's pageInfo on the last
+    # one says whether more exist without fetching (or prefetching) another
+    while len(edges) < limit and has_next_page:
+        page = await grid.get_series_page(title_id, first=min(page_size, limit - len(edges)), after=end_cursor)
+        edges.extend(page["edges"])
+        has_next_page = page["has_next_page"] and bool(page["edges"])
+        end_cursor = page["end_cursor"] or (page["edges"][-1].get("cursor") if page["edges"] else None)
+    
+    return {
+        "edges": edges,
+        "page_info": {
+            "has_next_page": has_next_page,
+            "end_cursor": end_cursor if has_next_page else None
+        }
+    }
 
 @app.get("/series/recent")
-async def get_recent_series(title_id: int = 3):
+async def get_recent_series(title_id: int = 3, limit: int = 10, after: Optional[str] = None, page_size: int = MAX_SERIES_PAGE_SIZE):
+    """
+    Get recent series edges for a title, newest first
+    
+    Parameters:
+    - limit: Number of series to return (default: 10)
+    - after: Cursor of the last edge already seen, to continue paging
+    - page_size: Series per GRID request (max 50)
+    """
     try:
-        data = await grid.get_recent_series(title_id)
-        if "data" in data and data["data"] and "allSeries" in data["data"]:
-            return data["data"]["allSeries"]["edges"]
-        raise HTTPException(status_code=500, detail="Invalid response format from GRID API")
+        page = await collect_series_edges(title_id, limit, after, page_size)
+        return page["edges"]
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching recent series from GRID API: {str(e)}")
 
 @app.get("/series/recent/{game}")
-async def get_recent_series_by_game(game: str, limit: int = 10):
+async def get_recent_series_by_game(game: str, limit: int = 10, after: Optional[str] = None, page_size: int = MAX_SERIES_PAGE_SIZE):
     """
     Get recent series for a specific game (lol/league or valorant)
     
     Parameters:
     - game: Game identifier ('lol', 'league', or 'valorant')
     - limit: Number of series to fetch (default: 10)
+    - after: `page_info.end_cursor` from a previous response, to fetch the next page
+    - page_size: Series per GRID request (max 50)
     """
     game = game.lower()
     
@@ -125,33 +471,30 @@ async def get_recent_series_by_game(game: str, limit: int = 10):
     
     try:
         title_id = game_data_cache[game]['title_id']
-        data = await grid.get_recent_series(title_id)
+        page = await collect_series_edges(title_id, limit, after, page_size)
         
-        if "data" in data and data["data"] and "allSeries" in data["data"]:
-            edges = data["data"]["allSeries"]["edges"]
-            # Limit results
-            limited_edges = edges[:limit] if len(edges) > limit else edges
-            
-            return {
-                "game": game,
-                "title_id": title_id,
-                "series_count": len(limited_edges),
-                "series": limited_edges
-            }
-        raise HTTPException(status_code=500, detail="Invalid response format from GRID API")
+        return {
+            "game": game,
+            "title_id": title_id,
+            "series_count": len(page["edges"]),
+            "series": page["edges"],
+            "page_info": page["page_info"]
+        }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching recent series for {game}: {str(e)}")
 
 @app.get("/series/multi-game")
-async def get_multi_game_series(title_ids: str = "3,21", limit: int = 10):
+async def get_multi_game_series(title_ids: str = "3,21", limit: int = 10, fields: Optional[str] = None):
     """
     Fetch recent series from multiple games simultaneously.
     
     Parameters:
     - title_ids: Comma-separated list of title IDs (e.g., "3,21,4" for LoL, VALORANT, Dota2)
     - limit: Number of series to fetch per game (default: 10)
+    - fields: Comma-separated series fields to return (id, startTimeScheduled, title,
+      tournament, teams, format). Default: id,title,tournament
     
     Common Title IDs:
     - 3: League of Legends
@@ -170,8 +513,13 @@ async def get_multi_game_series(title_ids: str = "3,21", limit: int = 10):
         if len(title_id_list) > 10:
             raise HTTPException(status_code=400, detail="Maximum 10 games can be fetched at once")
         
-        # Fetch data from multiple games
-        results = await grid.get_multiple_games_series(title_id_list, limit)
+        try:
+            field_selection = parse_series_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # Fetch data from multiple games in a single batched request
+        results = await grid.get_multiple_games_series(title_id_list, limit, field_selection)
         
         # Process results
         response = {
@@ -202,6 +550,8 @@ async def get_multi_game_series(title_ids: str = "3,21", limit: int = 10):
         
         return response
         
+    except HTTPException:
+        raise
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid title_ids format. Use comma-separated integers (e.g., '3,21,4')")
     except Exception as e:
@@ -219,13 +569,18 @@ async def get_series_insights(series_id: str):
         
         return processed_insights
         
+    except GridUnavailableError as e:
+        # GRID is throttling or failing - don't double the load with a File Download attempt
+        raise HTTPException(status_code=503, detail=f"GRID API temporarily unavailable: {str(e)}")
     except Exception as e:
         error_msg = str(e)
         
         # Try File Download as fallback
         try:
             file_data = await grid.get_series_end_state(series_id)
-            return process_grid_end_state(file_data, series_id)
+            return await ingest_grid_end_state(file_data, series_id)
+        except GridUnavailableError as file_error:
+            raise HTTPException(status_code=503, detail=f"GRID API temporarily unavailable: {str(file_error)}")
         except Exception as file_error:
             # If both methods fail, raise appropriate HTTP exception
             if "403" in error_msg or "forbidden" in error_msg.lower():
@@ -244,6 +599,54 @@ async def get_series_insights(series_id: str):
                     detail=f"Error accessing GRID data: {error_msg}"
                 )
 
+@app.get("/grid/status")
+async def get_grid_status():
+    """GRID client resilience state: circuit breakers, retry/429 counters, limiter and cache"""
+    return grid_resilience_status()
+
+def require_admin(token: Optional[str]) -> None:
+    """Admin endpoints are disabled unless ADMIN_TOKEN is set, then require X-Admin-Token"""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not hmac.compare_digest(token, admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.post("/admin/profile")
+async def run_profiler(
+    seconds: float = 10.0,
+    interval_ms: float = DEFAULT_INTERVAL * 1000,
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """
+    Sample every thread's stack (event loop and thread pool) for `seconds` and
+    return a collapsed-stack file for flamegraph.pl / speedscope
+    """
+    require_admin(x_admin_token)
+    if not 0 < seconds <= MAX_DURATION:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {MAX_DURATION:g}")
+    if not 1 <= interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail="interval_ms must be between 1 and 1000")
+    if not profiler.start(interval_ms / 1000):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        # Joining the sampler thread can take up to one interval; keep it off the event loop
+        await workers.run_io(profiler.stop)
+    
+    summary = profiler.summary()
+    return Response(
+        content=profiler.collapsed(),
+        media_type="text/plain",
+        headers={
+            "X-Profile-Samples": str(summary["samples"]),
+            "X-Profile-Overhead-Percent": str(summary["overhead_percent"]),
+            "Content-Disposition": "attachment; filename=profile.collapsed"
+        }
+    )
+
 @app.get("/team/macro-analysis")
 async def get_team_macro_analysis():
     """Get comprehensive team macro strategy analysis"""
@@ -253,14 +656,79 @@ async def get_team_macro_analysis():
             detail="No team data available. Please analyze some GRID series first."
         )
     
+    if roster_analysis_cache["generation"] == ingest_generation:
+        body = workers.join_parts((await roster_analysis())["team_macro"])
+        if ai_analyzer.has_openai:
+            body = await workers.run_io(ai_analyzer.add_ai_strategic_review, json.loads(body),
+                                        list(team_stats_cache)[-10:], encode_depth=0)
+        return json_response(body)
+    
     # Flatten all player stats from cache
     all_player_stats = []
     for player_name, stats in player_stats_cache.items():
         all_player_stats.extend(stats)
     
-    analysis = ai_analyzer.analyze_team_macro(team_stats_cache, all_player_stats)
+    analysis = await run_analysis(ai_analyzer.analyze_team_macro, list(team_stats_cache), all_player_stats)
     
-    return analysis
+    return json_response(analysis)
+
+@app.get("/opponent/{team}/profile")
+async def get_opponent_profile(team: str):
+    """Get the precomputed scouting profile for any team seen in ingested series"""
+    profile = scouting.profile(team)
+    if profile is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No scouting data for {team}. Please analyze some GRID series including this team first."
+        )
+    
+    return profile
+
+@app.get("/opponents")
+async def get_scouted_opponents():
+    """List every team with a scouting profile"""
+    return scouting.teams()
+
+def normalize_draft_game(game: str) -> str:
+    game = game.lower()
+    if game == 'league':
+        game = 'lol'
+    if game not in ('lol', 'valorant'):
+        raise HTTPException(status_code=400, detail=f"Invalid game '{game}'. Must be 'lol', 'league', or 'valorant'")
+    return game
+
+@app.get("/draft/player/{player_name}")
+async def get_player_draft(player_name: str, game: str = "lol"):
+    """Pick and win rates per champion (or agent) and comfort picks, from ingest-time counters"""
+    view = draft.player(player_name, normalize_draft_game(game))
+    if view is None:
+        raise HTTPException(status_code=404, detail=f"No picks recorded for {player_name}")
+    return view
+
+@app.get("/draft/team/{team}/compositions")
+async def get_team_compositions(team: str, game: str = "lol", picks: Optional[str] = None, map: Optional[str] = None):
+    """
+    A team's most played compositions with win rates, or one composition's
+    record with ?picks=Azir,Vi,... (and &map= for VALORANT)
+    """
+    game = normalize_draft_game(game)
+    if picks:
+        entry = draft.composition(team, [pick.strip() for pick in picks.split(",") if pick.strip()], game, map)
+        if entry is None:
+            raise HTTPException(status_code=404, detail=f"{team} has not played that composition")
+        return entry
+    view = draft.compositions(team, game)
+    if view is None:
+        raise HTTPException(status_code=404, detail=f"No compositions recorded for {team}")
+    return view
+
+@app.get("/draft/opponent/{team}/picks")
+async def get_opponent_picks(team: str, game: str = "lol"):
+    """What a team picks, with pick and win rates, for drafting against them"""
+    view = draft.opponent_picks(team, normalize_draft_game(game))
+    if view is None:
+        raise HTTPException(status_code=404, detail=f"No picks recorded for {team}")
+    return view
 
 @app.get("/matches/recent")
 async def get_recent_matches(limit: int = 10):
@@ -270,24 +738,8 @@ async def get_recent_matches(limit: int = 10):
     
     return team_stats_cache[-limit:] if len(team_stats_cache) > limit else team_stats_cache
 
-@app.get("/dashboard/{game}")
-async def get_game_dashboard(game: str):
-    """
-    Get dashboard data for a specific game (lol/league or valorant)
-    Returns team stats, player stats, and recent matches for the selected game
-    """
-    game = game.lower()
-    
-    # Normalize 'league' to 'lol' for consistency
-    if game == 'league':
-        game = 'lol'
-    
-    if game not in game_data_cache:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid game '{game}'. Must be 'lol', 'league', or 'valorant'"
-        )
-    
+def build_dashboard(game: str) -> Dict[str, Any]:
+    """Dashboard payload for a normalized game key in game_data_cache"""
     game_cache = game_data_cache[game]
     
     # Calculate aggregate statistics from cached data
@@ -333,6 +785,26 @@ async def get_game_dashboard(game: str):
     
     return dashboard_data
 
+@app.get("/dashboard/{game}")
+async def get_game_dashboard(game: str):
+    """
+    Get dashboard data for a specific game (lol/league or valorant)
+    Returns team stats, player stats, and recent matches for the selected game
+    """
+    game = game.lower()
+    
+    # Normalize 'league' to 'lol' for consistency
+    if game == 'league':
+        game = 'lol'
+    
+    if game not in game_data_cache:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid game '{game}'. Must be 'lol', 'league', or 'valorant'"
+        )
+    
+    return build_dashboard(game)
+
 @app.post("/dashboard/{game}/update")
 async def update_game_dashboard(game: str, series_id: str):
     """
@@ -370,6 +842,7 @@ async def update_game_dashboard(game: str, series_id: str):
                     "win": True,  # Placeholder - would need actual match result
                 }
                 game_data_cache[game]['team'].append(match_data)
+            live_updates.publish([f"game:{game}"])
             
             return {
                 "success": True,
@@ -386,6 +859,108 @@ async def update_game_dashboard(game: str, series_id: str):
             detail=f"Error updating {game} dashboard: {str(e)}"
         )
 
+def subscribe_topics(subscriber: Subscriber, topics: List[str]) -> None:
+    """Subscribe to each topic, queueing its snapshot (or an error message) in order"""
+    for topic in topics:
+        try:
+            subscriber.offer(live_updates.subscribe(subscriber, topic))
+        except ValueError as e:
+            subscriber.offer(workers.encode_json({"type": "error", "topic": topic, "detail": str(e)}))
+
+@app.websocket("/ws")
+async def subscribe_websocket(websocket: WebSocket, topics: Optional[str] = None):
+    """
+    Live updates over a WebSocket
+    
+    Topics: game:<lol|valorant> (dashboard payload), player:<name> (recent
+    games and averages), team:<name> (scouting profile). Subscribe at connect
+    time with ?topics=game:lol,player:Blaber or by sending
+    {"action": "subscribe" | "unsubscribe", "topics": [...]}.
+    
+    Each topic first yields {"type": "snapshot", "topic", "version", "data"},
+    then {"type": "delta", "topic", "version", "patch"} after every ingest that
+    changes it, where `patch` is a JSON merge patch (RFC 7396) against the
+    previous version.
+    """
+    await websocket.accept()
+    subscriber = Subscriber()
+    subscribe_topics(subscriber, [t for t in (topics or "").split(",") if t.strip()])
+    
+    async def receive():
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                action = message["action"]
+                requested = message["topics"]
+                if action not in ("subscribe", "unsubscribe") or not isinstance(requested, list):
+                    raise ValueError
+            except (ValueError, KeyError, TypeError):
+                subscriber.offer(workers.encode_json({
+                    "type": "error",
+                    "detail": 'Expected {"action": "subscribe" | "unsubscribe", "topics": [...]}'
+                }))
+                continue
+            if action == "subscribe":
+                subscribe_topics(subscriber, requested)
+            else:
+                for topic in requested:
+                    try:
+                        live_updates.unsubscribe(subscriber, topic)
+                    except ValueError:
+                        pass
+    
+    async def send():
+        while True:
+            message = await subscriber.next_message()
+            if message is None:
+                await websocket.close(code=1013, reason="Subscriber fell too far behind; reconnect for a fresh snapshot")
+                return
+            await websocket.send_text(message.decode("utf-8"))
+    
+    tasks = [asyncio.ensure_future(receive()), asyncio.ensure_future(send())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        live_updates.close(subscriber)
+
+@app.get("/subscribe")
+async def subscribe_events(topics: str):
+    """
+    Live updates as server-sent events: the same snapshot and delta messages
+    as /ws, one `data:` line each, for comma-separated `topics`
+    """
+    subscriber = Subscriber()
+    requested = [t for t in topics.split(",") if t.strip()]
+    if not requested:
+        raise HTTPException(status_code=400, detail="topics is required")
+    try:
+        snapshots = [live_updates.subscribe(subscriber, topic) for topic in requested]
+    except ValueError as e:
+        live_updates.close(subscriber)
+        raise HTTPException(status_code=400, detail=str(e))
+    for snapshot in snapshots:
+        subscriber.offer(snapshot)
+    
+    async def events():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.next_message(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if message is None:
+                    return
+                yield b"data: " + message + b"\n\n"
+        finally:
+            live_updates.close(subscriber)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@tracing.traced("process.graphql")
 def process_grid_graphql_data(response: Dict[str, Any], series_id: str) -> MacroInsight:
     """Process GRID GraphQL response for series details"""
     try:
@@ -429,162 +1004,71 @@ def process_grid_graphql_data(response: Dict[str, Any], series_id: str) -> Macro
     except Exception as e:
         raise ValueError(f"Error processing GraphQL data: {str(e)}")
 
-def process_grid_end_state(data: Dict[str, Any], series_id: str) -> MacroInsight:
-    """Process GRID end-state JSON data for insights"""
+def persist_parsed_end_state(parsed: Dict[str, Any]) -> None:
+    """Persist a parsed end-state series' player and team history for long-range queries"""
+    if parsed["team_stat"] is None:
+        return
     try:
-        insights = {
-            "summary": "",
-            "strategic_impact": "",
-            "recommendations": []
-        }
+        player_games = [row for stats in parsed["player_performances"].values() for row in stats]
+        team_games = parsed["team_games"]
+        with tracing.span("process.persist", player_games=len(player_games), team_games=len(team_games)):
+            stats_store.insert_player_games(player_games)
+            stats_store.insert_team_games(team_games)
+    except Exception as e:
+        raise ValueError(f"Error processing GRID data: {str(e)}")
+
+def apply_parsed_end_state(parsed: Dict[str, Any]) -> MacroInsight:
+    """Fold a parsed (and persisted) end-state series into the in-memory caches"""
+    global ingest_generation
+    try:
+        series_id = parsed["series_id"]
+        player_performances = parsed["player_performances"]
+        team_games = parsed["team_games"]
         
-        # Parse GRID data structure
-        if "games" in data and len(data["games"]) > 0:
-            games = data["games"]
-            
-            # Aggregate stats across games
-            total_kills = 0
-            total_deaths = 0
-            total_assists = 0
-            total_dragons = 0
-            total_barons = 0
-            total_towers = 0
-            wins = 0
-            game_durations = []
-            first_bloods = 0
+        if parsed["team_stat"] is not None:
+            player_games = [row for stats in player_performances.values() for row in stats]
             
-            # Player-specific aggregation for micro-to-macro connection
-            player_performances = {}
+            # Update opponent scouting views for every team in the series
+            with tracing.span("process.scouting"):
+                scouting.ingest(team_games, player_games)
+            with tracing.span("process.draft"):
+                draft.ingest(player_games)
+            with tracing.span("process.similarity"):
+                similarity.ingest(player_games)
             
-            for game_idx, game in enumerate(games):
-                game_duration = game.get("gameDuration", 1800) / 60  # Convert to minutes
-                game_durations.append(game_duration)
-                
-                # Extract team stats
-                if "teams" in game:
-                    for team in game["teams"]:
-                        team_name = team.get("name", "")
-                        
-                        # Identify if this is Cloud9 or relevant team
-                        is_target_team = "cloud9" in team_name.lower() or "c9" in team_name.lower()
-                        
-                        if "stats" in team:
-                            stats = team["stats"]
-                            kills = stats.get("kills", 0)
-                            deaths = stats.get("deaths", 0)
-                            
-                            total_kills += kills
-                            total_deaths += deaths
-                            total_dragons += stats.get("dragons", 0)
-                            total_barons += stats.get("barons", 0)
-                            total_towers += stats.get("towers", 0)
-                            
-                            if stats.get("win", False):
-                                wins += 1
-                            if stats.get("firstBlood", False):
-                                first_bloods += 1
-                        
-                        # Extract player data for micro analysis
-                        if "players" in team:
-                            for player in team["players"]:
-                                player_name = player.get("summonerName", player.get("name", "Unknown"))
-                                role = player.get("role", "Unknown")
-                                
-                                if player_name not in player_performances:
-                                    player_performances[player_name] = []
-                                
-                                player_stats = player.get("stats", {})
-                                player_performances[player_name].append({
-                                    "match_id": f"{series_id}_game{game_idx+1}",
-                                    "game_number": game_idx + 1,
-                                    "player_name": player_name,
-                                    "role": role,
-                                    "champion": player.get("championName", "Unknown"),
-                                    "kills": player_stats.get("kills", 0),
-                                    "deaths": player_stats.get("deaths", 0),
-                                    "assists": player_stats.get("assists", 0),
-                                    "kda": calculate_kda(
-                                        player_stats.get("kills", 0),
-                                        player_stats.get("deaths", 0),
-                                        player_stats.get("assists", 0)
-                                    ),
-                                    "cs_per_min": player_stats.get("totalMinionsKilled", 0) / game_duration if game_duration > 0 else 0,
-                                    "vision_score": player_stats.get("visionScore", 0),
-                                    "damage_dealt": player_stats.get("totalDamageDealtToChampions", 0),
-                                    "gold_earned": player_stats.get("goldEarned", 0),
-                                    "performance_score": calculate_performance_score(player_stats, game_duration)
-                                })
-            
-            # Cache player data for micro analysis
+            # Cache player data for micro analysis. Lists are replaced rather than
+            # extended so snapshots handed to the worker pool never change underneath it
             for player_name, stats in player_performances.items():
-                if player_name not in player_stats_cache:
-                    player_stats_cache[player_name] = []
-                player_stats_cache[player_name].extend(stats)
                 # Keep only last 50 games per player
-                player_stats_cache[player_name] = player_stats_cache[player_name][-50:]
-            
-            # Calculate metrics
-            num_games = len(games)
-            avg_kda = (total_kills + total_assists) / total_deaths if total_deaths > 0 else total_kills + total_assists
-            win_rate = wins / num_games if num_games > 0 else 0
-            avg_game_duration = sum(game_durations) / len(game_durations) if game_durations else 30
+                player_stats_cache[player_name] = (player_stats_cache.get(player_name, []) + stats)[-50:]
+                
+                if player_name not in player_trends:
+                    player_trends[player_name] = PlayerTrendTracker()
+                for game_stats in stats:
+                    player_trends[player_name].update(game_stats)
             
             # Cache team-level stats
-            team_stat = {
-                "match_id": series_id,
-                "win": win_rate > 0.5,
-                "dragons_secured": total_dragons / num_games,
-                "barons_secured": total_barons / num_games,
-                "towers_destroyed": total_towers / num_games,
-                "first_blood": first_bloods > 0,
-                "avg_game_duration": avg_game_duration,
-                "win_rate": win_rate
-            }
-            team_stats_cache.append(team_stat)
+            team_stats_cache.append(parsed["team_stat"])
             # Keep only last 50 matches
             if len(team_stats_cache) > 50:
                 team_stats_cache.pop(0)
             
-            # Generate comprehensive insights
-            if win_rate >= 0.6:
-                insights["summary"] = f"Dominant series performance with {wins}/{num_games} games won. Team showed strong execution across all phases."
-            elif win_rate >= 0.4:
-                insights["summary"] = f"Competitive series with {wins}/{num_games} games won. Close matches indicate even skill levels."
-            else:
-                insights["summary"] = f"Challenging series with {wins}/{num_games} games won. Team struggled with execution and strategy."
-            
-            # Macro analysis
-            if total_dragons / num_games >= 2.5:
-                insights["strategic_impact"] = "Excellent dragon control provided scaling advantage and map pressure. Jungler and bot lane showed strong objective prioritization."
-            elif total_dragons / num_games >= 1.5:
-                insights["strategic_impact"] = "Moderate dragon control. Some missed opportunities around neutral objectives. Bot lane priority needs improvement."
-            else:
-                insights["strategic_impact"] = "Poor objective control significantly impacted win conditions. Critical weakness in jungle pathing and bot lane pressure."
-            
-            # Deep recommendations based on data
-            if avg_kda < 2.5:
-                insights["recommendations"].append("Critical: Team KDA below 2.5. Focus on reducing deaths through better vision control and map awareness.")
-            
-            if total_dragons / num_games < 2:
-                insights["recommendations"].append("Dragon priority: Average {:.1f} dragons per game is below optimal. Coordinate jungle/bot rotations 60 seconds before spawn.".format(total_dragons / num_games))
-            
-            if total_barons / num_games < 0.3 and num_games > 2:
-                insights["recommendations"].append("Late game: Low baron control suggests weak mid-to-late game transitions. Practice baron setups and vision denial.")
-            
-            if avg_game_duration > 35:
-                insights["recommendations"].append("Game tempo: Long average game time ({:.1f} min) indicates indecisive mid-game. Work on proactive plays and objective forcing.".format(avg_game_duration))
-            elif avg_game_duration < 25:
-                insights["recommendations"].append("Early aggression: Fast game pace ({:.1f} min) shows strong early game. Maintain momentum while avoiding overaggression.".format(avg_game_duration))
+            # Same rows for the per-game dashboard (end states are LoL)
+            lol_cache = game_data_cache['lol']
+            for player_name, stats in player_performances.items():
+                lol_cache['players'][player_name] = (lol_cache['players'].get(player_name, []) + stats)[-50:]
+            lol_cache['team'] = (lol_cache['team'] + [parsed["team_stat"]])[-50:]
+            ingest_generation += 1
             
-            if not insights["recommendations"]:
-                insights["recommendations"].append("Execution is solid. Continue current practice regimen and maintain focus on fundamentals.")
-        
-        else:
-            # Minimal data available
-            insights["summary"] = f"Series {series_id} data retrieved from GRID API."
-            insights["strategic_impact"] = "Limited detailed statistics available for comprehensive analysis."
-            insights["recommendations"] = ["Review full match VODs for qualitative analysis", "Check GRID data format and permissions"]
+            # Push deltas to anyone subscribed to what changed
+            with tracing.span("process.publish"):
+                live_updates.publish(
+                    ["game:lol"]
+                    + [f"player:{name}" for name in player_performances]
+                    + [f"team:{row['team'].lower()}" for row in team_games if row.get("team")]
+                )
         
+        insights = parsed["insights"]
         return MacroInsight(
             match_id=series_id,
             summary=insights["summary"],
@@ -596,6 +1080,143 @@ def process_grid_end_state(data: Dict[str, Any], series_id: str) -> MacroInsight
         # Error in processing - raise exception to be handled by caller
         raise ValueError(f"Error processing GRID data: {str(e)}")
 
+@tracing.traced("process.end_state")
+def process_grid_end_state(data: Dict[str, Any], series_id: str) -> MacroInsight:
+    """Process GRID end-state JSON data for insights"""
+    parsed = parse_grid_end_state(data, series_id)
+    persist_parsed_end_state(parsed)
+    return apply_parsed_end_state(parsed)
+
+async def ingest_grid_end_state(data: Dict[str, Any], series_id: str) -> MacroInsight:
+    """
+    process_grid_end_state off the event loop: the parse runs on the worker
+    pool and the SQLite write on a thread; only the cache update runs here
+    """
+    with tracing.span("process.end_state", series_id=series_id):
+        parsed = await workers.run(parse_grid_end_state, data, series_id)
+        await workers.run_io(persist_parsed_end_state, parsed)
+        return apply_parsed_end_state(parsed)
+
+async def ingest_valorant_picks(rows: List[Dict[str, Any]], persist: bool = True) -> None:
+    """
+    Count VALORANT agent picks (valorant_pick_rows) in the draft analytics,
+    persisting them unless they come from anonymous maps; maps are keyed by
+    review_match_id, so a map seen through both the series and review
+    endpoints is only counted once
+    """
+    if not rows:
+        return
+    if persist:
+        await workers.run_io(stats_store.insert_player_games, rows)
+    draft.ingest(rows)
+
+def review_game(game: Optional[str]) -> str:
+    return "valorant" if game == "valorant" else "lol"
+
+async def persist_review(entry: Dict[str, Any], match_data: Dict[str, Any]) -> None:
+    """Write an in-memory review entry to the review store"""
+    entry["created_at"] = await workers.run_io(
+        reviews.put, entry["match_id"], entry["game"], entry["version"], entry["digest"], match_data,
+        entry["review"], entry["insights"]
+    )
+    entry["persisted"] = True
+    entry.pop("match_data", None)
+
+async def store_review(match_id: str, game: str, version: str, digest: str, match_data: Dict[str, Any],
+                       persist: bool) -> Dict[str, Any]:
+    """
+    Analyze a match once (rule-based, so always on the worker pool) and cache
+    its review and insights; persisted to the review store when `persist`,
+    otherwise kept only in review_cache together with the match_data
+    """
+    parts = await workers.run(materialize_match, ai_analyzer, match_data, game, encode_depth=2)
+    entry = {
+        "match_id": match_id, "game": game, "version": version, "digest": digest,
+        "created_at": datetime.now(timezone.utc).isoformat(), "review": workers.join_parts(parts["review"]),
+        "insights": parts["insights"], "persisted": False, "match_data": match_data
+    }
+    if persist:
+        await persist_review(entry, match_data)
+    review_cache.put((match_id, game), entry)
+    if game == "valorant":
+        await ingest_valorant_picks(valorant_pick_rows(match_data, match_id), persist)
+    return entry
+
+async def materialized_review(game: str, match_data: Optional[Dict[str, Any]] = None,
+                              match_id: Optional[str] = None, persist: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    The stored review entry for a match (see ReviewStore.get), analyzing the
+    match only when it isn't stored for this content and review version.
+    Given only a match_id, a stale entry is recomputed from its stored
+    match_data; None if the match was never stored.
+    
+    Documents with a match_id or series_id are persisted to the review store;
+    anonymous ones (keyed by content digest) only when `persist` is set
+    (POST /assistant/reviews), and are otherwise kept in review_cache only.
+    """
+    version = REVIEW_VERSION
+    persist = persist or bool(match_data and (match_data.get("match_id") or match_data.get("series_id")))
+    match_id = match_id or review_match_id(match_data)
+    digest = match_digest(match_data) if match_data else None
+    entry = review_cache.get((match_id, game))
+    if entry is None:
+        entry = await workers.run_io(reviews.get, match_id, game)
+        if entry is not None:
+            review_cache.put((match_id, game), entry)
+    hit = entry is not None and entry["version"] == version and digest in (None, entry["digest"])
+    metrics.record_cache_lookup("match_review", hit)
+    if hit:
+        if persist and not entry.get("persisted", True):
+            stored_match = entry["match_data"]
+            await persist_review(entry, stored_match)
+            if game == "valorant":
+                # Already counted in memory when analyzed; draft.ingest skips seen picks
+                await ingest_valorant_picks(valorant_pick_rows(stored_match, match_id))
+        return entry
+    if not match_data:
+        if entry is None:
+            return None
+        match_data = entry.get("match_data") or await workers.run_io(reviews.get_match_data, match_id, game)
+        digest = entry["digest"]
+        persist = entry.get("persisted", True)
+    
+    # Concurrent requests for the same match share one analysis
+    key = (match_id, game, digest, version)
+    pending = pending_reviews.get(key)
+    if pending is None:
+        pending = pending_reviews[key] = asyncio.ensure_future(
+            store_review(match_id, game, version, digest, match_data, persist)
+        )
+        pending.add_done_callback(lambda _: pending_reviews.pop(key, None))
+    return await asyncio.shield(pending)
+
+async def stored_review_or_404(game: str, match_data: Optional[Dict[str, Any]], match_id: Optional[str]) -> Dict[str, Any]:
+    entry = await materialized_review(game, match_data, match_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"No stored review for match {match_id}. Submit its match_data first.")
+    return entry
+
+async def review_body(entry: Dict[str, Any]) -> bytes:
+    """A stored review agenda, with its LLM summary added when OpenAI is configured"""
+    if not ai_analyzer.has_openai:
+        return entry["review"]
+    return await workers.run_io(ai_analyzer.add_ai_summary, json.loads(entry["review"]), entry["game"], encode_depth=0)
+
+async def player_insights_body(entry: Dict[str, Any], player_name: str, match_data: Optional[Dict[str, Any]]) -> bytes:
+    """
+    A player's stored insights, with their LLM commentary added when OpenAI is
+    configured; players not listed in the match are analyzed on demand, as before
+    """
+    for name, body in entry["insights"].items():
+        if name.lower() == player_name.lower():
+            if not ai_analyzer.has_openai:
+                return body
+            return await workers.run_io(ai_analyzer.add_ai_commentary_to_insights, name, json.loads(body),
+                                        entry["game"], encode_depth=0)
+    if not match_data:
+        match_data = entry.get("match_data") or await workers.run_io(reviews.get_match_data, entry["match_id"], entry["game"])
+    return await run_analysis(ai_analyzer.generate_personalized_insights, player_name, match_data, entry["game"])
+
 @app.post("/assistant/personalized-insights")
 async def get_personalized_insights(request: Dict[str, Any]):
     """
@@ -604,23 +1225,27 @@ async def get_personalized_insights(request: Dict[str, Any]):
     Example request body:
     {
         "player_name": "OXY",
-        "match_data": {...},  # Complete match data
+        "match_data": {...},  # Complete match data, or "match_id" of a stored review
         "game": "valorant"  # or "lol"
     }
+    
+    Served from the review store; the match is only analyzed the first time
+    it is seen (or after it or the analyzers change).
     """
     try:
         player_name = request.get("player_name")
         match_data = request.get("match_data", {})
-        game = request.get("game", "lol")
+        match_id = request.get("match_id")
+        game = review_game(request.get("game", "lol"))
         
         if not player_name:
             raise HTTPException(status_code=400, detail="player_name is required")
         
-        if not match_data:
-            raise HTTPException(status_code=400, detail="match_data is required")
+        if not match_data and not match_id:
+            raise HTTPException(status_code=400, detail="match_data or match_id is required")
         
-        insights = ai_analyzer.generate_personalized_insights(player_name, match_data, game)
-        return insights
+        entry = await stored_review_or_404(game, match_data, match_id)
+        return json_response(await player_insights_body(entry, player_name, match_data))
         
     except HTTPException:
         raise
@@ -634,25 +1259,161 @@ async def generate_macro_review(request: Dict[str, Any]):
     
     Example request body:
     {
-        "match_data": {...},  # Complete match data from concluded match
+        "match_data": {...},  # Complete match data from concluded match, or "match_id" of a stored review
         "game": "valorant"  # or "lol"
     }
+    
+    Served from the review store like /assistant/personalized-insights.
     """
     try:
         match_data = request.get("match_data", {})
-        game = request.get("game", "lol")
+        match_id = request.get("match_id")
+        game = review_game(request.get("game", "lol"))
         
-        if not match_data:
-            raise HTTPException(status_code=400, detail="match_data is required")
+        if not match_data and not match_id:
+            raise HTTPException(status_code=400, detail="match_data or match_id is required")
         
-        review = ai_analyzer.generate_macro_review_agenda(match_data, game)
-        return review
+        entry = await stored_review_or_404(game, match_data, match_id)
+        return json_response(await review_body(entry))
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating review: {str(e)}")
 
+def review_summary(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "match_id": entry["match_id"],
+        "game": entry["game"],
+        "version": entry["version"],
+        "created_at": entry["created_at"],
+        "players": list(entry["insights"])
+    }
+
+@app.post("/assistant/reviews")
+async def ingest_review(request: Dict[str, Any]):
+    """
+    Store a concluded match's review agenda and every listed player's
+    insights, computed once; later /assistant/* requests are served by match ID
+    
+    Example request body:
+    {
+        "match_data": {...},  # match_id (VALORANT) or series_id (LoL) is the key
+        "game": "valorant"  # or "lol"
+    }
+    """
+    match_data = request.get("match_data")
+    if not isinstance(match_data, dict) or not match_data:
+        raise HTTPException(status_code=400, detail="match_data is required")
+    entry = await materialized_review(review_game(request.get("game", "lol")), match_data, persist=True)
+    return review_summary(entry)
+
+@app.get("/assistant/reviews")
+async def list_reviews(game: Optional[str] = None, limit: int = 50):
+    """Stored reviews, newest first"""
+    if limit < 1 or limit > 500:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 500")
+    version = REVIEW_VERSION
+    stored = await workers.run_io(reviews.list, review_game(game) if game else None, limit)
+    return {"version": version, "reviews": [{**row, "current": row["version"] == version} for row in stored]}
+
+@app.get("/assistant/reviews/{match_id}")
+async def get_review(match_id: str, game: str = "lol"):
+    """
+    A stored match's review agenda and every player's insights; only the
+    review gets its LLM summary here, each player's commentary comes with
+    /assistant/reviews/{match_id}/players/{player_name}
+    """
+    entry = await stored_review_or_404(review_game(game), None, match_id)
+    parts = {key: workers.encode_json(value) for key, value in review_summary(entry).items()}
+    parts["review"] = await review_body(entry)
+    parts["insights"] = entry["insights"]
+    return json_response(workers.join_parts(parts))
+
+@app.get("/assistant/reviews/{match_id}/players/{player_name}")
+async def get_review_player_insights(match_id: str, player_name: str, game: str = "lol"):
+    """One player's stored insights for a match"""
+    entry = await stored_review_or_404(review_game(game), None, match_id)
+    return json_response(await player_insights_body(entry, player_name, None))
+
+@app.post("/assistant/valorant-economy")
+async def get_valorant_economy(request: Dict[str, Any]):
+    """
+    Round-by-round credits for both teams and buys the economy model would
+    have made differently
+    
+    Example request body:
+    {
+        "match_data": {...}  # Complete VALORANT match data
+    }
+    """
+    try:
+        match_data = request.get("match_data", {})
+        
+        if not match_data.get("rounds"):
+            raise HTTPException(status_code=400, detail="match_data with rounds is required")
+        
+        report = await run_analysis(ai_analyzer.analyze_valorant_economy, match_data)
+        return json_response(report)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing economy: {str(e)}")
+
+async def valorant_series_review(series: Dict[str, Any]) -> Dict[str, Any]:
+    """Series review; maps missing from valorant_map_cache are analyzed concurrently on the worker pool"""
+    maps = series.get("maps") or [series]
+    digests = [map_digest(map_data) for map_data in maps]
+    results: Dict[str, Dict[str, Any]] = {}
+    missing: Dict[str, Dict[str, Any]] = {}
+    for digest, map_data in zip(digests, maps):
+        cached = valorant_map_cache.get(digest)
+        metrics.record_cache_lookup("valorant_map", cached is not None)
+        if cached is not None:
+            results[digest] = cached
+        else:
+            missing.setdefault(digest, map_data)
+    with tracing.span("valorant_series.maps", maps=len(maps), analyzed=len(missing)):
+        analyzed = await asyncio.gather(*(workers.run(analyze_map, map_data) for map_data in missing.values()))
+    picks = []
+    anonymous_picks = []
+    for (digest, map_data), result in zip(missing.items(), analyzed):
+        valorant_map_cache.put(digest, result)
+        results[digest] = result
+        rows = valorant_pick_rows(map_data, review_match_id(map_data), result["won"])
+        (picks if map_data.get("match_id") else anonymous_picks).extend(rows)
+    await ingest_valorant_picks(picks)
+    await ingest_valorant_picks(anonymous_picks, persist=False)
+    return merge_series(series, [results[digest] for digest in digests])
+
+@app.post("/assistant/valorant-series")
+async def get_valorant_series_review(request: Dict[str, Any]):
+    """
+    Series review for a multi-map VALORANT match: each map's agenda plus
+    cross-map patterns (site success by map, pistol conversion, player KAST
+    against round losses)
+    
+    Example request body:
+    {
+        "series": {
+            "series_id": "c9-lev-bo3",
+            "match_type": "BO3",
+            "opponent": "LEVIATAN",
+            "maps": [{...}, {...}]  # single-map VALORANT match data, in play order
+        }
+    }
+    """
+    series = request.get("series", {})
+    maps = series.get("maps") if isinstance(series, dict) else None
+    if not maps or not isinstance(maps, list) or not all(isinstance(m, dict) for m in maps):
+        raise HTTPException(status_code=400, detail="series with a list of maps is required")
+    try:
+        review = await valorant_series_review(series)
+        return json_response(workers.encode_json(review))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating series review: {str(e)}")
+
 @app.post("/assistant/predict-scenario")
 async def predict_hypothetical_scenario(request: Dict[str, Any]):
     """
@@ -694,35 +1455,233 @@ async def predict_hypothetical_scenario(request: Dict[str, Any]):
         if not scenario:
             raise HTTPException(status_code=400, detail="scenario is required")
         
-        prediction = ai_analyzer.predict_hypothetical_outcome(scenario, game)
-        return prediction
+        prediction = await run_analysis(ai_analyzer.predict_hypothetical_outcome, scenario, game)
+        return json_response(prediction)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error predicting scenario: {str(e)}")
 
-def calculate_kda(kills: int, deaths: int, assists: int) -> float:
-    """Calculate KDA ratio"""
-    if deaths == 0:
-        return float(kills + assists)
-    return round((kills + assists) / deaths, 2)
-
-def calculate_performance_score(stats: Dict, game_duration: float) -> float:
-    """Calculate overall performance score 0-100"""
-    kills = stats.get("kills", 0)
-    deaths = stats.get("deaths", 1)
-    assists = stats.get("assists", 0)
-    damage = stats.get("totalDamageDealtToChampions", 0)
-    cs = stats.get("totalMinionsKilled", 0)
-    vision = stats.get("visionScore", 0)
-    
-    # Weighted scoring
-    kda_score = min((kills + assists) / deaths * 10, 40) if deaths > 0 else 40
-    damage_score = min(damage / 500, 30)
-    cs_score = min((cs / game_duration) * 2, 20) if game_duration > 0 else 0
-    vision_score = min(vision / 3, 10)
-    
-    total = kda_score + damage_score + cs_score + vision_score
-    return round(min(total, 100), 1)
+# --- Live matches -------------------------------------------------------------
+# Round-by-round VALORANT ingestion (live_ingest.py). The agenda is kept
+# current incrementally, so reading it never re-scans the match.
+
+def get_live_match_or_404(match_id: str):
+    session = live_matches.get(match_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"No live match {match_id}")
+    return session
+
+@app.get("/live/valorant")
+async def list_live_matches():
+    """Live match sessions, newest first"""
+    return {"matches": [session.summary() for session in live_matches.list()]}
+
+@app.post("/live/valorant/{match_id}/follow", status_code=202)
+async def follow_live_match(match_id: str, request: Optional[Dict[str, Any]] = None):
+    """
+    Follow a match's event feed in the background
+    
+    Example request body (optional when LIVE_FEED_URL is set):
+    {
+        "feed_url": "http://localhost:8090/live/series/demo/events"
+    }
+    """
+    try:
+        session = live_matches.follow(match_id, (request or {}).get("feed_url"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return session.summary()
+
+@app.post("/live/valorant/{match_id}/events")
+async def push_live_events(match_id: str, request: Dict[str, Any]):
+    """
+    Push events for a match instead of (or alongside) a feed
+    
+    Example request body (one event, or {"events": [...]}):
+    {
+        "sequence": 7,
+        "type": "round-ended",
+        "round": {"round_num": 7, "team_won": false, "buy_type": "full", "target_site": "B", "time_remaining": 12}
+    }
+    """
+    events = request.get("events", [request])
+    if not isinstance(events, list) or not all(isinstance(event, dict) for event in events):
+        raise HTTPException(status_code=400, detail="events must be a list of event objects")
+    session = live_matches.session(match_id)
+    applied = sum(1 for event in events if session.apply(event))
+    return {"applied": applied, "skipped": len(events) - applied, "live": session.summary()}
+
+@app.get("/live/valorant/{match_id}/agenda")
+async def get_live_agenda(match_id: str):
+    """Current review agenda for the rounds played so far (same items as the VALORANT macro review)"""
+    return get_live_match_or_404(match_id).agenda()
+
+@app.get("/live/valorant/{match_id}/economy")
+async def get_live_economy(match_id: str):
+    """Both teams' credits and the buy evaluation for the rounds played so far"""
+    return get_live_match_or_404(match_id).state.economy.report()
+
+@app.post("/live/valorant/{match_id}/stop")
+async def stop_live_match(match_id: str):
+    """Stop following the feed; the agenda stays available"""
+    get_live_match_or_404(match_id)
+    return live_matches.stop(match_id).summary()
+
+@app.delete("/live/valorant/{match_id}")
+async def delete_live_match(match_id: str):
+    """Stop following and forget the match"""
+    get_live_match_or_404(match_id)
+    return live_matches.remove(match_id).summary()
+
+# --- Background jobs ---------------------------------------------------------
+# Long analyses run on the job queue (jobs.py) instead of inside a request.
+# Handlers return encoded JSON, served as the job's "result".
+
+def load_season_history(tournament: Optional[str], start: Optional[str], end: Optional[str]) -> Dict[str, Any]:
+    """Stored LoL team-game and player-game rows in the given tournament / time range, oldest first"""
+    filters = {"game": "lol", "tournament": tournament, "start": start, "end": end, "chronological": True}
+    return {
+        "team_games": list(stats_store.iter_team_games(**filters)),
+        "player_games": list(stats_store.iter_player_games(**filters))
+    }
+
+async def job_team_macro(job: jobs.Job, params: Dict[str, Any]) -> bytes:
+    """Team macro analysis over the persistent store rather than this process's caches"""
+    job.report(0.0, "loading history")
+    history = await workers.run_io(load_season_history, params.get("tournament"), params.get("start"), params.get("end"))
+    team_stats = series_team_stats(history["team_games"])
+    if not team_stats:
+        raise ValueError("No stored team games match the given filters")
+    job.report(0.5, f"analyzing {len(team_stats)} series")
+    return await run_analysis(ai_analyzer.analyze_team_macro, team_stats, history["player_games"])
+
+async def job_roster_analysis(job: jobs.Job, params: Dict[str, Any]) -> bytes:
+    if not player_stats_cache and not team_stats_cache:
+        raise ValueError("No data available. Please analyze some GRID series first.")
+    generation = ingest_generation
+    # Shielded: other requests may be waiting on the same computation
+    analysis = await asyncio.shield(roster_analysis())
+    return workers.join_parts({"generation": workers.encode_json(generation), **analysis})
+
+async def job_macro_review(job: jobs.Job, params: Dict[str, Any]) -> bytes:
+    entry = await materialized_review(review_game(params.get("game", "lol")), params["match_data"], params.get("match_id"))
+    return await review_body(entry)
+
+async def job_personalized_insights(job: jobs.Job, params: Dict[str, Any]) -> bytes:
+    entry = await materialized_review(review_game(params.get("game", "lol")), params["match_data"], params.get("match_id"))
+    return await player_insights_body(entry, params["player_name"], params["match_data"])
+
+async def job_predict_scenario(job: jobs.Job, params: Dict[str, Any]) -> bytes:
+    return await run_analysis(ai_analyzer.predict_hypothetical_outcome, params["scenario"], params.get("game", "lol"))
+
+async def job_valorant_series(job: jobs.Job, params: Dict[str, Any]) -> bytes:
+    return workers.encode_json(await valorant_series_review(params["series"]))
+
+# kind -> (handler, default priority, required params)
+JOB_KINDS = {
+    "macro_review": (job_macro_review, "live", ("match_data",)),
+    "personalized_insights": (job_personalized_insights, "live", ("player_name", "match_data")),
+    "predict_scenario": (job_predict_scenario, "live", ("scenario",)),
+    "valorant_series": (job_valorant_series, "live", ("series",)),
+    "team_macro": (job_team_macro, "batch", ()),
+    "roster_analysis": (job_roster_analysis, "batch", ()),
+}
+for kind, (handler, priority, _) in JOB_KINDS.items():
+    jobs.queue.register(kind, handler, priority)
+
+def job_body(job: jobs.Job, with_result: bool = True) -> bytes:
+    parts = {key: workers.encode_json(value) for key, value in job.summary().items()}
+    if with_result:
+        parts["result"] = job.result if job.result is not None else b"null"
+    return workers.join_parts(parts)
+
+def get_job_or_404(job_id: str) -> jobs.Job:
+    job = jobs.queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found (unknown or expired)")
+    return job
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Dict[str, Any]):
+    """
+    Queue a long-running analysis and return its job ID immediately
+    
+    Example request body:
+    {
+        "kind": "team_macro",  # macro_review, personalized_insights, predict_scenario, valorant_series, team_macro, roster_analysis
+        "params": {"tournament": "LCS 2024 Summer", "start": "2024-06-01"},
+        "priority": "batch"  # or "live"; defaults per kind
+    }
+    
+    `params` takes the same fields as the matching /assistant/* request body;
+    team_macro reads the persistent store, optionally filtered by tournament
+    and start/end. Poll GET /jobs/{job_id} or stream GET /jobs/{job_id}/events.
+    """
+    kind = request.get("kind")
+    params = request.get("params") or {}
+    if kind not in JOB_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(JOB_KINDS)}")
+    if not isinstance(params, dict):
+        raise HTTPException(status_code=400, detail="params must be an object")
+    missing = [name for name in JOB_KINDS[kind][2] if not params.get(name)]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"{', '.join(missing)} required for {kind} jobs")
+    
+    try:
+        job = jobs.queue.submit(kind, params, request.get("priority"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except jobs.QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    return JSONResponse(status_code=202, content=job.summary(), headers={"Location": f"/jobs/{job.id}"})
+
+@app.get("/jobs")
+async def list_jobs():
+    """Queued, running and retained jobs, newest first (without results)"""
+    return {
+        "workers": jobs.queue.worker_count,
+        "result_ttl_seconds": jobs.queue.result_ttl,
+        "jobs": [job.summary() for job in jobs.queue.list()]
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status, progress and, once succeeded, its result"""
+    return json_response(job_body(get_job_or_404(job_id)))
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Server-sent events for one job: a `status` event per change and a final
+    `done` event carrying the full job (with result), then the stream ends
+    """
+    job = get_job_or_404(job_id)
+    
+    async def events():
+        seen = -1
+        while True:
+            if job.version > seen:
+                seen = job.version
+                if job.done:
+                    yield b"event: done\ndata: " + job_body(job) + b"\n\n"
+                    return
+                yield b"event: status\ndata: " + job_body(job, with_result=False) + b"\n\n"
+            elif not await job.wait_for_change(seen, timeout=15.0):
+                yield b": keepalive\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; finished jobs are returned unchanged"""
+    job = get_job_or_404(job_id)
+    version = job.version
+    jobs.queue.cancel(job_id)
+    if not job.done:
+        # A running job's handler is cancelled at its current await
+        await job.wait_for_change(version, timeout=1.0)
+    return json_response(job_body(job, with_result=False))
 
 if __name__ == "__main__":
     import uvicorn
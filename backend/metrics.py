@@ -0,0 +1,228 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms with labels, rendered by `render()` in the
+text format Prometheus scrapes (version 0.0.4). No client library needed.
+"""
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple = ()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + [f'{n}="{_escape(v)}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._children.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._children.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._children[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._children.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                # Per-bucket (non-cumulative) counts + overflow slot, then sum and count
+                child = self._children[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            child[0][index] += 1
+            child[1] += value
+            child[2] += 1
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, (list(c[0]), c[1], c[2])) for key, c in self._children.items()]
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+# HTTP layer
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status")
+))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("method", "route")
+))
+
+# GRID client
+GRID_REQUESTS = REGISTRY.register(Counter(
+    "grid_requests_total", "GRID HTTP attempts by endpoint, query and status", ("endpoint", "query", "status")
+))
+GRID_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "grid_request_duration_seconds", "GRID HTTP attempt latency", ("endpoint", "query")
+))
+GRID_RESPONSE_BYTES = REGISTRY.register(Histogram(
+    "grid_response_bytes", "GRID response body size", ("endpoint", "query"), buckets=BYTES_BUCKETS
+))
+
+# LLM calls
+LLM_REQUESTS = REGISTRY.register(Counter(
+    "llm_requests_total", "LLM completion calls by analyzer helper and outcome", ("helper", "status")
+))
+LLM_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "llm_request_duration_seconds", "LLM completion latency by analyzer helper", ("helper",)
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "llm_tokens_total", "LLM tokens consumed by analyzer helper", ("helper", "kind")
+))
+
+# Caches
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "cache_lookups_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result")
+))
+
+# Worker pool (CPU-bound analyzer and ingestion work)
+WORKER_TASKS = REGISTRY.register(Counter(
+    "worker_tasks_total", "Tasks run on the worker pool by pool kind and task", ("pool", "task")
+))
+WORKER_TASK_DURATION = REGISTRY.register(Histogram(
+    "worker_task_duration_seconds", "Worker task latency including queueing and transfer", ("pool",)
+))
+WORKER_PAYLOAD_BYTES = REGISTRY.register(Histogram(
+    "worker_payload_bytes", "Pickled call size sent to worker processes", ("task",), buckets=BYTES_BUCKETS
+))
+WORKER_TASKS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "worker_tasks_in_flight", "Worker tasks submitted and not yet finished"
+))
+
+# Job queue (long-running analyses submitted via /jobs)
+JOBS = REGISTRY.register(Counter(
+    "jobs_total", "Job state transitions by kind and status", ("kind", "status")
+))
+JOBS_QUEUED = REGISTRY.register(Gauge(
+    "jobs_queued", "Jobs waiting for a job worker by priority", ("priority",)
+))
+JOB_DURATION = REGISTRY.register(Histogram(
+    "job_duration_seconds", "Job run time from start to finish by kind", ("kind",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+))
+
+# Pushed topic updates (/ws, /subscribe)
+SUBSCRIBERS = REGISTRY.register(Gauge(
+    "subscribers", "Active topic subscriptions by topic kind", ("kind",)
+))
+SUBSCRIPTION_MESSAGES = REGISTRY.register(Counter(
+    "subscription_messages_total", "Messages queued to subscribers by type (snapshot/delta/dropped)", ("type",)
+))
+
+# Live in-series ingestion
+LIVE_EVENTS = REGISTRY.register(Counter(
+    "live_events_total", "Live match events applied by type (ignored: unknown types)", ("type",)
+))
+LIVE_FEED_RECONNECTS = REGISTRY.register(Counter(
+    "live_feed_reconnects_total", "Live feed reconnect attempts after a dropped or failed stream"
+))
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,97 @@
+"""
+Statistical sampling profiler for the running API process.
+
+A daemon thread wakes every `interval` seconds, snapshots every thread's
+Python stack with sys._current_frames() and counts identical stacks. That
+covers both the event-loop thread (async handlers, analyzer code called
+from them) and the thread-pool workers Starlette uses for sync work. Output
+is the collapsed-stack format read by flamegraph.pl, speedscope and
+inferno: one `thread;outer;...;inner count` line per distinct stack.
+
+Overhead: one sample walks each thread's frames while holding the GIL,
+typically 20-100 microseconds for this app's thread count, so the default
+10 ms interval costs well under 2% of one core. The measured figure is
+returned with every profile.
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+DEFAULT_INTERVAL = 0.01
+MAX_DURATION = 60.0
+
+
+def _frame_label(frame) -> str:
+    # Function-level labels (no line numbers) so a function's samples merge into one flame
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+class SamplingProfiler:
+    """Samples all thread stacks for a fixed duration; one run at a time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = DEFAULT_INTERVAL) -> bool:
+        """Begin sampling; returns False if a profile is already running"""
+        with self._lock:
+            if self.running:
+                return False
+            self.stacks = Counter()
+            self.samples = 0
+            self.sampling_seconds = 0.0
+            self.wall_seconds = 0.0
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(interval,), name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self, interval: float) -> None:
+        own_id = threading.get_ident()
+        started = time.perf_counter()
+        while not self._stop.is_set():
+            sample_start = time.perf_counter()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+            self.sampling_seconds += time.perf_counter() - sample_start
+            self._stop.wait(interval)
+        self.wall_seconds = time.perf_counter() - started
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "samples": self.samples,
+            "wall_seconds": round(self.wall_seconds, 3),
+            # Share of one core spent inside the sampler itself
+            "overhead_percent": round(self.sampling_seconds / self.wall_seconds * 100, 3) if self.wall_seconds else 0.0
+        }
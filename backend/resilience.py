@@ -0,0 +1,167 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+
+class GridUnavailableError(Exception):
+    """GRID is rate limiting or failing and no cached response is available"""
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, bursting up to `capacity`.
+
+    Callers reserve a token up front (the balance may go negative) and sleep off
+    the deficit, so no lock is needed and waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self.waits = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        self._refill()
+        self._tokens -= 1
+        if self._tokens < 0:
+            self.waits += 1
+            await asyncio.sleep(-self._tokens / self.rate)
+
+    def penalize(self, seconds: float) -> None:
+        """Drain the bucket so no request starts for roughly `seconds` (used after a 429)"""
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed -> open after `failure_threshold` consecutive failures; open ->
+    half_open once `reset_timeout` seconds pass, letting one trial request
+    through; the trial's outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.times_opened = 0
+
+    def allow_request(self) -> bool:
+        if self.state == "open":
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            else:
+                return False
+        if self.state == "half_open":
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def release_trial(self) -> None:
+        """Give up a half-open trial slot without recording an outcome"""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._trial_in_flight = False
+        self.state = "closed"
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_in_flight = False
+        if self.state == "half_open" or self._failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self._opened_at = time.monotonic()
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than a server-provided Retry-After"""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after:
+        try:
+            server_delay = float(retry_after)
+        except ValueError:
+            try:
+                server_delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                server_delay = 0.0
+        delay = max(delay, min(max(server_delay, 0.0), cap))
+    return delay
+
+
+class ResponseCache:
+    """
+    Small LRU of last-good responses, served while GRID is unavailable
+
+    Bounded by entry count and, when `max_bytes` is set, by the sizes passed
+    to put() (e.g. response body bytes); an entry larger than max_bytes on
+    its own is not cached.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[Any, Any]" = OrderedDict()
+        self._sizes: Dict[Any, int] = {}
+
+    def get(self, key: Any) -> Optional[Any]:
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: Any, value: Any, size: int = 0) -> None:
+        self._discard(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.total_bytes += size
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self.total_bytes > self.max_bytes):
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: Any) -> None:
+        if key in self._entries:
+            del self._entries[key]
+            self.total_bytes -= self._sizes.pop(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class EndpointCounters:
+    """Per-endpoint outcome counters exposed on the status endpoint"""
+
+    FIELDS = (
+        "requests", "successes", "failures", "retries", "rate_limited", "server_errors",
+        "transport_errors", "short_circuited", "served_from_cache", "cache_misses",
+    )
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {field: getattr(self, field) for field in self.FIELDS}
@@ -0,0 +1,189 @@
+"""
+Materialized per-match review agendas and personalized insights.
+
+A match document (VALORANT match_data or a LoL review match) is analyzed
+once: its macro review agenda and every listed player's personalized
+insights are stored as encoded JSON, keyed by (match_id, game), together
+with the match_data itself, a digest of it and the REVIEW_VERSION that
+produced them. /assistant/* requests for the same match are then served
+from the store; a match is only analyzed again when its content changes
+(new digest) or the analysis does (new version), and in the latter case
+from the stored match_data, so a stale review can be refreshed by match id.
+
+REVIEW_VERSION hashes rules.RULES_VERSION with the source of the modules the
+review and insights come from and the settings they read, so any change to
+the rules or the analyzers invalidates what was stored under the old version.
+Only the rule-based results are stored: the LLM summary and commentary are
+added when a review or a player's insights are served, so a match costs no
+LLM calls for players nobody asks about.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from rules import RULES_VERSION
+from stats_store import STATS_DB_PATH
+from valorant_kills import SIDES, TRADE_WINDOW
+
+_ANALYZER_MODULES = ("ai_analyzer.py", "valorant_review.py", "valorant_economy.py", "valorant_kills.py")
+
+
+def _analyzer_version() -> str:
+    digest = hashlib.sha256(f"{RULES_VERSION}:{TRADE_WINDOW}".encode())
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for module in _ANALYZER_MODULES:
+        with open(os.path.join(directory, module), "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()[:12]
+
+
+REVIEW_VERSION = _analyzer_version()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS match_reviews (
+    match_id TEXT NOT NULL,
+    game TEXT NOT NULL,
+    version TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    match_data BLOB NOT NULL,
+    review BLOB NOT NULL,
+    PRIMARY KEY (match_id, game)
+);
+
+CREATE TABLE IF NOT EXISTS player_insights (
+    match_id TEXT NOT NULL,
+    game TEXT NOT NULL,
+    player_key TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    insights BLOB NOT NULL,
+    PRIMARY KEY (match_id, game, player_key)
+);
+"""
+
+
+def match_digest(match_data: Dict[str, Any]) -> str:
+    """Content key for a match document"""
+    return hashlib.sha256(json.dumps(match_data, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def review_match_id(match_data: Dict[str, Any]) -> str:
+    """match_id (VALORANT), series_id (LoL), or the content digest for anonymous documents"""
+    return str(match_data.get("match_id") or match_data.get("series_id") or match_digest(match_data))
+
+
+def match_players(match_data: Dict[str, Any], game: str) -> List[str]:
+    """Every player named in the match document, in first-seen order"""
+    names: Dict[str, str] = {}
+    if game == "valorant":
+        for round_data in match_data.get("rounds", []):
+            for side in SIDES:
+                for player in round_data.get(side) or ():
+                    if player.get("name"):
+                        names.setdefault(player["name"].lower(), player["name"])
+    else:
+        for game_data in match_data.get("games", []):
+            for team in ("blue_team", "red_team"):
+                for player in (game_data.get(team) or {}).get("players", []):
+                    if player.get("summonerName"):
+                        names.setdefault(player["summonerName"].lower(), player["summonerName"])
+    return list(names.values())
+
+
+def materialize_match(analyzer, match_data: Dict[str, Any], game: str) -> Dict[str, Any]:
+    """The rule-based review agenda plus every listed player's personalized insights"""
+    return {
+        "review": analyzer.generate_macro_review_agenda(match_data, game, ai=False),
+        "insights": {
+            name: analyzer.generate_personalized_insights(name, match_data, game, ai=False)
+            for name in match_players(match_data, game)
+        }
+    }
+
+
+class ReviewStore:
+    """Materialized reviews backed by SQLite (the stats database by default)"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or STATS_DB_PATH
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def put(self, match_id: str, game: str, version: str, digest: str, match_data: Dict[str, Any],
+            review: bytes, insights: Dict[str, bytes]) -> str:
+        """Store (or replace) a match's review and insights; returns created_at"""
+        created_at = datetime.now(timezone.utc).isoformat()
+        encoded_match = json.dumps(match_data, separators=(",", ":"), default=str).encode()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO match_reviews (match_id, game, version, digest, created_at, match_data, review) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (match_id, game) DO UPDATE SET "
+                    "version = excluded.version, digest = excluded.digest, created_at = excluded.created_at, "
+                    "match_data = excluded.match_data, review = excluded.review",
+                    (match_id, game, version, digest, created_at, encoded_match, review)
+                )
+                self._conn.execute("DELETE FROM player_insights WHERE match_id = ? AND game = ?", (match_id, game))
+                self._conn.executemany(
+                    "INSERT INTO player_insights (match_id, game, player_key, player_name, insights) VALUES (?, ?, ?, ?, ?)",
+                    [(match_id, game, name.lower(), name, body) for name, body in insights.items()]
+                )
+        return created_at
+
+    def get(self, match_id: str, game: str) -> Optional[Dict[str, Any]]:
+        """
+        A stored review with every player's insights (encoded), or None:
+        {match_id, game, version, digest, created_at, review, insights: {name: bytes}}
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, digest, created_at, review FROM match_reviews WHERE match_id = ? AND game = ?",
+                (match_id, game)
+            ).fetchone()
+            if row is None:
+                return None
+            players = self._conn.execute(
+                "SELECT player_name, insights FROM player_insights WHERE match_id = ? AND game = ? ORDER BY rowid",
+                (match_id, game)
+            ).fetchall()
+        return {
+            "match_id": match_id,
+            "game": game,
+            "version": row["version"],
+            "digest": row["digest"],
+            "created_at": row["created_at"],
+            "review": bytes(row["review"]),
+            "insights": {player["player_name"]: bytes(player["insights"]) for player in players}
+        }
+
+    def get_match_data(self, match_id: str, game: str) -> Optional[Dict[str, Any]]:
+        """The match document a stored review was computed from"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT match_data FROM match_reviews WHERE match_id = ? AND game = ?", (match_id, game)
+            ).fetchone()
+        return json.loads(row["match_data"]) if row is not None else None
+
+    def list(self, game: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Stored reviews, newest first"""
+        sql = "SELECT match_id, game, version, created_at FROM match_reviews"
+        params: tuple = ()
+        if game:
+            sql += " WHERE game = ?"
+            params = (game,)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY created_at DESC LIMIT ?", params + (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,475 @@
+"""
+Declarative coaching rules and the evaluator they compile into.
+
+Each rule names the aggregates it reads (metric, row source, window), a list
+of conditions, and an output template. `CompiledRules` turns a rule set into
+a plan that computes every aggregate in one pass over each row source; every
+rule is then a few comparisons over the resulting values plus a template
+fill. Adding a rule that reuses existing aggregates adds no work over the
+data, and a new aggregate only adds an accumulator to the same sweep.
+
+RULES_VERSION is a hash of the whole table so stored results can be tied to
+the rules that produced them.
+"""
+import hashlib
+import json
+import operator
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# --- Table helpers ------------------------------------------------------------
+
+
+def last(n: int) -> Tuple[str, int]:
+    return ("last", n)
+
+
+def first(n: int) -> Tuple[str, int]:
+    return ("first", n)
+
+
+ALL = ("all", 0)
+
+
+def mean(source: str, metric: str, window: Tuple[str, int], default: float = 0) -> Dict[str, Any]:
+    """Sum of `metric` over the window divided by the rows in it"""
+    return {"kind": "mean", "source": source, "metric": metric, "window": window, "default": default}
+
+
+def count(source: str, window: Tuple[str, int], metric: Optional[str] = None, op: Optional[str] = None,
+          threshold: Any = None, default: Any = 0) -> Dict[str, Any]:
+    """Rows in the window, or rows where `metric op threshold`"""
+    return {"kind": "count", "source": source, "metric": metric, "window": window,
+            "op": op, "threshold": threshold, "default": default}
+
+
+def first_value(source: str, metric: str, window: Tuple[str, int], default: Any = "") -> Dict[str, Any]:
+    return {"kind": "first", "source": source, "metric": metric, "window": window, "default": default}
+
+
+def exists(source: str, metric: str, op: str, threshold: Any, window: Tuple[str, int] = ALL,
+           default: Any = None) -> Dict[str, Any]:
+    """Whether any row in the window has `metric op threshold` (stops at the first match)"""
+    return {"kind": "exists", "source": source, "metric": metric, "window": window,
+            "op": op, "threshold": threshold, "default": default}
+
+
+def ref(name: str, factor: float = 1.0) -> Dict[str, Any]:
+    """Condition right-hand side that reads another value, optionally scaled"""
+    return {"ref": name, "factor": factor}
+
+
+# --- Player rules -------------------------------------------------------------
+# Source "games": one player's game rows, oldest first.
+# Context: kda_trend (from PlayerTrendTracker).
+
+PLAYER_AGGREGATES = {
+    "avg_kda": mean("games", "kda", last(5)),
+    "avg_cs": mean("games", "cs_per_min", last(5)),
+    "avg_vision": mean("games", "vision_score", last(5)),
+    "games_total": count("games", ALL),
+    "plays_vision_role": exists("games", "role", "in", ("Jungle", "Support")),
+    "recent_games": count("games", last(10)),
+    "role": first_value("games", "role", last(10)),
+    "high_death_games": count("games", last(10), "deaths", ">=", 5),
+    "low_cs_games": count("games", last(10), "cs_per_min", "<", 6.5),
+    "low_vision_games": count("games", last(10), "vision_score", "<", 40),
+    "low_damage_games": count("games", last(10), "damage_dealt", "<", 12000, default=10000),
+    "first_half_kda": mean("games", "kda", first(5)),
+}
+
+PLAYER_RULES = [
+    # Insights (last 5 games)
+    {
+        "id": "insight.low_kda", "group": "insights",
+        "when": [("avg_kda", "<", 2.5)],
+        "output": {
+            "type": "concern",
+            "category": "Combat",
+            "message": "KDA below optimal threshold. Current: {avg_kda:.2f}",
+            "recommendation": "Focus on positioning in team fights and reducing unnecessary deaths"
+        }
+    },
+    {
+        "id": "insight.low_vision", "group": "insights",
+        "when": [("avg_vision", "<", 30), ("plays_vision_role", "==", True)],
+        "output": {
+            "type": "concern",
+            "category": "Vision Control",
+            "message": "Vision score needs improvement. Current: {avg_vision:.1f}",
+            "recommendation": "Increase ward placement frequency, especially before objectives"
+        }
+    },
+    {
+        "id": "insight.kda_declining", "group": "insights",
+        "when": [("kda_trend", "==", "declining")],
+        "output": {
+            "type": "warning",
+            "category": "Performance Trend",
+            "message": "KDA showing declining trend over last 10 games",
+            "recommendation": "Review recent VODs for recurring mistakes in decision-making"
+        }
+    },
+    {
+        "id": "insight.kda_improving", "group": "insights",
+        "when": [("kda_trend", "==", "improving")],
+        "output": {
+            "type": "positive",
+            "category": "Performance Trend",
+            "message": "KDA showing improvement trend - keep up the momentum",
+            "recommendation": "Continue current practice regimen"
+        }
+    },
+    # Recurring mistakes (last 10 games, at least 3 played)
+    {
+        "id": "mistake.high_deaths", "group": "recurring_mistakes",
+        "when": [("games_total", ">=", 3), ("high_death_games", ">=", ref("recent_games", 0.6))],
+        "output": {
+            "pattern": "High Death Count",
+            "frequency": "{high_death_games}/{recent_games} games",
+            "severity": "critical",
+            "description": "Player consistently dies 5+ times per game",
+            "impact": "High death count leads to gold deficit, lost map pressure, and missed objectives",
+            "recommendation": "Review positioning in team fights. Avoid face-checking bushes. Ward deeper before objectives."
+        }
+    },
+    {
+        "id": "mistake.low_cs", "group": "recurring_mistakes",
+        "when": [("games_total", ">=", 3), ("role", "in", ("ADC", "Mid", "Top")),
+                 ("low_cs_games", ">=", ref("recent_games", 0.5))],
+        "output": {
+            "pattern": "Poor CS Management",
+            "frequency": "{low_cs_games}/{recent_games} games",
+            "severity": "high",
+            "description": "{role} player consistently below 6.5 CS/min",
+            "impact": "Low CS leads to gold deficit, delayed item spikes, reduced team fight impact",
+            "recommendation": "Practice last-hitting in practice tool. Focus on wave management. Don't roam at cost of waves."
+        }
+    },
+    {
+        "id": "mistake.low_vision", "group": "recurring_mistakes",
+        "when": [("games_total", ">=", 3), ("role", "in", ("Jungle", "Support")),
+                 ("low_vision_games", ">=", ref("recent_games", 0.6))],
+        "output": {
+            "pattern": "Insufficient Vision Control",
+            "frequency": "{low_vision_games}/{recent_games} games",
+            "severity": "high",
+            "description": "{role} consistently below 40 vision score",
+            "impact": "Poor vision control leads to ganks, lost objectives, and unsafe rotations",
+            "recommendation": "Ward before every objective. Sweep enemy vision. Buy more control wards (aim for 2+ per back)."
+        }
+    },
+    {
+        "id": "mistake.low_damage", "group": "recurring_mistakes",
+        "when": [("games_total", ">=", 3), ("low_damage_games", ">=", ref("recent_games", 0.5)),
+                 ("role", "in", ("ADC", "Mid"))],
+        "output": {
+            "pattern": "Low Damage Output",
+            "frequency": "{low_damage_games}/{recent_games} games",
+            "severity": "medium",
+            "description": "Carry role with consistently low damage to champions",
+            "impact": "Low damage means team can't secure kills or win team fights effectively",
+            "recommendation": "Position more aggressively in fights. Focus on damage uptime. Review target selection."
+        }
+    },
+    {
+        "id": "mistake.kda_decline", "group": "recurring_mistakes",
+        "when": [("games_total", ">=", 10), ("avg_kda", "<", ref("first_half_kda", 0.7))],
+        "output": {
+            "pattern": "Performance Decline",
+            "frequency": "Recent trend",
+            "severity": "critical",
+            "description": "KDA dropped from {first_half_kda:.2f} to {avg_kda:.2f}",
+            "impact": "Declining performance suggests burnout, meta adjustment issues, or mechanical decline",
+            "recommendation": "Take a break. Review recent patch changes. Watch VODs to identify new bad habits."
+        }
+    },
+]
+
+# --- Team rules ---------------------------------------------------------------
+# Source "team": team rows (one per series); "role:<Role>": player rows in that role.
+
+TEAM_AGGREGATES = {
+    "matches": count("team", last(10)),
+    "wins": count("team", last(10), "win", "truthy", default=False),
+    "avg_dragons": mean("team", "dragons_secured", last(10)),
+    "avg_barons": mean("team", "barons_secured", last(10)),
+    "first_bloods": count("team", last(10), "first_blood", "truthy", default=False),
+    "jungle_games": count("role:Jungle", ALL),
+    "avg_jungle_vision": mean("role:Jungle", "vision_score", last(5)),
+    "avg_jungle_kda": mean("role:Jungle", "kda", last(5)),
+    "adc_games": count("role:ADC", ALL),
+    "avg_adc_deaths": mean("role:ADC", "deaths", last(5)),
+    "support_games": count("role:Support", ALL),
+    "avg_support_vision": mean("role:Support", "vision_score", last(5)),
+    "mid_games": count("role:Mid", ALL),
+    "avg_mid_assists": mean("role:Mid", "assists", last(5)),
+    "avg_mid_cs": mean("role:Mid", "cs_per_min", last(5)),
+    "top_games": count("role:Top", ALL),
+    "avg_top_kda": mean("role:Top", "kda", last(5)),
+}
+
+# name -> (numerator, denominator, scale)
+TEAM_RATIOS = {
+    "win_rate": ("wins", "matches", 1),
+    "win_rate_pct": ("wins", "matches", 100),
+    "first_blood_rate": ("first_bloods", "matches", 1),
+}
+
+TEAM_RULES = [
+    {
+        "id": "team.low_win_rate", "group": "strategic_insights",
+        "when": [("win_rate", "<", 0.45)],
+        "output": {
+            "type": "critical",
+            "category": "Win Rate",
+            "message": "Win rate at {win_rate_pct:.1f}% - below competitive threshold",
+            "recommendation": "Schedule strategic review session. Focus on draft phase and early game plans"
+        }
+    },
+    {
+        "id": "team.low_dragons", "group": "strategic_insights",
+        "when": [("avg_dragons", "<", 2.0)],
+        "output": {
+            "type": "concern",
+            "category": "Objective Priority",
+            "message": "Dragon control below optimal level",
+            "recommendation": "Improve bot lane priority and jungle pathing around dragon spawn timers"
+        }
+    },
+    {
+        "id": "team.passive_early", "group": "strategic_insights",
+        "when": [("first_blood_rate", "<", 0.35)],
+        "output": {
+            "type": "warning",
+            "category": "Early Game",
+            "message": "Low first blood rate indicates passive early game",
+            "recommendation": "Work on level 2-3 power spikes and aggressive lane trading"
+        }
+    },
+    {
+        "id": "macro.jungle_vision_dragons", "group": "player_macro_connections",
+        "when": [("jungle_games", ">", 0), ("avg_jungle_vision", "<", 35), ("avg_dragons", "<", 2.0)],
+        "output": {
+            "player_role": "Jungle",
+            "issue": "Low vision control correlating with poor dragon control",
+            "micro_pattern": "Jungler averaging {avg_jungle_vision:.1f} vision score",
+            "macro_impact": "Limited vision around objectives leading to lost neutral objectives and ambushes",
+            "recommendation": "Jungler should prioritize deep wards 1 minute before dragon spawns. Ward enemy jungle entrance and river bushes.",
+            "severity": "critical"
+        }
+    },
+    {
+        "id": "macro.jungle_deaths", "group": "player_macro_connections",
+        "when": [("jungle_games", ">", 0), ("avg_jungle_kda", "<", 2.0)],
+        "output": {
+            "player_role": "Jungle",
+            "issue": "Jungler dying frequently in enemy jungle",
+            "micro_pattern": "Jungler KDA {avg_jungle_kda:.2f} - likely invading without vision",
+            "macro_impact": "Jungle deaths lead to lost map pressure, stolen camps, and objective disadvantage",
+            "recommendation": "Avoid blind invades. Track enemy jungler position. Request lane priority before invading.",
+            "severity": "high"
+        }
+    },
+    {
+        "id": "macro.bot_priority", "group": "player_macro_connections",
+        "when": [("adc_games", ">", 0), ("support_games", ">", 0),
+                 ("avg_adc_deaths", ">=", 4), ("avg_support_vision", "<", 60)],
+        "output": {
+            "player_role": "Bot Lane",
+            "issue": "ADC high deaths + Support low vision = lost bot priority",
+            "micro_pattern": "ADC dying {avg_adc_deaths:.1f}x/game, Support {avg_support_vision:.0f} vision",
+            "macro_impact": "Lost bot priority prevents dragon control and loses map pressure for entire team",
+            "recommendation": "Support: Ward deeper. ADC: Play safer, respect enemy jungle proximity. Coordinate backs together.",
+            "severity": "critical"
+        }
+    },
+    {
+        "id": "macro.mid_low_roams", "group": "player_macro_connections",
+        "when": [("mid_games", ">", 0), ("avg_mid_assists", "<", 4), ("first_blood_rate", "<", 0.35)],
+        "output": {
+            "player_role": "Mid",
+            "issue": "Low roam presence affecting early game across map",
+            "micro_pattern": "Mid averaging {avg_mid_assists:.1f} assists - minimal roaming",
+            "macro_impact": "Mid staying in lane allows enemy mid to roam freely and snowball sidelanes",
+            "recommendation": "Coordinate roams with jungler. Push wave then roam on cannon waves. Use TP for bot lane plays.",
+            "severity": "medium"
+        }
+    },
+    {
+        "id": "macro.mid_over_roaming", "group": "player_macro_connections",
+        "when": [("mid_games", ">", 0), ("avg_mid_cs", "<", 6.5), ("avg_mid_assists", ">", 7)],
+        "output": {
+            "player_role": "Mid",
+            "issue": "Over-roaming sacrificing personal farm and levels",
+            "micro_pattern": "Mid low CS ({avg_mid_cs:.1f}/min) but high assists ({avg_mid_assists:.1f})",
+            "macro_impact": "Mid falls behind in gold/XP, reducing team fight impact and creating scaling disadvantage",
+            "recommendation": "Balance roaming with farm. Only roam with high-success plays. Fast-push waves before leaving lane.",
+            "severity": "medium"
+        }
+    },
+    {
+        "id": "macro.top_not_converting", "group": "player_macro_connections",
+        "when": [("top_games", ">", 0), ("win_rate", "<", 0.45), ("avg_top_kda", ">", 3.0)],
+        "output": {
+            "player_role": "Top",
+            "issue": "Top performing well individually but team still losing",
+            "micro_pattern": "Top has good KDA ({avg_top_kda:.2f}) despite team struggles",
+            "macro_impact": "Top lane winning but not translating to map pressure - possible TP timing issues or poor split push decisions",
+            "recommendation": "Use TP for bot lane/dragon fights. Apply split push pressure when team is safe. Join team for baron setups.",
+            "severity": "medium"
+        }
+    },
+]
+
+# --- Compiler -----------------------------------------------------------------
+
+_OPS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "in": lambda value, options: value in options,
+    "truthy": lambda value, _: bool(value),
+}
+
+
+class CompiledRules:
+    """A rule set compiled into a single-sweep aggregate plan and pre-split output templates"""
+
+    def __init__(self, aggregates: Dict[str, Dict[str, Any]], rules: List[Dict[str, Any]],
+                 ratios: Optional[Dict[str, Tuple[str, str, float]]] = None):
+        self.ratios = ratios or {}
+        self.groups: List[str] = list(dict.fromkeys(rule["group"] for rule in rules))
+
+        # source -> window -> column (metric, default) -> [(name, kind, predicate, threshold)]
+        # Each column is extracted once per window and shared by every aggregate reading it
+        self.plan: Dict[str, Dict[Tuple, Dict[Tuple, List[Tuple]]]] = {}
+        for name, agg in aggregates.items():
+            predicate = _OPS[agg["op"]] if agg.get("op") else None
+            columns = self.plan.setdefault(agg["source"], {}).setdefault(agg["window"], {})
+            columns.setdefault((agg["metric"], agg["default"]), []).append(
+                (name, agg["kind"], predicate, agg.get("threshold"))
+            )
+
+        self.rules = []
+        for rule in rules:
+            for lhs, op, _ in rule["when"]:
+                if op not in _OPS:
+                    raise ValueError(f"Rule {rule['id']}: unknown operator {op!r}")
+            conditions = [
+                (lhs, _OPS[op], (rhs["ref"], rhs["factor"]) if isinstance(rhs, dict) else None, rhs)
+                for lhs, op, rhs in rule["when"]
+            ]
+            # Fields without placeholders are copied as-is instead of formatted
+            templated = tuple(k for k, v in rule["output"].items() if "{" in v)
+            self.rules.append((rule["group"], conditions, dict(rule["output"]), templated))
+
+    @staticmethod
+    def _bounds(window: Tuple[str, int], n: int) -> Tuple[int, int]:
+        kind, size = window
+        if kind == "last":
+            return max(0, n - size), n
+        if kind == "first":
+            return 0, min(size, n)
+        return 0, n
+
+    def aggregate(self, sources: Dict[str, Sequence[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Compute every aggregate from per-window columns of each source's rows"""
+        values: Dict[str, Any] = {}
+        for source, windows in self.plan.items():
+            rows = sources.get(source) or []
+            for window, columns in windows.items():
+                lo, hi = self._bounds(window, len(rows))
+                window_rows = rows[lo:hi]
+                size = hi - lo
+                for (metric, default), specs in columns.items():
+                    column = None
+                    if metric is not None and any(spec[1] != "exists" for spec in specs):
+                        column = [row.get(metric, default) for row in window_rows]
+                    for name, kind, predicate, threshold in specs:
+                        if kind == "exists":
+                            values[name] = any(
+                                predicate(row.get(metric, default), threshold) for row in window_rows
+                            )
+                        elif kind == "count":
+                            values[name] = size if predicate is None else sum(
+                                1 for value in column if predicate(value, threshold)
+                            )
+                        elif kind == "mean":
+                            values[name] = sum(column) / size if size else 0.0
+                        else:
+                            values[name] = column[0] if column and column[0] is not None else default
+
+        for name, (numerator, denominator, scale) in self.ratios.items():
+            values[name] = values[numerator] / values[denominator] * scale if values[denominator] else 0.0
+        return values
+
+    def evaluate(self, sources: Dict[str, Sequence[Dict[str, Any]]],
+                 context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Aggregate once, then fire every rule; returns {"values": ..., <group>: [outputs]}"""
+        values = self.aggregate(sources)
+        if context:
+            values.update(context)
+
+        result: Dict[str, Any] = {group: [] for group in self.groups}
+        for group, conditions, output, templated in self.rules:
+            for lhs, compare, reference, literal in conditions:
+                rhs = values[reference[0]] * reference[1] if reference else literal
+                if not compare(values.get(lhs), rhs):
+                    break
+            else:
+                fired = dict(output)
+                for key in templated:
+                    fired[key] = output[key].format_map(values)
+                result[group].append(fired)
+        result["values"] = values
+        return result
+
+
+def _rules_version() -> str:
+    table = {
+        "player": {"aggregates": PLAYER_AGGREGATES, "rules": PLAYER_RULES},
+        "team": {"aggregates": TEAM_AGGREGATES, "ratios": TEAM_RATIOS, "rules": TEAM_RULES},
+    }
+    return hashlib.sha256(json.dumps(table, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+PLAYER_ENGINE = CompiledRules(PLAYER_AGGREGATES, PLAYER_RULES)
+TEAM_ENGINE = CompiledRules(TEAM_AGGREGATES, TEAM_RULES, TEAM_RATIOS)
+RULES_VERSION = _rules_version()
+
+
+def evaluate_player(stats: Sequence[Dict[str, Any]], kda_trend: Optional[str] = None) -> Dict[str, Any]:
+    """Player insights and recurring mistakes over one player's rows (oldest first)"""
+    return PLAYER_ENGINE.evaluate({"games": stats}, {"kda_trend": kda_trend})
+
+
+def evaluate_team(team_stats: Sequence[Dict[str, Any]], player_stats: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Team strategic insights and micro-to-macro connections"""
+    by_role: Dict[str, List[Dict[str, Any]]] = {}
+    for row in player_stats:
+        by_role.setdefault(f"role:{row.get('role')}", []).append(row)
+    return TEAM_ENGINE.evaluate({"team": team_stats, **by_role})
+
+
+def evaluate_roster(player_stats: Dict[str, Sequence[Dict[str, Any]]], team_stats: Sequence[Dict[str, Any]],
+                    kda_trends: Optional[Dict[str, Optional[str]]] = None) -> Dict[str, Any]:
+    """
+    Every player's evaluation plus the team evaluation from one walk over the roster.
+
+    Each player's rows are evaluated and bucketed into the team's role sources
+    in the same loop, so the team rules reuse that grouping instead of
+    flattening and re-scanning every player's history.
+    """
+    kda_trends = kda_trends or {}
+    players = {}
+    by_role: Dict[str, List[Dict[str, Any]]] = {}
+    for name, stats in player_stats.items():
+        if not stats:
+            continue
+        players[name] = PLAYER_ENGINE.evaluate({"games": stats}, {"kda_trend": kda_trends.get(name)})
+        for row in stats:
+            by_role.setdefault(f"role:{row.get('role')}", []).append(row)
+    team = TEAM_ENGINE.evaluate({"team": team_stats, **by_role}) if team_stats else None
+    return {"players": players, "team": team}
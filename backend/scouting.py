@@ -0,0 +1,208 @@
+from bisect import bisect_right
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+RECENT_RESULTS = 10
+
+
+class _PlayerProfile:
+    """Running sums for one player on one team in one role"""
+
+    __slots__ = ("games", "kills", "deaths", "assists", "kda", "cs_per_min", "vision_score", "damage_dealt", "champions")
+
+    def __init__(self):
+        self.games = 0
+        self.kills = 0
+        self.deaths = 0
+        self.assists = 0
+        self.kda = 0.0
+        self.cs_per_min = 0.0
+        self.vision_score = 0.0
+        self.damage_dealt = 0
+        self.champions: Counter = Counter()
+
+    def add(self, row: Dict[str, Any]) -> None:
+        self.games += 1
+        self.kills += row.get("kills", 0) or 0
+        self.deaths += row.get("deaths", 0) or 0
+        self.assists += row.get("assists", 0) or 0
+        self.kda += row.get("kda", 0) or 0
+        self.cs_per_min += row.get("cs_per_min", 0) or 0
+        self.vision_score += row.get("vision_score", 0) or 0
+        self.damage_dealt += row.get("damage_dealt", 0) or 0
+        if row.get("champion"):
+            self.champions[row["champion"]] += 1
+
+
+class _TeamAggregate:
+    """Running objective and roster aggregates for one team"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.games = 0
+        self.wins = 0
+        self.kills = 0
+        self.deaths = 0
+        self.dragons = 0
+        self.barons = 0
+        self.towers = 0
+        self.first_bloods = 0
+        self.duration_min = 0.0
+        # The RECENT_RESULTS latest games by played_at (undated first, ties in
+        # arrival order), whatever order they were ingested in
+        self._recent_times: List[str] = []
+        self.recent_results: List[Dict[str, Any]] = []
+        self.opponents: Counter = Counter()
+        self.tournaments: Counter = Counter()
+        # role -> player -> profile
+        self.roles: Dict[str, Dict[str, _PlayerProfile]] = {}
+
+    def add_game(self, row: Dict[str, Any]) -> None:
+        self.games += 1
+        self.wins += 1 if row.get("win") else 0
+        self.kills += row.get("kills", 0) or 0
+        self.deaths += row.get("deaths", 0) or 0
+        self.dragons += row.get("dragons", 0) or 0
+        self.barons += row.get("barons", 0) or 0
+        self.towers += row.get("towers", 0) or 0
+        self.first_bloods += 1 if row.get("first_blood") else 0
+        self.duration_min += row.get("duration_min", 0) or 0
+        self._add_recent_result(row)
+        if row.get("opponent"):
+            self.opponents[row["opponent"]] += 1
+        if row.get("tournament"):
+            self.tournaments[row["tournament"]] += 1
+
+    def _add_recent_result(self, row: Dict[str, Any]) -> None:
+        played_at = row.get("played_at") or ""
+        if len(self.recent_results) >= RECENT_RESULTS and played_at < self._recent_times[0]:
+            return
+        i = bisect_right(self._recent_times, played_at)
+        self._recent_times.insert(i, played_at)
+        self.recent_results.insert(i, {
+            "match_id": row.get("match_id"),
+            "opponent": row.get("opponent"),
+            "win": bool(row.get("win")),
+            "played_at": row.get("played_at")
+        })
+        if len(self.recent_results) > RECENT_RESULTS:
+            self._recent_times.pop(0)
+            self.recent_results.pop(0)
+
+    def add_player_game(self, row: Dict[str, Any]) -> None:
+        role = row.get("role") or "Unknown"
+        players = self.roles.setdefault(role, {})
+        profile = players.get(row["player_name"])
+        if profile is None:
+            profile = players[row["player_name"]] = _PlayerProfile()
+        profile.add(row)
+
+    def materialize(self) -> Dict[str, Any]:
+        games = self.games or 1
+        roster = {}
+        for role, players in self.roles.items():
+            ranked = sorted(players.items(), key=lambda item: item[1].games, reverse=True)
+            roster[role] = [
+                {
+                    "player_name": player_name,
+                    "games": p.games,
+                    "avg_kills": round(p.kills / p.games, 1),
+                    "avg_deaths": round(p.deaths / p.games, 1),
+                    "avg_assists": round(p.assists / p.games, 1),
+                    "avg_kda": round(p.kda / p.games, 2),
+                    "avg_cs_per_min": round(p.cs_per_min / p.games, 1),
+                    "avg_vision_score": round(p.vision_score / p.games, 1),
+                    "avg_damage_dealt": round(p.damage_dealt / p.games),
+                    "top_champions": [
+                        {"champion": champ, "games": count} for champ, count in p.champions.most_common(3)
+                    ]
+                }
+                for player_name, p in ranked
+            ]
+
+        return {
+            "team": self.name,
+            "games_played": self.games,
+            "wins": self.wins,
+            "win_rate": round(self.wins / games * 100, 1),
+            "objective_control": {
+                "avg_dragons": round(self.dragons / games, 2),
+                "avg_barons": round(self.barons / games, 2),
+                "avg_towers": round(self.towers / games, 2),
+                "first_blood_rate": round(self.first_bloods / games * 100, 1)
+            },
+            "avg_kills": round(self.kills / games, 1),
+            "avg_deaths": round(self.deaths / games, 1),
+            "avg_game_duration": round(self.duration_min / games, 1),
+            "recent_results": list(reversed(self.recent_results)),
+            "most_faced_opponents": [{"team": t, "games": n} for t, n in self.opponents.most_common(5)],
+            "tournaments": [t for t, _ in self.tournaments.most_common()],
+            "roster": roster
+        }
+
+
+class ScoutingAggregator:
+    """
+    Per-team scouting aggregates maintained at ingest time.
+
+    Every team seen in a series (not just Cloud9) gets running objective and
+    per-role player sums. Profiles are re-materialized only for the teams
+    touched by an ingest, so serving a scouting report is a dictionary lookup.
+    """
+
+    def __init__(self):
+        self._teams: Dict[str, _TeamAggregate] = {}
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        self._seen_team_games = set()
+        self._seen_player_games = set()
+
+    @staticmethod
+    def _key(team: str) -> str:
+        return team.strip().lower()
+
+    def _team(self, name: str) -> _TeamAggregate:
+        key = self._key(name)
+        if key not in self._teams:
+            self._teams[key] = _TeamAggregate(name)
+        return self._teams[key]
+
+    def ingest(self, team_games: Iterable[Dict[str, Any]], player_games: Iterable[Dict[str, Any]]) -> List[str]:
+        """Fold new team-game and player-game rows into the aggregates and refresh their views"""
+        touched = set()
+
+        for row in team_games:
+            if not row.get("team"):
+                continue
+            dedupe_key = (row.get("match_id"), self._key(row["team"]))
+            if dedupe_key in self._seen_team_games:
+                continue
+            self._seen_team_games.add(dedupe_key)
+            self._team(row["team"]).add_game(row)
+            touched.add(self._key(row["team"]))
+
+        for row in player_games:
+            if not row.get("team"):
+                continue
+            dedupe_key = (row.get("match_id"), row.get("player_name"))
+            if dedupe_key in self._seen_player_games:
+                continue
+            self._seen_player_games.add(dedupe_key)
+            self._team(row["team"]).add_player_game(row)
+            touched.add(self._key(row["team"]))
+
+        for key in touched:
+            self._profiles[key] = self._teams[key].materialize()
+
+        return [self._teams[key].name for key in touched]
+
+    def load(self, store) -> int:
+        """Rebuild aggregates from a StatsStore at startup"""
+        self.ingest(store.iter_team_games(game="lol", chronological=True),
+                    store.iter_player_games(game="lol", chronological=True))
+        return len(self._teams)
+
+    def profile(self, team: str) -> Optional[Dict[str, Any]]:
+        return self._profiles.get(self._key(team))
+
+    def teams(self) -> List[str]:
+        return sorted(agg.name for agg in self._teams.values())
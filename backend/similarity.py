@@ -0,0 +1,309 @@
+"""
+Nearest-neighbor player similarity over per-role stat vectors.
+
+Each LoL player is a vector of their average FEATURES over their most recent
+SIMILARITY_WINDOW_GAMES games (by played_at), filed under the role they played
+most in that window. Vectors are z-scored within the role (a support's vision
+score is compared to other supports'), so "who looks like Blaber" means who
+stands out from their role the same way, and players can also be compared
+against another role's pool.
+
+Ingest only updates the players it touched (running sums over the window).
+A role's matrix is rebuilt lazily on the next query: patched row by row when
+only existing players changed, rebuilt when players joined or left the role.
+Queries are brute-force over the role's matrix with numpy (one matrix
+product for a whole batch of queries, then argpartition for the top k),
+or a KD-tree when scipy is installed and the role has at least
+SIMILARITY_KDTREE_MIN players. numpy and scipy are imported on first query,
+not at startup.
+"""
+import os
+from bisect import bisect_right
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+FEATURES = ("kda", "cs_per_min", "vision_score", "damage_dealt", "gold_earned", "performance_score")
+
+WINDOW_GAMES = int(os.getenv("SIMILARITY_WINDOW_GAMES", "20"))
+MIN_GAMES = int(os.getenv("SIMILARITY_MIN_GAMES", "3"))  # games before a player is indexed
+INDEX_MODE = os.getenv("SIMILARITY_INDEX", "auto")  # auto, brute or kdtree
+KDTREE_MIN = int(os.getenv("SIMILARITY_KDTREE_MIN", "2048"))
+
+_kdtree_class = None  # None: not looked up yet; False: scipy unavailable
+
+
+def _kdtree():
+    """scipy's cKDTree, or False without scipy"""
+    global _kdtree_class
+    if _kdtree_class is None:
+        try:
+            from scipy.spatial import cKDTree
+            _kdtree_class = cKDTree
+        except ImportError:
+            _kdtree_class = False
+    return _kdtree_class
+
+
+def _key(name: str) -> str:
+    return name.strip().lower()
+
+
+class _PlayerWindow:
+    """A player's WINDOW_GAMES most recent feature rows by played_at, with running sums"""
+
+    __slots__ = ("name", "team", "times", "rows", "roles", "sums")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.team: Optional[str] = None
+        # Parallel lists ordered by played_at (undated rows first, ties in arrival order)
+        self.times: List[str] = []
+        self.rows: List[Tuple[str, Tuple[float, ...]]] = []
+        self.roles: Counter = Counter()
+        self.sums = [0.0] * len(FEATURES)
+
+    def add(self, row: Dict[str, Any]) -> bool:
+        """Fold in one game; False if it is older than every game in a full window"""
+        played_at = row.get("played_at") or ""
+        if len(self.rows) >= WINDOW_GAMES and played_at < self.times[0]:
+            return False
+        values = tuple(float(row.get(feature) or 0) for feature in FEATURES)
+        role = row.get("role") or "Unknown"
+        i = bisect_right(self.times, played_at)
+        newest = i == len(self.times)
+        self.times.insert(i, played_at)
+        self.rows.insert(i, (role, values))
+        self.roles[role] += 1
+        for j, value in enumerate(values):
+            self.sums[j] += value
+        if len(self.rows) > WINDOW_GAMES:
+            self.times.pop(0)
+            old_role, old_values = self.rows.pop(0)
+            self.roles[old_role] -= 1
+            for j, value in enumerate(old_values):
+                self.sums[j] -= value
+        if row.get("team") and newest:
+            self.team = row["team"]
+        return True
+
+    @property
+    def games(self) -> int:
+        return len(self.rows)
+
+    @property
+    def role(self) -> str:
+        return self.roles.most_common(1)[0][0]
+
+    def vector(self) -> List[float]:
+        return [total / len(self.rows) for total in self.sums]
+
+
+class _RolePool:
+    """The players filed under one role and their (lazily built) normalized matrix"""
+
+    def __init__(self, role: str):
+        self.role = role
+        self.players: List[_PlayerWindow] = []
+        self.positions: Dict[str, int] = {}  # player key -> row
+        self.changed: set = set()  # rows whose vector changed since the last build
+        self.stale = True  # membership changed: rebuild everything
+        self._raw = None
+        self.mean = None
+        self.std = None
+        self.normalized = None
+        self._tree = None
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def upsert(self, key: str, player: _PlayerWindow) -> None:
+        position = self.positions.get(key)
+        if position is None:
+            self.positions[key] = len(self.players)
+            self.players.append(player)
+            self.stale = True
+        else:
+            self.changed.add(position)
+
+    def remove(self, key: str) -> None:
+        """Swap-remove a player who moved to another role"""
+        position = self.positions.pop(key)
+        last = self.players.pop()
+        if position < len(self.players):
+            self.players[position] = last
+            self.positions[_key(last.name)] = position
+        self.stale = True
+
+    def build(self) -> None:
+        """Bring the normalized matrix (and KD-tree) up to date with the players"""
+        if not self.stale and not self.changed:
+            return
+        import numpy as np
+
+        if self.stale:
+            self._raw = np.array([player.vector() for player in self.players], dtype=float).reshape(-1, len(FEATURES))
+        else:
+            rows = sorted(self.changed)
+            self._raw[rows] = [self.players[row].vector() for row in rows]
+        self.mean = self._raw.mean(axis=0)
+        std = self._raw.std(axis=0)
+        self.std = np.where(std > 1e-9, std, 1.0)
+        self.normalized = (self._raw - self.mean) / self.std
+
+        self._tree = None
+        tree_class = _kdtree() if INDEX_MODE != "brute" else False
+        if tree_class and (INDEX_MODE == "kdtree" or len(self.players) >= KDTREE_MIN):
+            self._tree = tree_class(self.normalized)
+        self.stale = False
+        self.changed = set()
+
+    def nearest(self, queries, k: int, exclude: List[Optional[int]]) -> Tuple[Any, Any]:
+        """
+        (distances, rows) of the k nearest players to each query row, nearest
+        first; exclude[i] is a row to leave out of query i's results (itself)
+        """
+        import numpy as np
+
+        size = len(self.players)
+        # One extra neighbor so dropping the query's own row still leaves k
+        fetch = min(k + 1, size)
+        if self._tree is not None:
+            distances, rows = self._tree.query(queries, k=fetch)
+            distances = distances.reshape(len(queries), fetch)
+            rows = rows.reshape(len(queries), fetch)
+        else:
+            # ||q - x||^2 = ||q||^2 - 2 q.x + ||x||^2 for every (query, player) pair at once
+            squared = ((queries ** 2).sum(axis=1)[:, None] - 2 * queries @ self.normalized.T
+                       + (self.normalized ** 2).sum(axis=1)[None, :])
+            np.maximum(squared, 0, out=squared)
+            if fetch < size:
+                rows = np.argpartition(squared, fetch - 1, axis=1)[:, :fetch]
+            else:
+                rows = np.tile(np.arange(size), (len(queries), 1))
+            squared = np.take_along_axis(squared, rows, axis=1)
+            order = np.argsort(squared, axis=1, kind="stable")
+            rows = np.take_along_axis(rows, order, axis=1)
+            distances = np.sqrt(np.take_along_axis(squared, order, axis=1))
+
+        kept_distances, kept_rows = [], []
+        for i in range(len(queries)):
+            keep = [j for j in range(fetch) if rows[i, j] != exclude[i]][:k]
+            kept_distances.append(distances[i, keep])
+            kept_rows.append(rows[i, keep])
+        return kept_distances, kept_rows
+
+
+class PlayerSimilarityIndex:
+    """Per-role player vectors maintained at ingest, queried for the k most similar players"""
+
+    def __init__(self):
+        self._players: Dict[str, _PlayerWindow] = {}
+        self._roles: Dict[str, _RolePool] = {}
+        self._filed: Dict[str, str] = {}  # player key -> role pool they're in
+        self._seen_player_games = set()
+
+    def ingest(self, player_games: Iterable[Dict[str, Any]]) -> int:
+        """
+        Fold LoL player-game rows into the players' windows, which keep each
+        player's most recent games by played_at in whatever order rows arrive
+        (backfill stores newest first); returns rows counted
+        """
+        touched = set()
+        counted = 0
+        for row in player_games:
+            if not row.get("player_name") or (row.get("game") or "lol") != "lol":
+                continue
+            dedupe_key = (row.get("match_id"), row["player_name"])
+            if dedupe_key in self._seen_player_games:
+                continue
+            self._seen_player_games.add(dedupe_key)
+            counted += 1
+            key = _key(row["player_name"])
+            player = self._players.get(key)
+            if player is None:
+                player = self._players[key] = _PlayerWindow(row["player_name"])
+            if player.add(row):
+                touched.add(key)
+
+        for key in touched:
+            player = self._players[key]
+            if player.games < MIN_GAMES:
+                continue
+            role = player.role
+            filed = self._filed.get(key)
+            if filed is not None and filed != role:
+                self._roles[filed].remove(key)
+            pool = self._roles.get(role)
+            if pool is None:
+                pool = self._roles[role] = _RolePool(role)
+            pool.upsert(key, player)
+            self._filed[key] = role
+        return counted
+
+    def load(self, store) -> int:
+        """Rebuild the windows from a StatsStore at startup, oldest game first"""
+        return self.ingest(store.iter_player_games(game="lol", chronological=True))
+
+    def roles(self) -> Dict[str, int]:
+        """Indexed players per role"""
+        return {role: len(pool) for role, pool in sorted(self._roles.items())}
+
+    def _describe(self, player: _PlayerWindow, pool: _RolePool, row: int) -> Dict[str, Any]:
+        return {
+            "player_name": player.name,
+            "team": player.team,
+            "role": pool.role,
+            "games": player.games,
+            "averages": {feature: round(value, 2) for feature, value in zip(FEATURES, player.vector())},
+            "z_scores": {feature: round(float(value), 2) for feature, value in zip(FEATURES, pool.normalized[row])}
+        }
+
+    def similar_batch(self, player_names: List[str], k: int = 10, role: Optional[str] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        The k players most similar to each named player, searched in `role`
+        (default: each player's own role) with one brute-force pass (or KD-tree
+        query) per role pool. None for players that aren't indexed.
+        """
+        import numpy as np
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(player_names)
+        # target role -> [(result index, player key, player's own pool)]
+        batches: Dict[str, List[Tuple[int, str, _RolePool]]] = {}
+        for i, name in enumerate(player_names):
+            key = _key(name)
+            own_role = self._filed.get(key)
+            if own_role is None:
+                continue
+            target = role if role is not None else own_role
+            target = next((r for r in self._roles if r.lower() == target.lower()), target)
+            if target not in self._roles:
+                continue
+            batches.setdefault(target, []).append((i, key, self._roles[own_role]))
+
+        for target, queries in batches.items():
+            pool = self._roles[target]
+            for _, _, own_pool in queries:
+                own_pool.build()
+            pool.build()
+            # Each query is the player's z-scores within their own role
+            matrix = np.array([own_pool.normalized[own_pool.positions[key]] for _, key, own_pool in queries])
+            exclude = [pool.positions.get(key) if own_pool is pool else None for _, key, own_pool in queries]
+            distances, rows = pool.nearest(matrix, k, exclude)
+            for (i, key, own_pool), player_distances, player_rows in zip(queries, distances, rows):
+                results[i] = {
+                    **self._describe(self._players[key], own_pool, own_pool.positions[key]),
+                    "compared_role": target,
+                    "similar_players": [
+                        {
+                            **self._describe(pool.players[row], pool, row),
+                            "distance": round(float(distance), 3),
+                            "similarity": round(1 / (1 + float(distance)), 3)
+                        }
+                        for distance, row in zip(player_distances, player_rows)
+                    ]
+                }
+        return results
+
+    def similar(self, player_name: str, k: int = 10, role: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The k players most similar to one player"""
+        return self.similar_batch([player_name], k, role)[0]
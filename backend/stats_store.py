@@ -0,0 +1,332 @@
+import base64
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+STATS_DB_PATH = os.getenv("STATS_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cloud9_stats.db"))
+
+_DATE_ONLY = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# Columns that can be requested through field projection, in storage order
+PLAYER_GAME_FIELDS = [
+    "match_id", "series_id", "game_number", "game", "player_name", "team", "opponent",
+    "tournament", "role", "champion", "played_at", "win", "kills", "deaths", "assists",
+    "kda", "cs_per_min", "vision_score", "damage_dealt", "gold_earned", "performance_score",
+    "map",
+]
+
+# Per-team, per-game objective rows used by the scouting pipeline
+TEAM_GAME_FIELDS = [
+    "match_id", "series_id", "game_number", "game", "team", "opponent", "tournament",
+    "played_at", "win", "kills", "deaths", "dragons", "barons", "towers", "first_blood",
+    "duration_min",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS player_games (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_id TEXT NOT NULL,
+    series_id TEXT,
+    game_number INTEGER,
+    game TEXT,
+    player_name TEXT NOT NULL,
+    team TEXT,
+    opponent TEXT,
+    tournament TEXT,
+    role TEXT,
+    champion TEXT,
+    played_at TEXT,
+    win INTEGER,
+    kills INTEGER,
+    deaths INTEGER,
+    assists INTEGER,
+    kda REAL,
+    cs_per_min REAL,
+    vision_score REAL,
+    damage_dealt INTEGER,
+    gold_earned INTEGER,
+    performance_score REAL,
+    map TEXT,
+    UNIQUE (match_id, player_name)
+);
+CREATE INDEX IF NOT EXISTS idx_pg_player_time ON player_games (player_name, played_at, id);
+CREATE INDEX IF NOT EXISTS idx_pg_player_champion ON player_games (player_name, champion, played_at, id);
+CREATE INDEX IF NOT EXISTS idx_pg_player_role ON player_games (player_name, role, played_at, id);
+CREATE INDEX IF NOT EXISTS idx_pg_player_opponent ON player_games (player_name, opponent, played_at, id);
+CREATE INDEX IF NOT EXISTS idx_pg_player_tournament ON player_games (player_name, tournament, played_at, id);
+CREATE INDEX IF NOT EXISTS idx_pg_game_tournament_time ON player_games (game, tournament, played_at, id);
+CREATE INDEX IF NOT EXISTS idx_pg_game_time ON player_games (game, played_at, id);
+
+CREATE TABLE IF NOT EXISTS team_games (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_id TEXT NOT NULL,
+    series_id TEXT,
+    game_number INTEGER,
+    game TEXT,
+    team TEXT NOT NULL,
+    opponent TEXT,
+    tournament TEXT,
+    played_at TEXT,
+    win INTEGER,
+    kills INTEGER,
+    deaths INTEGER,
+    dragons INTEGER,
+    barons INTEGER,
+    towers INTEGER,
+    first_blood INTEGER,
+    duration_min REAL,
+    UNIQUE (match_id, team)
+);
+CREATE INDEX IF NOT EXISTS idx_tg_team_time ON team_games (team, played_at, id);
+CREATE INDEX IF NOT EXISTS idx_tg_game_tournament_time ON team_games (game, tournament, played_at, id);
+CREATE INDEX IF NOT EXISTS idx_tg_game_time ON team_games (game, played_at, id);
+"""
+
+
+def normalize_timestamp(value: Any) -> Optional[str]:
+    """
+    Normalize an ISO-8601 string, date or unix timestamp to the stored UTC
+    format; None when there is no timestamp (stored as NULL, not as "now")
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        dt = datetime.fromtimestamp(value, tz=timezone.utc)
+    else:
+        text = str(value).strip()
+        if text.replace(".", "", 1).isdigit():
+            dt = datetime.fromtimestamp(float(text), tz=timezone.utc)
+        else:
+            dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def range_end(value: Any) -> Tuple[str, str]:
+    """
+    SQL comparison and bound for an inclusive range end: a date-only end
+    ("2024-06-30") covers that whole day, i.e. played_at < the next day
+    """
+    text = str(value).strip()
+    if _DATE_ONLY.match(text):
+        next_day = date.fromisoformat(text) + timedelta(days=1)
+        return "<", f"{next_day.isoformat()}T00:00:00Z"
+    return "<=", normalize_timestamp(value)
+
+
+def _encode_cursor(played_at: Optional[str], row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{played_at or ''}|{row_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        played_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return played_at or None, int(row_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+
+
+class StatsStore:
+    """Persistent per-game player and team history backed by SQLite"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or STATS_DB_PATH
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate_map_column()
+        self._migrate_nullable_played_at()
+        self._conn.commit()
+
+    def _migrate_map_column(self) -> None:
+        """Add the VALORANT map column to player_games tables created before it"""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(player_games)")}
+        if "map" not in columns:
+            self._conn.execute("ALTER TABLE player_games ADD COLUMN map TEXT")
+
+    def _migrate_nullable_played_at(self) -> None:
+        """Rebuild tables created with played_at NOT NULL (undated games used to be stamped "now")"""
+        for table, columns in (("player_games", PLAYER_GAME_FIELDS), ("team_games", TEAM_GAME_FIELDS)):
+            info = {row["name"]: row["notnull"] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if not info.get("played_at"):
+                continue
+            create = self._conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+                self._conn.execute(create.replace("played_at TEXT NOT NULL", "played_at TEXT"))
+                self._conn.execute(
+                    f"INSERT INTO {table} (id, {', '.join(columns)}) SELECT id, {', '.join(columns)} FROM {table}_old"
+                )
+                self._conn.execute(f"DROP TABLE {table}_old")
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        # Indexes went with the old tables
+        self._conn.executescript(_SCHEMA)
+
+    def _upsert(self, table: str, columns: List[str], key: tuple, rows: Iterable[Dict[str, Any]]) -> int:
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c not in key)
+        sql = (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT ({', '.join(key)}) DO UPDATE SET {updates}"
+        )
+
+        values = []
+        for row in rows:
+            record = dict(row)
+            record["played_at"] = normalize_timestamp(record.get("played_at"))
+            for flag in ("win", "first_blood"):
+                if record.get(flag) is not None:
+                    record[flag] = int(bool(record[flag]))
+            values.append(tuple(record.get(c) for c in columns))
+
+        with self._lock:
+            self._conn.executemany(sql, values)
+            self._conn.commit()
+        return len(values)
+
+    def insert_player_games(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Insert or update player-game rows, keyed by (match_id, player_name)"""
+        return self._upsert("player_games", PLAYER_GAME_FIELDS, ("match_id", "player_name"), rows)
+
+    def insert_team_games(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Insert or update team-game rows, keyed by (match_id, team)"""
+        return self._upsert("team_games", TEAM_GAME_FIELDS, ("match_id", "team"), rows)
+
+    def _iter_rows(self, table: str, columns: List[str], game: Optional[str] = None,
+                   tournament: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+                   chronological: bool = False, batch_size: int = 5000) -> Iterator[Dict[str, Any]]:
+        where: List[str] = []
+        params: Dict[str, Any] = {"limit": batch_size}
+        if game:
+            where.append("game = :game")
+            params["game"] = game
+        if tournament:
+            where.append("tournament = :tournament")
+            params["tournament"] = tournament
+        if start:
+            where.append("played_at >= :start")
+            params["start"] = normalize_timestamp(start)
+        if end:
+            op, params["end"] = range_end(end)
+            where.append(f"played_at {op} :end")
+
+        # Keyset pages: by id, or by (played_at, id) with undated rows first
+        if chronological:
+            phases = [
+                ("played_at IS NULL AND id > :id", "id"),
+                ("played_at IS NOT NULL AND (played_at > :played_at OR (played_at = :played_at AND id > :id))", "played_at, id"),
+            ]
+        else:
+            phases = [("id > :id", "id")]
+
+        for keyset, order in phases:
+            sql = (
+                f"SELECT id, {', '.join(columns)} FROM {table} "
+                f"WHERE {' AND '.join(where + [keyset])} ORDER BY {order} LIMIT :limit"
+            )
+            last = {"id": 0, "played_at": ""}
+            while True:
+                with self._lock:
+                    rows = self._conn.execute(sql, {**params, **last}).fetchall()
+                if not rows:
+                    break
+                for row in rows:
+                    record = {c: row[c] for c in columns}
+                    for flag in ("win", "first_blood"):
+                        if record.get(flag) is not None:
+                            record[flag] = bool(record[flag])
+                    yield record
+                last = {"id": rows[-1]["id"], "played_at": rows[-1]["played_at"] or ""}
+
+    def iter_player_games(self, game: Optional[str] = None, tournament: Optional[str] = None,
+                          start: Optional[str] = None, end: Optional[str] = None,
+                          chronological: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Stream stored player-game rows in insertion order (or by played_at with
+        chronological=True), optionally filtered by game, tournament and an
+        inclusive start/end range
+        """
+        return self._iter_rows("player_games", PLAYER_GAME_FIELDS, game, tournament, start, end, chronological)
+
+    def iter_team_games(self, game: Optional[str] = None, tournament: Optional[str] = None,
+                        start: Optional[str] = None, end: Optional[str] = None,
+                        chronological: bool = False) -> Iterator[Dict[str, Any]]:
+        """Stream stored team-game rows, filtered and ordered as iter_player_games"""
+        return self._iter_rows("team_games", TEAM_GAME_FIELDS, game, tournament, start, end, chronological)
+
+    def query_player_history(self, player_name: str, start: Optional[str] = None, end: Optional[str] = None,
+                             champion: Optional[str] = None, role: Optional[str] = None,
+                             opponent: Optional[str] = None, tournament: Optional[str] = None,
+                             cursor: Optional[str] = None, limit: int = 50,
+                             fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Query a player's game history, newest first, with keyset pagination
+
+        Returns the matching rows plus a `next_cursor` that continues after the
+        last row, or None when there are no more rows.
+        """
+        if fields:
+            unknown = [f for f in fields if f not in PLAYER_GAME_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+            selected = list(dict.fromkeys(fields))
+        else:
+            selected = PLAYER_GAME_FIELDS
+
+        where = ["player_name = ?"]
+        params: List[Any] = [player_name]
+        for column, value in (("champion", champion), ("role", role), ("opponent", opponent), ("tournament", tournament)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if start:
+            where.append("played_at >= ?")
+            params.append(normalize_timestamp(start))
+        if end:
+            op, bound = range_end(end)
+            where.append(f"played_at {op} ?")
+            params.append(bound)
+        if cursor:
+            # Rows without a timestamp sort after every dated row (NULLs are last in DESC order)
+            cursor_time, cursor_id = _decode_cursor(cursor)
+            if cursor_time is None:
+                where.append("(played_at IS NULL AND id < ?)")
+                params.append(cursor_id)
+            else:
+                where.append("(played_at < ? OR (played_at = ? AND id < ?) OR played_at IS NULL)")
+                params.extend([cursor_time, cursor_time, cursor_id])
+
+        sql = (
+            f"SELECT id, played_at AS _played_at, {', '.join(selected)} FROM player_games "
+            f"WHERE {' AND '.join(where)} ORDER BY played_at DESC, id DESC LIMIT ?"
+        )
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        items = []
+        for row in rows:
+            item = {c: row[c] for c in selected}
+            if "win" in item and item["win"] is not None:
+                item["win"] = bool(item["win"])
+            items.append(item)
+
+        next_cursor = _encode_cursor(rows[-1]["_played_at"], rows[-1]["id"]) if has_more and rows else None
+        return {"items": items, "count": len(items), "next_cursor": next_cursor}
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,160 @@
+"""
+Topic subscriptions with server-pushed deltas.
+
+Clients subscribe to topics ("game:lol", "player:Blaber", "team:Cloud9",
+"match:<live match id>")
+over a WebSocket or SSE stream and receive a snapshot of each topic, then
+only JSON merge patches (RFC 7396) when ingestion changes it. After an
+ingest, `TopicHub.publish` rebuilds each touched topic that has subscribers,
+diffs it against the last published snapshot and encodes the delta once; the
+same bytes are queued for every subscriber. Topics nobody subscribes to cost
+nothing.
+
+A subscriber that falls SUBSCRIBER_MAX_PENDING messages behind is dropped
+(its stream closes) rather than buffered without bound; reconnecting yields a
+fresh snapshot.
+
+Publish from the event loop thread: subscriber queues are asyncio queues.
+"""
+import asyncio
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from metrics import SUBSCRIPTION_MESSAGES, SUBSCRIBERS
+from workers import encode_json
+
+SUBSCRIBER_MAX_PENDING = int(os.getenv("SUBSCRIBER_MAX_PENDING", "256"))
+
+TOPIC_KINDS = ("game", "player", "team", "match")
+
+_UNCHANGED = object()
+
+
+def merge_patch(old: Any, new: Any) -> Any:
+    """
+    RFC 7396 merge patch turning `old` into `new`, or _UNCHANGED. Objects are
+    diffed key by key (null removes a key); any other change replaces the value.
+    """
+    if old == new:
+        return _UNCHANGED
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    patch = {key: None for key in old if key not in new}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+            continue
+        child = merge_patch(old[key], value)
+        if child is not _UNCHANGED:
+            patch[key] = child
+    return patch
+
+
+def parse_topic(topic: str) -> str:
+    """Validate "<kind>:<name>" and return it in canonical form"""
+    kind, sep, name = topic.partition(":")
+    kind = kind.strip().lower()
+    name = name.strip()
+    if not sep or kind not in TOPIC_KINDS or not name:
+        raise ValueError(f"Invalid topic '{topic}'. Use game:<lol|valorant>, player:<name>, team:<name> or match:<id>")
+    if kind == "game":
+        name = name.lower()
+        if name == "league":
+            name = "lol"
+    elif kind == "team":
+        # Team lookups are case-insensitive (see ScoutingAggregator)
+        name = name.lower()
+    return f"{kind}:{name}"
+
+
+class Subscriber:
+    """One client connection: the topics it follows and its outgoing queue"""
+
+    def __init__(self, max_pending: int = SUBSCRIBER_MAX_PENDING):
+        self.topics: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.dropped = False
+
+    def offer(self, message: bytes) -> bool:
+        if self.dropped:
+            return False
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            # Too far behind: end the stream instead of buffering without bound
+            self.dropped = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+    async def next_message(self) -> Optional[bytes]:
+        """The next encoded message, or None once dropped"""
+        return await self.queue.get()
+
+
+class TopicHub:
+    def __init__(self, snapshot: Callable[[str], Any]):
+        # topic -> current data (None when there is nothing yet, e.g. an unknown player)
+        self._snapshot = snapshot
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        # topic -> (version, last published data), kept only while subscribed
+        self._state: Dict[str, Tuple[int, Any]] = {}
+
+    def subscribe(self, subscriber: Subscriber, topic: str) -> bytes:
+        """Add a topic to a subscriber and return its snapshot message"""
+        topic = parse_topic(topic)
+        if topic not in self._state:
+            self._state[topic] = (0, self._snapshot(topic))
+        if subscriber not in self._subscribers.setdefault(topic, set()):
+            self._subscribers[topic].add(subscriber)
+            subscriber.topics.add(topic)
+            SUBSCRIBERS.inc(kind=topic.split(":", 1)[0])
+        version, data = self._state[topic]
+        SUBSCRIPTION_MESSAGES.inc(type="snapshot")
+        return encode_json({"type": "snapshot", "topic": topic, "version": version, "data": data})
+
+    def unsubscribe(self, subscriber: Subscriber, topic: str) -> None:
+        topic = parse_topic(topic)
+        subscribers = self._subscribers.get(topic)
+        if not subscribers or subscriber not in subscribers:
+            return
+        subscribers.discard(subscriber)
+        subscriber.topics.discard(topic)
+        SUBSCRIBERS.dec(kind=topic.split(":", 1)[0])
+        if not subscribers:
+            # Nobody left to diff for
+            del self._subscribers[topic]
+            del self._state[topic]
+
+    def close(self, subscriber: Subscriber) -> None:
+        for topic in list(subscriber.topics):
+            self.unsubscribe(subscriber, topic)
+
+    def publish(self, topics: Iterable[str]) -> int:
+        """Recompute subscribed topics among `topics` and push their deltas; returns messages queued"""
+        queued = 0
+        for topic in dict.fromkeys(topics):
+            subscribers = self._subscribers.get(topic)
+            if not subscribers:
+                continue
+            version, old = self._state[topic]
+            new = self._snapshot(topic)
+            patch = merge_patch(old, new)
+            if patch is _UNCHANGED:
+                continue
+            version += 1
+            self._state[topic] = (version, new)
+            message = encode_json({"type": "delta", "topic": topic, "version": version, "patch": patch})
+            for subscriber in list(subscribers):
+                if subscriber.offer(message):
+                    SUBSCRIPTION_MESSAGES.inc(type="delta")
+                    queued += 1
+                else:
+                    SUBSCRIPTION_MESSAGES.inc(type="dropped")
+                    self.close(subscriber)
+        return queued
+
+    def topics(self) -> List[str]:
+        return sorted(self._subscribers)
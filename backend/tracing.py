@@ -0,0 +1,273 @@
+"""
+Lightweight in-process tracing.
+
+Spans are opened with `span("name", key=value)` and nest through a contextvar,
+so a request's GRID calls, JSON decoding, processing and LLM calls all land
+under the request's root span without passing anything around. Finished
+traces are exported off the request path by a background thread to either a
+JSON-lines file or an OTLP/HTTP (JSON) collector such as a local
+OpenTelemetry Collector or Jaeger.
+
+Configuration (environment):
+    TRACE_EXPORT         "jsonl", "otlp" or unset/"off" (default: off)
+    TRACE_FILE           JSON-lines path (default: backend/traces.jsonl)
+    TRACE_OTLP_ENDPOINT  OTLP/HTTP traces URL (default: http://localhost:4318/v1/traces)
+    TRACE_SERVER_TIMING  "1" to add a Server-Timing header to API responses
+
+When neither export nor Server-Timing is enabled `span()` is a no-op.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "off").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces.jsonl"))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_SERVER_TIMING = os.getenv("TRACE_SERVER_TIMING", "0").lower() in ("1", "true", "yes")
+SERVICE_NAME = "cloud9-assistant-coach"
+
+ENABLED = TRACE_EXPORT in ("jsonl", "otlp") or TRACE_SERVER_TIMING
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class _NullSpan:
+    """Returned by span() when tracing is disabled or outside a trace"""
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+# Innermost open span, and the finished-span list shared by the whole trace.
+# The list is mutable on purpose: spans finished in child tasks (e.g. under
+# Starlette's call_next) must still reach the root.
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_trace_spans: contextvars.ContextVar[Optional[List[Span]]] = contextvars.ContextVar("trace_spans", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Any]:
+    """Time a stage as a child of the current span; no-op outside a trace"""
+    spans = _trace_spans.get()
+    if not ENABLED or spans is None:
+        yield _NULL_SPAN
+        return
+
+    parent = _current_span.get()
+    current = Span(parent.trace_id, parent.span_id, name, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        spans.append(current)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of span() for whole functions (sync or async)"""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _parse_traceparent(header: Optional[str]) -> Optional[tuple]:
+    # W3C traceparent: version-traceid-parentid-flags
+    parts = (header or "").split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return parts[1], parts[2]
+    return None
+
+
+@contextmanager
+def trace(name: str, traceparent: Optional[str] = None, **attributes) -> Iterator[Any]:
+    """
+    Open a root span (one per request or job), continuing an upstream W3C
+    `traceparent` when given. On exit the trace's spans are queued for export.
+    """
+    if not ENABLED:
+        yield _NULL_SPAN
+        return
+
+    upstream = _parse_traceparent(traceparent)
+    trace_id, parent_id = upstream if upstream else (os.urandom(16).hex(), None)
+    root = Span(trace_id, parent_id, name, attributes)
+    spans: List[Span] = []
+    span_token = _current_span.set(root)
+    spans_token = _trace_spans.set(spans)
+    try:
+        yield root
+    except BaseException as e:
+        root.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        root.end_ns = time.time_ns()
+        _current_span.reset(span_token)
+        _trace_spans.reset(spans_token)
+        spans.append(root)
+        _export(spans)
+
+
+def current_trace_spans() -> List[Span]:
+    return list(_trace_spans.get() or [])
+
+
+def server_timing(spans: List[Span]) -> str:
+    """
+    Server-Timing header value with total milliseconds per stage name, e.g.
+    `grid.request;dur=182.4, process.end_state;dur=3.1`
+    """
+    totals: Dict[str, float] = {}
+    for s in spans:
+        if s.end_ns:
+            totals[s.name] = totals.get(s.name, 0.0) + s.duration_ms
+    # Metric names must be tokens; dots are allowed, other separators are not
+    return ", ".join(f"{name.replace(' ', '_')};dur={ms:.1f}" for name, ms in totals.items())
+
+
+# --- Export -----------------------------------------------------------------
+
+_EXPORT_MAX_SPANS = 512
+_export_queue: "queue.Queue[List[Span]]" = queue.Queue(maxsize=1024)
+_exporter_started = False
+_exporter_lock = threading.Lock()
+dropped_traces = 0
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_payload(spans: List[Span]) -> Dict[str, Any]:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": "tracing"},
+                "spans": [
+                    {
+                        "traceId": s.trace_id,
+                        "spanId": s.span_id,
+                        "parentSpanId": s.parent_id or "",
+                        "name": s.name,
+                        "kind": 1,
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns),
+                        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                        "status": {"code": 2, "message": s.error} if s.error else {"code": 0}
+                    }
+                    for s in spans
+                ]
+            }]
+        }]
+    }
+
+
+def _write_batch(spans: List[Span]) -> None:
+    if TRACE_EXPORT == "jsonl":
+        with open(TRACE_FILE, "a") as f:
+            f.writelines(json.dumps(s.as_dict(), default=str) + "\n" for s in spans)
+    elif TRACE_EXPORT == "otlp":
+        import urllib.request
+
+        request = urllib.request.Request(
+            TRACE_OTLP_ENDPOINT,
+            data=json.dumps(_otlp_payload(spans), default=str).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        urllib.request.urlopen(request, timeout=5).close()
+
+
+def _export_worker() -> None:
+    while True:
+        batch = _export_queue.get()
+        # Coalesce whatever else is waiting into one write / POST
+        while len(batch) < _EXPORT_MAX_SPANS:
+            try:
+                batch.extend(_export_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            _write_batch(batch)
+        except Exception as e:
+            logger.warning("Trace export of %d spans failed: %s", len(batch), e)
+
+
+def _export(spans: List[Span]) -> None:
+    global _exporter_started, dropped_traces
+    if TRACE_EXPORT not in ("jsonl", "otlp"):
+        return
+    if not _exporter_started:
+        with _exporter_lock:
+            if not _exporter_started:
+                threading.Thread(target=_export_worker, name="trace-exporter", daemon=True).start()
+                _exporter_started = True
+    try:
+        _export_queue.put_nowait(spans)
+    except queue.Full:
+        # Never block a request on a slow collector
+        dropped_traces += 1
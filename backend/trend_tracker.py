@@ -0,0 +1,162 @@
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+# Metrics tracked per player, with the default used when a game row lacks the field
+TRACKED_METRICS = {
+    "kda": 0.0,
+    "performance_score": 50.0,
+}
+
+
+class MetricTrend:
+    """
+    Incrementally maintained trend statistics for a single metric.
+
+    Every update is O(1): an exponentially weighted mean/variance, a rolling
+    least-squares slope over the last `window` games (kept as running sums) and
+    a two-sided CUSUM detector that flags sustained shifts away from the EWMA baseline.
+    """
+
+    def __init__(self, window: int = 10, alpha: float = 0.3, cusum_k: float = 0.5, cusum_h: float = 4.0):
+        self.window = window
+        self.alpha = alpha
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+
+        self.count = 0
+        self.ewma: Optional[float] = None
+        self.ewm_var = 0.0
+
+        # Rolling regression state: y values with x = global game index
+        self._values: Deque[float] = deque()
+        self._sum_y = 0.0
+        self._sum_xy = 0.0
+
+        # CUSUM state
+        self._cusum_pos = 0.0
+        self._cusum_neg = 0.0
+        self.change_points: List[Dict[str, Any]] = []
+
+    def update(self, value: float) -> None:
+        """Add one game's value to the trend state"""
+        value = float(value)
+        x = self.count
+
+        # Rolling sums for the regression slope
+        self._values.append(value)
+        self._sum_y += value
+        self._sum_xy += x * value
+        if len(self._values) > self.window:
+            oldest = self._values.popleft()
+            self._sum_y -= oldest
+            self._sum_xy -= (x - self.window) * oldest
+
+        # Change-point detection against the baseline *before* this value
+        if self.ewma is not None and self.count >= 5:
+            std = math.sqrt(self.ewm_var)
+            if std > 1e-9:
+                z = (value - self.ewma) / std
+                self._cusum_pos = max(0.0, self._cusum_pos + z - self.cusum_k)
+                self._cusum_neg = max(0.0, self._cusum_neg - z - self.cusum_k)
+                if self._cusum_pos > self.cusum_h or self._cusum_neg > self.cusum_h:
+                    self.change_points.append({
+                        "game_index": x,
+                        "direction": "up" if self._cusum_pos > self.cusum_h else "down",
+                        "baseline": round(self.ewma, 2)
+                    })
+                    # Keep the most recent detections only
+                    self.change_points = self.change_points[-5:]
+                    self._cusum_pos = 0.0
+                    self._cusum_neg = 0.0
+
+        # Exponentially weighted mean and variance
+        if self.ewma is None:
+            self.ewma = value
+        else:
+            diff = value - self.ewma
+            incr = self.alpha * diff
+            self.ewma += incr
+            self.ewm_var = (1 - self.alpha) * (self.ewm_var + diff * incr)
+
+        self.count += 1
+
+    @property
+    def slope(self) -> float:
+        """Least-squares slope (change per game) over the rolling window"""
+        n = len(self._values)
+        if n < 2:
+            return 0.0
+        # x runs over the consecutive indices [count - n, count - 1]
+        first = self.count - n
+        sum_x = n * first + n * (n - 1) / 2
+        sum_xx = n * first * first + first * n * (n - 1) + (n - 1) * n * (2 * n - 1) / 6
+        denom = n * sum_xx - sum_x * sum_x
+        if denom == 0:
+            return 0.0
+        return (n * self._sum_xy - sum_x * self._sum_y) / denom
+
+    @property
+    def window_mean(self) -> float:
+        return self._sum_y / len(self._values) if self._values else 0.0
+
+    def classify(self) -> str:
+        """Label the trend as improving, declining, stable or insufficient_data"""
+        n = len(self._values)
+        if n < 3:
+            return "insufficient_data"
+
+        mean = self.window_mean
+        # Projected change across the window relative to its mean
+        change_percent = (self.slope * (n - 1) / mean) * 100 if mean > 0 else 0
+
+        if change_percent > 10:
+            return "improving"
+        elif change_percent < -10:
+            return "declining"
+        else:
+            return "stable"
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "trend": self.classify(),
+            "games": self.count,
+            "ewma": round(self.ewma, 2) if self.ewma is not None else None,
+            "ewm_std": round(math.sqrt(self.ewm_var), 2),
+            "slope_per_game": round(self.slope, 3),
+            "window_mean": round(self.window_mean, 2),
+            "change_points": list(self.change_points)
+        }
+
+
+class PlayerTrendTracker:
+    """Per-player collection of metric trends, updated once per ingested game"""
+
+    def __init__(self, window: int = 10):
+        self.metrics = {name: MetricTrend(window=window) for name in TRACKED_METRICS}
+        self._seen_matches = set()
+
+    def update(self, game_stats: Dict[str, Any]) -> bool:
+        """Fold in one game; False if its match_id was already counted (re-ingested series)"""
+        match_id = game_stats.get("match_id")
+        if match_id is not None:
+            if match_id in self._seen_matches:
+                return False
+            self._seen_matches.add(match_id)
+        for name, default in TRACKED_METRICS.items():
+            self.metrics[name].update(game_stats.get(name, default))
+        return True
+
+    def trend(self, metric: str) -> str:
+        return self.metrics[metric].classify()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: trend.snapshot() for name, trend in self.metrics.items()}
+
+    @classmethod
+    def from_history(cls, stats: Iterable[Dict[str, Any]], window: int = 10) -> "PlayerTrendTracker":
+        """Build a tracker by replaying existing game rows in order"""
+        tracker = cls(window=window)
+        for game_stats in stats:
+            tracker.update(game_stats)
+        return tracker
@@ -0,0 +1,372 @@
+"""
+VALORANT economy reconstruction and buy evaluation.
+
+`EconomyTracker` replays a map round by round from each round's buy_type,
+outcome, kills and survivals (derived from kill events when a round has them,
+see valorant_kills.py) and reconstructs both teams' average credits, the
+loadout value carried over by survivors and the loss-bonus streak. Only our
+buys are recorded, so the opponent is assumed to follow the standard policy
+(full buy when affordable, otherwise save).
+
+Each non-pistol regulation round is then re-played under the alternative
+buys (eco, force, full) against the same opponent state: a Monte Carlo over
+rounds x buys x SIMULATIONS, vectorized with numpy, simulates the next
+HORIZON rounds of the half and compares expected rounds won. Rounds where an
+affordable alternative beats the actual buy by at least MIN_GAIN rounds are
+flagged. Every evaluation draws the same random numbers (common random
+numbers), so a map evaluated in one batch and the same map evaluated one
+round at a time (live ingestion) give identical results.
+
+The win model is logistic in the loadout difference: even loadouts win half
+the time, a full buy beats a full eco about nine times in ten.
+"""
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from valorant_kills import with_kill_stats
+
+START_CREDITS = 800
+OVERTIME_CREDITS = 5000
+MAX_CREDITS = 9000
+WIN_REWARD = 3000
+LOSS_REWARDS = (1900, 2400, 2900)  # by consecutive losses
+KILL_REWARD = 200
+RIFLE_COST = 2900  # Vandal / Phantom
+HEAVY_SHIELDS_COST = 1000
+
+PISTOL_ROUNDS = (1, 13)
+HALF_ENDS = (12, 24)  # credits and loss streaks reset after these rounds
+
+# Per-player loadout value each buy aims for
+BUY_LOADOUTS = {
+    "pistol": START_CREDITS,
+    "eco": 400,
+    "half": 1600,
+    "force": 2400,
+    "full": RIFLE_COST + HEAVY_SHIELDS_COST
+}
+ALTERNATIVES = ("eco", "force", "full")
+
+LOADOUT_SCALE = 1300.0  # credits of loadout difference per logit
+SIMULATIONS = 2000
+HORIZON = 3  # rounds simulated from each decision, within the half
+MIN_GAIN = 0.15  # expected rounds won before a different buy is flagged
+SEED = 45
+
+# Without per-player data: (kills, deaths) out of five for the round winner / loser
+_DEFAULT_WINNER = (4, 2)
+_DEFAULT_LOSER = (2, 4)
+
+_draws = None  # (HORIZON, SIMULATIONS) uniforms shared by every evaluation
+
+
+def win_probability(loadout: float, enemy_loadout: float) -> float:
+    """Modelled round win probability from average per-player loadout values"""
+    return 1.0 / (1.0 + math.exp(-(loadout - enemy_loadout) / LOADOUT_SCALE))
+
+
+def loss_reward(streak: int) -> int:
+    """Loss bonus after `streak` consecutive losses before this one"""
+    return LOSS_REWARDS[min(streak, len(LOSS_REWARDS) - 1)]
+
+
+def standard_buy(credits: float, saved: float) -> str:
+    """Full buy when it's affordable, otherwise save"""
+    return "full" if credits + saved >= BUY_LOADOUTS["full"] else "eco"
+
+
+def buy_loadout(buy_type: str, credits: float, saved: float) -> float:
+    """Loadout value reached by `buy_type`: saved weapons plus what the credits cover"""
+    target = BUY_LOADOUTS.get(buy_type, BUY_LOADOUTS["full"])
+    return max(saved, min(target, credits + saved))
+
+
+def save_outlook(players_saving: int, credits: float = LOSS_REWARDS[1],
+                 enemy_loadout: float = BUY_LOADOUTS["full"]) -> Dict[str, float]:
+    """
+    Next-round win probability with `players_saving` rifles kept versus a
+    broken buy, when everyone has `credits` to spend (default: the second
+    loss bonus) against an enemy full buy
+    """
+    players_saving = max(0, min(5, players_saving))
+    full = BUY_LOADOUTS["full"]
+    kept = buy_loadout("full", credits, RIFLE_COST)
+    rebuy = buy_loadout("full", credits, 0)
+    with_save = (players_saving * kept + (5 - players_saving) * rebuy) / 5
+    return {
+        "saved_value": players_saving * RIFLE_COST,
+        "with_save": win_probability(min(with_save, full), enemy_loadout),
+        "broken_buy": win_probability(rebuy, enemy_loadout)
+    }
+
+
+class TeamEconomy:
+    """Average per-player credits, carried-over loadout value and loss streak"""
+    __slots__ = ("credits", "saved", "streak")
+
+    def __init__(self, credits: float = START_CREDITS, saved: float = 0.0, streak: int = 0):
+        self.credits = credits
+        self.saved = saved
+        self.streak = streak
+
+    def copy(self) -> "TeamEconomy":
+        return TeamEconomy(self.credits, self.saved, self.streak)
+
+    def settle(self, loadout: float, won: bool, kills: float, survivors: float) -> None:
+        """Pay for `loadout`, collect the round rewards and keep the survivors' weapons"""
+        spent = loadout - self.saved
+        reward = WIN_REWARD if won else loss_reward(self.streak)
+        self.credits = min(MAX_CREDITS, self.credits - spent + reward + KILL_REWARD * kills / 5)
+        self.saved = loadout * survivors / 5
+        self.streak = 0 if won else self.streak + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"credits": round(self.credits), "saved": round(self.saved), "loss_streak": self.streak}
+
+
+def _round_facts(round_data: Dict[str, Any], position: int) -> Dict[str, Any]:
+    """round_num, outcome, buy and both teams' kills / survivors (out of five)"""
+    round_data = with_kill_stats(round_data)
+    won = bool(round_data.get("team_won", False))
+    players = None
+    for side in ("attackers", "defenders"):
+        if f"{side}_team_name" in round_data and isinstance(round_data.get(side), list):
+            players = round_data[side]
+            break
+    if players:
+        scale = 5 / len(players)
+        kills = min(5.0, sum(p.get("kills", 0) for p in players) * scale)
+        deaths = min(5.0, sum(1 for p in players if p.get("deaths", 0)) * scale)
+    else:
+        kills, deaths = _DEFAULT_WINNER if won else _DEFAULT_LOSER
+    return {
+        "round_num": round_data.get("round_num") or position,
+        "won": won,
+        "buy_type": round_data.get("buy_type", "full"),
+        "kills": kills,
+        "survivors": 5 - deaths,
+        "enemy_kills": deaths,
+        "enemy_survivors": 5 - kills
+    }
+
+
+def _rounds_left_in_half(round_num: int) -> int:
+    for half_end in HALF_ENDS:
+        if round_num <= half_end:
+            return half_end - round_num + 1
+    return 0
+
+
+def _shared_draws():
+    global _draws
+    if _draws is None:
+        import numpy as np
+        _draws = np.random.default_rng(SEED).random((HORIZON, SIMULATIONS))
+    return _draws
+
+
+def evaluate_buys(decisions: List[Tuple[int, str, TeamEconomy, TeamEconomy]]) -> List[Dict[str, Any]]:
+    """
+    Expected rounds won over the rest of the horizon for the actual buy and each
+    alternative, for every (round_num, actual buy, our state, enemy state) at
+    once; alternatives the team couldn't afford are None
+    """
+    if not decisions:
+        return []
+    # Deferred: numpy is only needed once a map is evaluated, not at import
+    import numpy as np
+
+    draws = _shared_draws()
+    options = len(ALTERNATIVES) + 1  # actual buy first
+    count = len(decisions)
+
+    shape = (count, options, SIMULATIONS)
+
+    def column(values) -> "np.ndarray":
+        return np.broadcast_to(np.asarray(values, dtype=float)[:, None, None], shape).copy()
+
+    credits = column([us.credits for _, _, us, _ in decisions])
+    saved = column([us.saved for _, _, us, _ in decisions])
+    streak = column([us.streak for _, _, us, _ in decisions])
+    enemy_credits = column([them.credits for _, _, _, them in decisions])
+    enemy_saved = column([them.saved for _, _, _, them in decisions])
+    enemy_streak = column([them.streak for _, _, _, them in decisions])
+
+    targets = np.array([[BUY_LOADOUTS.get(buy, BUY_LOADOUTS["full"])] + [BUY_LOADOUTS[alt] for alt in ALTERNATIVES]
+                        for _, buy, _, _ in decisions], dtype=float)
+    affordable = targets <= (credits[:, :, 0] + saved[:, :, 0])
+    affordable[:, 0] = True
+    horizon = np.minimum([_rounds_left_in_half(round_num) for round_num, _, _, _ in decisions], HORIZON)
+
+    full = BUY_LOADOUTS["full"]
+    eco = BUY_LOADOUTS["eco"]
+    loss_rewards = np.asarray(LOSS_REWARDS, dtype=float)
+    wins = np.zeros(shape)
+    for step in range(HORIZON):
+        target = targets[:, :, None] if step == 0 else np.where(credits + saved >= full, full, eco)
+        enemy_target = np.where(enemy_credits + enemy_saved >= full, full, eco)
+        loadout = np.maximum(saved, np.minimum(target, credits + saved))
+        enemy_loadout = np.maximum(enemy_saved, np.minimum(enemy_target, enemy_credits + enemy_saved))
+
+        p = 1.0 / (1.0 + np.exp(-(loadout - enemy_loadout) / LOADOUT_SCALE))
+        won = draws[step] < p
+        wins += won * (step < horizon)[:, None, None]
+
+        kills = np.where(won, _DEFAULT_WINNER[0], _DEFAULT_LOSER[0])
+        enemy_kills = np.where(won, _DEFAULT_LOSER[0], _DEFAULT_WINNER[0])
+        reward = np.where(won, WIN_REWARD, loss_rewards[np.minimum(streak, len(LOSS_REWARDS) - 1).astype(int)])
+        enemy_reward = np.where(won, loss_rewards[np.minimum(enemy_streak, len(LOSS_REWARDS) - 1).astype(int)],
+                                WIN_REWARD)
+        credits = np.minimum(MAX_CREDITS, credits - (loadout - saved) + reward + KILL_REWARD * kills / 5)
+        enemy_credits = np.minimum(MAX_CREDITS, enemy_credits - (enemy_loadout - enemy_saved) + enemy_reward
+                                   + KILL_REWARD * enemy_kills / 5)
+        saved = loadout * (5 - enemy_kills) / 5
+        enemy_saved = enemy_loadout * (5 - kills) / 5
+        streak = np.where(won, 0, streak + 1)
+        enemy_streak = np.where(won, enemy_streak + 1, 0)
+
+    expected = wins.mean(axis=-1)
+    results = []
+    for i in range(count):
+        results.append({
+            "actual": float(expected[i, 0]),
+            "alternatives": {alt: (float(expected[i, j + 1]) if affordable[i, j + 1] else None)
+                             for j, alt in enumerate(ALTERNATIVES)},
+            "horizon": int(horizon[i])
+        })
+    return results
+
+
+class EconomyTracker:
+    """Both teams' economies over a map, with the buy evaluation for each round"""
+
+    def __init__(self):
+        self._facts: List[Dict[str, Any]] = []
+        # Economies going into each round: (ours, theirs)
+        self._states: List[Tuple[TeamEconomy, TeamEconomy]] = []
+        self._evaluations: List[Optional[Dict[str, Any]]] = []
+        self._index: Dict[int, int] = {}  # round_num -> position
+        self._flags: Dict[int, Dict[str, Any]] = {}  # position -> flag, kept as rounds are evaluated
+        self.team = TeamEconomy()
+        self.enemy = TeamEconomy()
+
+    @classmethod
+    def replay(cls, rounds: List[Dict[str, Any]]) -> "EconomyTracker":
+        """A concluded map: reconstruct every round, then evaluate them in one batch"""
+        tracker = cls()
+        for round_data in rounds:
+            tracker._advance(_round_facts(round_data, len(tracker._facts) + 1))
+        tracker._evaluate(0)
+        return tracker
+
+    def add_round(self, round_data: Dict[str, Any]) -> None:
+        """One finished round; a round_num seen before replaces that round and replays the ones after it"""
+        facts = _round_facts(round_data, len(self._facts) + 1)
+        index = self._index.get(facts["round_num"])
+        if index is None:
+            self._advance(facts)
+            self._evaluate(len(self._facts) - 1)
+            return
+        # A correction: economies from that round on depend on it
+        later = self._facts[index + 1:]
+        self.team, self.enemy = (state.copy() for state in self._states[index])
+        for i, f in enumerate(self._facts[index:], start=index):
+            self._index.pop(f["round_num"], None)
+            self._flags.pop(i, None)
+        del self._facts[index:], self._states[index:], self._evaluations[index:]
+        for f in [facts] + later:
+            self._advance(f)
+        self._evaluate(index)
+
+    def _advance(self, facts: Dict[str, Any]) -> None:
+        round_num = facts["round_num"]
+        if round_num > HALF_ENDS[-1]:
+            self.team = TeamEconomy(OVERTIME_CREDITS)
+            self.enemy = TeamEconomy(OVERTIME_CREDITS)
+        elif round_num in PISTOL_ROUNDS:
+            self.team = TeamEconomy()
+            self.enemy = TeamEconomy()
+        team, enemy = self.team, self.enemy
+        self._index[round_num] = len(self._facts)
+        self._facts.append(facts)
+        self._states.append((team.copy(), enemy.copy()))
+        self._evaluations.append(None)
+
+        enemy_buy = "pistol" if round_num in PISTOL_ROUNDS else standard_buy(enemy.credits, enemy.saved)
+        loadout = buy_loadout(facts["buy_type"], team.credits, team.saved)
+        enemy_loadout = buy_loadout(enemy_buy, enemy.credits, enemy.saved)
+        facts["enemy_buy"] = enemy_buy
+        facts["loadout"] = loadout
+        facts["enemy_loadout"] = enemy_loadout
+        team.settle(loadout, facts["won"], facts["kills"], facts["survivors"])
+        enemy.settle(enemy_loadout, not facts["won"], facts["enemy_kills"], facts["enemy_survivors"])
+
+    def _evaluate(self, start: int) -> None:
+        """Evaluate the buys of rounds[start:], skipping pistol and overtime rounds"""
+        pending = [i for i in range(start, len(self._facts))
+                   if self._facts[i]["round_num"] not in PISTOL_ROUNDS
+                   and self._facts[i]["round_num"] <= HALF_ENDS[-1]]
+        decisions = [(self._facts[i]["round_num"], self._facts[i]["buy_type"], *self._states[i]) for i in pending]
+        for i, evaluation in zip(pending, evaluate_buys(decisions)):
+            self._evaluations[i] = evaluation
+            flag = self._flag(self._facts[i], evaluation)
+            if flag is not None:
+                self._flags[i] = flag
+
+    @staticmethod
+    def _flag(facts: Dict[str, Any], evaluation: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The best affordable alternative, if it raised expected rounds won by MIN_GAIN or more"""
+        options = [(value, alt) for alt, value in evaluation["alternatives"].items()
+                   if value is not None and alt != facts["buy_type"]]
+        if not options:
+            return None
+        best, alternative = max(options)
+        gain = best - evaluation["actual"]
+        if gain < MIN_GAIN:
+            return None
+        horizon = evaluation["horizon"]
+        return {
+            "round_num": facts["round_num"],
+            "buy_type": facts["buy_type"],
+            "better_buy": alternative,
+            "gain": round(gain, 3),
+            "win_rate": round(evaluation["actual"] / horizon, 3),
+            "better_win_rate": round(best / horizon, 3)
+        }
+
+    def rows(self) -> List[Dict[str, Any]]:
+        rows = []
+        for facts, (team, enemy), evaluation in zip(self._facts, self._states, self._evaluations):
+            row = {
+                "round_num": facts["round_num"],
+                "buy_type": facts["buy_type"],
+                "won": facts["won"],
+                "team": {**team.to_dict(), "loadout": round(facts["loadout"])},
+                "enemy": {**enemy.to_dict(), "loadout": round(facts["enemy_loadout"]), "buy_type": facts["enemy_buy"]},
+                "win_probability": round(win_probability(facts["loadout"], facts["enemy_loadout"]), 3)
+            }
+            if evaluation is not None:
+                row["expected_rounds_won"] = {
+                    "actual": round(evaluation["actual"], 3),
+                    **{alt: (round(value, 3) if value is not None else None)
+                       for alt, value in evaluation["alternatives"].items()}
+                }
+                row["horizon"] = evaluation["horizon"]
+            rows.append(row)
+        return rows
+
+    def flags(self) -> List[Dict[str, Any]]:
+        """Rounds where an affordable alternative buy raised expected rounds won by MIN_GAIN or more"""
+        return [self._flags[i] for i in sorted(self._flags)]
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "rounds": self.rows(),
+            "flagged_rounds": self.flags(),
+            "model": {
+                "simulations": SIMULATIONS,
+                "horizon": HORIZON,
+                "min_gain": MIN_GAIN,
+                "loadout_scale": LOADOUT_SCALE
+            }
+        }
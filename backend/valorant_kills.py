@@ -0,0 +1,173 @@
+"""
+VALORANT kill events: trades, KAST, first deaths and opening duels.
+
+Feeds report kills as events rather than per-player flags:
+    {"time": 23.4, "killer": "OXY", "victim": "aspas", "assists": ["Xeppaa"],
+     "killer_team": "Cloud9", "victim_team": "LEVIATAN"}  # teams optional
+`time` is seconds into the round. A round carries them as `kill_events`.
+
+`RoundKillIndex` keeps a round's kills sorted by time, plus each player's
+death times. A death is traded when a teammate of the victim kills the killer
+within TRADE_WINDOW seconds, which is a bisect into the killer's death times,
+so one pass over the round's kills gives every player's kills, deaths,
+assists, KAST, first death and opening duel: O(events) per round.
+
+Teams come from the event's *_team fields or the round's attackers /
+defenders lists; players found in neither are taken to be on the same
+(unnamed) team as each other, which is right when only one side is listed.
+"""
+import os
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional
+
+TRADE_WINDOW = float(os.getenv("TRADE_WINDOW_SECONDS", "5"))
+
+SIDES = ("attackers", "defenders")
+
+
+def _new_stats() -> Dict[str, Any]:
+    return {"kills": 0, "deaths": 0, "assists": 0, "traded": False, "first_death": False, "opening_duel": None}
+
+
+class RoundKillIndex:
+    """One round's kill events in time order"""
+
+    def __init__(self, events: Iterable[Dict[str, Any]] = ()):
+        events = [event for event in events if event.get("killer") and event.get("victim")]
+        events.sort(key=lambda event: event.get("time", 0))
+        self.events: List[Dict[str, Any]] = events
+        self.times: List[float] = [event.get("time", 0) for event in events]
+
+    def add(self, event: Dict[str, Any]) -> None:
+        """Insert a kill as it arrives; feeds are nearly in order, so this is usually an append"""
+        if not (event.get("killer") and event.get("victim")):
+            return
+        time = event.get("time", 0)
+        i = bisect_right(self.times, time)
+        self.times.insert(i, time)
+        self.events.insert(i, event)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def player_stats(self, teams: Optional[Dict[str, str]] = None,
+                     window: float = TRADE_WINDOW) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-player kills, deaths, assists, traded, first_death, opening_duel
+        ("won" / "lost" / None) and kast for everyone in the round's events
+        (and every player named in `teams`)
+        """
+        teams = dict(teams or {})
+        for event in self.events:
+            if event.get("killer_team"):
+                teams.setdefault(event["killer"], event["killer_team"])
+            if event.get("victim_team"):
+                teams.setdefault(event["victim"], event["victim_team"])
+
+        # player -> times they died, ascending (more than one only with revives)
+        death_times: Dict[str, List[float]] = {}
+        death_killers: Dict[str, List[str]] = {}
+        for time, event in zip(self.times, self.events):
+            death_times.setdefault(event["victim"], []).append(time)
+            death_killers.setdefault(event["victim"], []).append(event["killer"])
+
+        stats: Dict[str, Dict[str, Any]] = {name: _new_stats() for name in teams}
+        for time, event in zip(self.times, self.events):
+            killer, victim = event["killer"], event["victim"]
+            stats.setdefault(killer, _new_stats())["kills"] += 1
+            victim_stats = stats.setdefault(victim, _new_stats())
+            victim_stats["deaths"] += 1
+            for assister in event.get("assists") or ():
+                stats.setdefault(assister, _new_stats())["assists"] += 1
+
+            # Traded: the killer died to one of the victim's teammates within the window
+            killer_deaths = death_times.get(killer)
+            if killer_deaths and not victim_stats["traded"]:
+                victim_team = teams.get(victim, "")
+                # A same-tick trade counts; the killer's own death is a different event
+                j = bisect_left(killer_deaths, time)
+                while j < len(killer_deaths) and killer_deaths[j] <= time + window:
+                    if teams.get(death_killers[killer][j], "") == victim_team:
+                        victim_stats["traded"] = True
+                        break
+                    j += 1
+
+        if self.events:
+            opening = self.events[0]
+            stats[opening["killer"]]["opening_duel"] = "won"
+            stats[opening["victim"]]["opening_duel"] = "lost"
+            stats[opening["victim"]]["first_death"] = True
+
+        for player in stats.values():
+            player["kast"] = bool(player["kills"] or player["assists"] or not player["deaths"] or player["traded"])
+        return stats
+
+
+def round_teams(round_data: Dict[str, Any]) -> Dict[str, str]:
+    """player name -> team name, from the round's attackers / defenders lists"""
+    teams = {}
+    for side in SIDES:
+        team = round_data.get(f"{side}_team_name", side)
+        for player in round_data.get(side) or ():
+            if player.get("name"):
+                teams[player["name"]] = team
+    return teams
+
+
+def round_kill_stats(round_data: Dict[str, Any], window: float = TRADE_WINDOW) -> Dict[str, Dict[str, Any]]:
+    """Per-player stats derived from the round's kill_events"""
+    return RoundKillIndex(round_data.get("kill_events") or ()).player_stats(round_teams(round_data), window)
+
+
+def with_kill_stats(round_data: Dict[str, Any], window: float = TRADE_WINDOW) -> Dict[str, Any]:
+    """
+    The round with its players' kills, deaths, assists, kast, first_death,
+    traded and opening_duel derived from kill_events, replacing any
+    pre-computed flags; rounds without kill_events are returned as they are
+    """
+    if not round_data.get("kill_events"):
+        return round_data
+    stats = round_kill_stats(round_data, window)
+    derived = dict(round_data)
+    for side in SIDES:
+        if isinstance(round_data.get(side), list):
+            derived[side] = [{**player, **stats.get(player.get("name"), {})} for player in round_data[side]]
+    return derived
+
+
+def map_kill_stats(rounds: Iterable[Dict[str, Any]], window: float = TRADE_WINDOW) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-player totals over a map: rounds, kills, deaths, assists, KAST rounds
+    and %, first deaths, opening duels won / lost and deaths traded. Rounds with
+    kill_events cover everyone in them; other rounds use the players' flags.
+    """
+    totals: Dict[str, Dict[str, Any]] = {}
+    for round_data in rounds:
+        if round_data.get("kill_events"):
+            round_stats = round_kill_stats(round_data, window)
+        else:
+            round_stats = {
+                player["name"]: {
+                    "kills": player.get("kills", 0), "deaths": player.get("deaths", 0), "assists": 0,
+                    "kast": player.get("kast", True), "first_death": player.get("first_death", False),
+                    "traded": False, "opening_duel": "lost" if player.get("first_death") else None
+                }
+                for side in SIDES for player in round_data.get(side) or () if player.get("name")
+            }
+        for name, stats in round_stats.items():
+            total = totals.setdefault(name, {
+                "rounds": 0, "kills": 0, "deaths": 0, "assists": 0, "kast_rounds": 0,
+                "first_deaths": 0, "opening_wins": 0, "opening_losses": 0, "traded_deaths": 0
+            })
+            total["rounds"] += 1
+            total["kills"] += stats["kills"]
+            total["deaths"] += stats["deaths"]
+            total["assists"] += stats["assists"]
+            total["kast_rounds"] += stats["kast"]
+            total["first_deaths"] += stats["first_death"]
+            total["opening_wins"] += stats["opening_duel"] == "won"
+            total["opening_losses"] += stats["opening_duel"] == "lost"
+            total["traded_deaths"] += stats["traded"]
+    for total in totals.values():
+        total["kast"] = round(total["kast_rounds"] / total["rounds"] * 100, 1)
+    return totals
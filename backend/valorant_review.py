@@ -0,0 +1,187 @@
+"""
+Incremental VALORANT review agenda.
+
+`ValorantReviewAccumulator` keeps the running counts behind the VALORANT
+macro review agenda: pistol results, round-2 force buys, late-execute losses,
+site success and orbs, plus the buy evaluation from valorant_economy.py.
+Adding a round is O(1) (a corrected round replays the economy from there on)
+and building the agenda is O(sites + flagged rounds), so the same state
+serves both a concluded match (AIAnalyzer._generate_valorant_review) and live
+round-by-round ingestion (live_ingest.py).
+"""
+from typing import Any, Dict, Optional, Tuple
+
+from valorant_economy import EconomyTracker
+
+PISTOL_ROUNDS = (1, 13)
+
+# (is_pistol, won, round-2 force buy, late execute loss, target site)
+_Contribution = Tuple[bool, bool, bool, bool, str]
+
+
+class ValorantReviewAccumulator:
+    def __init__(self, match_id: str = "unknown", match_type: str = "BO1", opponent: str = "Unknown",
+                 map_name: str = "Unknown", final_score: Optional[str] = None):
+        self.match_id = match_id
+        self.match_type = match_type
+        self.opponent = opponent
+        self.map = map_name
+        # None: derived from the rounds seen so far
+        self.final_score = final_score
+
+        self.rounds = 0
+        self.wins = 0
+        self.pistol_wins = 0
+        self.force_buys = 0
+        self.force_buy_wins = 0
+        self.late_execute_losses = 0
+        self.team_orbs = 0
+        self.enemy_orbs = 0
+        # site -> [attempts, wins], in first-seen order
+        self.sites: Dict[str, list] = {}
+        # round_num -> contribution, so a re-sent round replaces the one it corrects
+        self._by_round: Dict[int, _Contribution] = {}
+        self.economy = EconomyTracker()
+
+    @classmethod
+    def from_match(cls, match_data: Dict[str, Any]) -> "ValorantReviewAccumulator":
+        """State for a concluded match; every entry in `rounds` counts, as in the batch review"""
+        accumulator = cls(
+            match_data.get("match_id", "unknown"),
+            match_data.get("match_type", "BO1"),
+            match_data.get("opponent", "Unknown"),
+            match_data.get("map", "Unknown"),
+            match_data.get("final_score", "0-0")
+        )
+        rounds = match_data.get("rounds", [])
+        for round_data in rounds:
+            accumulator._apply(accumulator._contribution(round_data), 1)
+        # Evaluates every round's buy in one vectorized batch
+        accumulator.economy = EconomyTracker.replay(rounds)
+        accumulator.set_orbs(match_data.get("team_orbs_collected", 0), match_data.get("enemy_orbs_collected", 0))
+        return accumulator
+
+    @staticmethod
+    def _contribution(round_data: Dict[str, Any]) -> _Contribution:
+        round_num = round_data.get("round_num", 0)
+        won = bool(round_data.get("team_won", False))
+        return (
+            round_num in PISTOL_ROUNDS,
+            won,
+            round_data.get("buy_type") == "force" and round_num == 2,
+            round_data.get("time_remaining", 30) < 20 and not won,
+            round_data.get("target_site", "Unknown")
+        )
+
+    def _apply(self, contribution: _Contribution, sign: int) -> None:
+        is_pistol, won, force_buy, late_loss, site = contribution
+        self.rounds += sign
+        self.wins += sign * won
+        self.pistol_wins += sign * (is_pistol and won)
+        self.force_buys += sign * force_buy
+        self.force_buy_wins += sign * (force_buy and won)
+        self.late_execute_losses += sign * late_loss
+        counts = self.sites.setdefault(site, [0, 0])
+        counts[0] += sign
+        counts[1] += sign * won
+        if counts[0] == 0:
+            del self.sites[site]
+
+    def add_round(self, round_data: Dict[str, Any]) -> None:
+        """Fold in one finished round; a round_num seen before replaces that round"""
+        contribution = self._contribution(round_data)
+        round_num = round_data.get("round_num")
+        if round_num:
+            previous = self._by_round.get(round_num)
+            if previous is not None:
+                self._apply(previous, -1)
+            self._by_round[round_num] = contribution
+        self._apply(contribution, 1)
+        self.economy.add_round(round_data)
+
+    def set_orbs(self, team_orbs: int, enemy_orbs: int) -> None:
+        """Running ultimate-orb totals for both teams"""
+        self.team_orbs = team_orbs
+        self.enemy_orbs = enemy_orbs
+
+    @property
+    def score(self) -> str:
+        return self.final_score if self.final_score is not None else f"{self.wins}-{self.rounds - self.wins}"
+
+    def agenda_items(self) -> list:
+        items = []
+
+        # 1. Pistol Round Performance
+        pistol_wins = self.pistol_wins
+        items.append({
+            "category": "Pistol Rounds",
+            "status": "won_both" if pistol_wins == 2 else "lost_both" if pistol_wins == 0 else "split",
+            "detail": f"Won {pistol_wins}/2 pistol rounds",
+            "notes": "Review pistol round setups and compositions" if pistol_wins < 2 else "Strong pistol performance"
+        })
+
+        # 2. Eco Management
+        if self.force_buys and self.force_buy_wins == 0:
+            items.append({
+                "category": "Eco Management",
+                "status": "concern",
+                "detail": "Unsuccessful force-buy on Round 2 led to bonus round loss (Round 3)",
+                "notes": "Review force-buy vs. save criteria. Consider full save after lost pistol."
+            })
+
+        # 2b. Buy decisions the economy model would have made differently
+        flagged = sorted(self.economy.flags(), key=lambda flag: -flag["gain"])
+        if flagged:
+            calls = ", ".join(
+                f"R{flag['round_num']} {flag['buy_type']} -> {flag['better_buy']} "
+                f"({flag['win_rate']*100:.0f}% -> {flag['better_win_rate']*100:.0f}%)"
+                for flag in flagged[:3]
+            )
+            items.append({
+                "category": "Buy Decisions",
+                "status": "concern",
+                "detail": f"{len(flagged)} round(s) where a different buy raised expected win rate: {calls}",
+                "notes": "Review these buys against both teams' credits. See the economy breakdown for every round."
+            })
+
+        # 3. Mid-Round Execution
+        if self.late_execute_losses >= 4:
+            items.append({
+                "category": "Mid-Round Calls",
+                "status": "critical",
+                "detail": f"{self.late_execute_losses}/25 rounds saw late execute (<20s) resulting in losses",
+                "notes": "Improve decision-making speed. Earlier site commitment or gather intel sooner."
+            })
+
+        # 4. Ultimate Economy
+        if self.team_orbs < self.enemy_orbs * 0.7:
+            items.append({
+                "category": "Ultimate Economy",
+                "status": "concern",
+                "detail": f"Only {self.team_orbs} orbs collected vs {self.enemy_orbs} by enemy",
+                "notes": "Prioritize orb collection. Rotate for orbs during slow rounds. Ultimate advantage is crucial."
+            })
+
+        # 5. Site Success Rates
+        for site, (attempts, wins) in self.sites.items():
+            success_rate = (wins / attempts * 100) if attempts > 0 else 0
+            if success_rate < 30 and attempts >= 3:
+                items.append({
+                    "category": f"Site Control - {site}",
+                    "status": "concern",
+                    "detail": f"Low success rate on {site} site ({success_rate:.0f}% - {wins}/{attempts})",
+                    "notes": f"Review {site} site execution. Consider alternative strategies or improved utility usage."
+                })
+
+        return items
+
+    def review(self) -> Dict[str, Any]:
+        """The macro review agenda for the rounds seen so far (no AI summary)"""
+        return {
+            "match_id": self.match_id,
+            "match_type": self.match_type,
+            "opponent": self.opponent,
+            "map": self.map,
+            "final_score": self.score,
+            "agenda_items": self.agenda_items()
+        }
@@ -0,0 +1,233 @@
+"""
+Multi-map VALORANT series review.
+
+A series is a Bo1/Bo3/Bo5 document whose `maps` are single-map match_data
+documents (map, final_score, rounds, orbs):
+    {"series_id": ..., "match_type": "BO3", "opponent": ..., "maps": [{...}, {...}]}
+
+`analyze_map` computes everything a series needs from one map: its review
+agenda, site attempts, pistol rounds and what followed them, and each
+player's KAST against round outcomes. It is pure and keyed by `map_digest`,
+so callers run the maps concurrently (on the worker pool) and cache the
+results: re-reviewing a series with one more map only analyzes the new one.
+`merge_series` then combines the per-map results into the series review with
+cross-map patterns, which is cheap.
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from valorant_kills import SIDES, with_kill_stats
+from valorant_review import PISTOL_ROUNDS, ValorantReviewAccumulator
+
+SITE_CONCERN_RATE = 35  # % success across the series
+SITE_MIN_ATTEMPTS = 5
+PISTOL_CONVERSION_CONCERN = 50  # % of won pistols followed by a won bonus round
+KAST_IMPACT_CONCERN = 30  # percentage points more rounds lost without KAST
+KAST_MIN_ROUNDS = 4  # rounds without KAST before a player is judged
+
+
+def map_digest(map_data: Dict[str, Any]) -> str:
+    """Content key for a map's cached analysis"""
+    return hashlib.sha256(json.dumps(map_data, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _map_won(final_score: Optional[str], wins: int, losses: int) -> bool:
+    try:
+        ours, theirs = (int(part) for part in str(final_score).split("-", 1))
+    except (TypeError, ValueError):
+        ours, theirs = wins, losses
+    return ours > theirs
+
+
+def analyze_map(map_data: Dict[str, Any]) -> Dict[str, Any]:
+    """One map's review plus the inputs of the series patterns"""
+    accumulator = ValorantReviewAccumulator.from_match(map_data)
+    review = accumulator.review()
+    map_name = map_data.get("map", "Unknown")
+
+    won_by_round: Dict[int, bool] = {}
+    pistols: List[Tuple[int, bool]] = []
+    # player -> [rounds, kast rounds, wins with KAST, rounds without KAST, losses without KAST]
+    players: Dict[str, List[int]] = {}
+    for round_data in map_data.get("rounds", []):
+        round_data = with_kill_stats(round_data)
+        round_num = round_data.get("round_num", 0)
+        won = bool(round_data.get("team_won", False))
+        won_by_round[round_num] = won
+        if round_num in PISTOL_ROUNDS:
+            pistols.append((round_num, won))
+        for side in SIDES:
+            if f"{side}_team_name" not in round_data:
+                continue
+            for player in round_data.get(side) or ():
+                counts = players.setdefault(player.get("name", "Unknown"), [0, 0, 0, 0, 0])
+                counts[0] += 1
+                if player.get("kast", True):
+                    counts[1] += 1
+                    counts[2] += won
+                else:
+                    counts[3] += 1
+                    counts[4] += not won
+
+    return {
+        "map": map_name,
+        "final_score": review["final_score"],
+        "won": _map_won(map_data.get("final_score"), accumulator.wins, accumulator.rounds - accumulator.wins),
+        "agenda_items": review["agenda_items"],
+        "sites": {site: list(counts) for site, counts in accumulator.sites.items()},
+        "pistols": [
+            {"round_num": round_num, "won": won, "converted": won and won_by_round.get(round_num + 1, False)}
+            for round_num, won in pistols
+        ],
+        "players": players
+    }
+
+
+def _rate(part: int, whole: int) -> Optional[float]:
+    return round(part / whole * 100, 1) if whole else None
+
+
+def _site_patterns(maps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    sites: Dict[str, Dict[str, Any]] = {}
+    for result in maps:
+        for site, (attempts, wins) in result["sites"].items():
+            site_stats = sites.setdefault(site, {"attempts": 0, "wins": 0, "by_map": {}})
+            site_stats["attempts"] += attempts
+            site_stats["wins"] += wins
+            by_map = site_stats["by_map"].setdefault(result["map"], {"attempts": 0, "wins": 0})
+            by_map["attempts"] += attempts
+            by_map["wins"] += wins
+    for site_stats in sites.values():
+        site_stats["rate"] = _rate(site_stats["wins"], site_stats["attempts"])
+        for by_map in site_stats["by_map"].values():
+            by_map["rate"] = _rate(by_map["wins"], by_map["attempts"])
+    return sites
+
+
+def _pistol_patterns(maps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    by_map = {}
+    for result in maps:
+        stats = by_map.setdefault(result["map"], {"played": 0, "won": 0, "converted": 0})
+        for pistol in result["pistols"]:
+            stats["played"] += 1
+            stats["won"] += pistol["won"]
+            stats["converted"] += pistol["converted"]
+    played = sum(stats["played"] for stats in by_map.values())
+    won = sum(stats["won"] for stats in by_map.values())
+    converted = sum(stats["converted"] for stats in by_map.values())
+    for stats in by_map.values():
+        stats["conversion_rate"] = _rate(stats["converted"], stats["won"])
+    return {"played": played, "won": won, "converted": converted,
+            "conversion_rate": _rate(converted, won), "by_map": by_map}
+
+
+def _kast_stats(rounds: int, kast_rounds: int, kast_wins: int, no_kast_rounds: int, no_kast_losses: int) -> Dict[str, Any]:
+    loss_with = _rate(kast_rounds - kast_wins, kast_rounds)
+    loss_without = _rate(no_kast_losses, no_kast_rounds)
+    return {
+        "rounds": rounds,
+        "kast": _rate(kast_rounds, rounds),
+        "rounds_without_kast": no_kast_rounds,
+        "loss_rate_with_kast": loss_with,
+        "loss_rate_without_kast": loss_without,
+        # How much more often the team loses when this player dies for nothing
+        "kast_loss_impact": round(loss_without - (loss_with or 0), 1) if loss_without is not None else None
+    }
+
+
+def _player_patterns(maps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    totals: Dict[str, List[int]] = {}
+    by_map: Dict[str, Dict[str, List[int]]] = {}
+    for result in maps:
+        for name, counts in result["players"].items():
+            total = totals.setdefault(name, [0, 0, 0, 0, 0])
+            map_counts = by_map.setdefault(name, {}).setdefault(result["map"], [0, 0, 0, 0, 0])
+            for i, count in enumerate(counts):
+                total[i] += count
+                map_counts[i] += count
+    return {
+        name: {
+            **_kast_stats(*totals[name]),
+            "by_map": {map_name: _kast_stats(*counts) for map_name, counts in by_map[name].items()}
+        }
+        for name in totals
+    }
+
+
+def merge_series(series: Dict[str, Any], maps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The series review from each map's analyze_map result, in map order"""
+    maps_won = sum(1 for result in maps if result["won"])
+    review = {
+        "series_id": series.get("series_id", series.get("match_id", "unknown")),
+        "match_type": series.get("match_type", f"BO{max(1, len(maps))}"),
+        "opponent": series.get("opponent", "Unknown"),
+        "tournament": series.get("tournament", "Unknown"),
+        "series_score": f"{maps_won}-{len(maps) - maps_won}",
+        "maps": [
+            {"map": result["map"], "final_score": result["final_score"], "won": result["won"],
+             "agenda_items": result["agenda_items"]}
+            for result in maps
+        ],
+        "patterns": {
+            "site_success": _site_patterns(maps),
+            "pistol_conversion": _pistol_patterns(maps),
+            "player_kast": _player_patterns(maps)
+        },
+        "agenda_items": []
+    }
+    items = review["agenda_items"]
+    patterns = review["patterns"]
+
+    # 1. Issues flagged on more than one map
+    flagged_on: Dict[str, List[str]] = {}
+    for result in maps:
+        for item in result["agenda_items"]:
+            if item.get("status") not in ("won_both", "split"):
+                flagged_on.setdefault(item["category"], []).append(result["map"])
+    for category, map_names in flagged_on.items():
+        if len(map_names) >= 2:
+            items.append({
+                "category": f"Recurring - {category}",
+                "status": "concern",
+                "detail": f"Flagged on {len(map_names)}/{len(maps)} maps: {', '.join(map_names)}",
+                "notes": f"A pattern rather than a one-map problem. Review {category} across the series."
+            })
+
+    # 2. Sites that fail across maps
+    for site, stats in patterns["site_success"].items():
+        if len(stats["by_map"]) >= 2 and stats["attempts"] >= SITE_MIN_ATTEMPTS and stats["rate"] < SITE_CONCERN_RATE:
+            per_map = ", ".join(f"{map_name} {by_map['wins']}/{by_map['attempts']}"
+                                for map_name, by_map in stats["by_map"].items())
+            items.append({
+                "category": f"Site Control - {site} (series)",
+                "status": "concern",
+                "detail": f"{site} site won {stats['wins']}/{stats['attempts']} ({stats['rate']:.0f}%) across maps: {per_map}",
+                "notes": f"{site} executes fail regardless of map. Review the default approach and utility."
+            })
+
+    # 3. Pistol conversion
+    pistols = patterns["pistol_conversion"]
+    if pistols["won"] >= 2 and pistols["conversion_rate"] < PISTOL_CONVERSION_CONCERN:
+        items.append({
+            "category": "Pistol Conversion",
+            "status": "concern",
+            "detail": f"Converted {pistols['converted']}/{pistols['won']} won pistols into a bonus-round win",
+            "notes": "Won pistols aren't paying off. Review bonus-round buys and setups."
+        })
+
+    # 4. Players whose deaths without KAST cost rounds on several maps
+    for name, stats in patterns["player_kast"].items():
+        impacted = [map_name for map_name, by_map in stats["by_map"].items()
+                    if (by_map["kast_loss_impact"] or 0) >= KAST_IMPACT_CONCERN]
+        if (len(impacted) >= 2 and stats["rounds_without_kast"] >= KAST_MIN_ROUNDS
+                and (stats["kast_loss_impact"] or 0) >= KAST_IMPACT_CONCERN):
+            items.append({
+                "category": f"KAST Impact - {name}",
+                "status": "concern",
+                "detail": f"Rounds lost: {stats['loss_rate_without_kast']:.0f}% without {name}'s KAST vs "
+                          f"{stats['loss_rate_with_kast'] or 0:.0f}% with it, on {', '.join(impacted)}",
+                "notes": f"{name} dying without a kill, assist or trade costs rounds on more than one map. Review positioning and trade setups."
+            })
+
+    return review
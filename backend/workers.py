@@ -0,0 +1,206 @@
+"""
+Worker pool for CPU-bound analyzer and ingestion work.
+
+Handlers `await workers.run(fn, *args)` instead of calling pure-Python
+analysis inline, so a long review or a large series parse no longer stalls
+every other request on the event loop.
+
+Modes (WORKER_MODE):
+- process (default): a pool of WORKER_POOL_SIZE spawned processes. The call
+  and its arguments are pickled on the event loop at submit time, so the
+  worker sees a consistent snapshot even if caches change before it runs.
+  `fn` must be importable from a module without side effects (ingest,
+  ai_analyzer, rules) and its arguments picklable.
+- thread: a thread pool of the same size. Used automatically when worker
+  processes cannot be started (e.g. no semaphore support) or the pool breaks.
+- inline: call directly on the loop; useful for debugging and profiling.
+
+Results can come back JSON-encoded (`encode_depth`, see `encode_parts`):
+the worker serializes, so the loop neither unpickles result objects nor runs
+FastAPI's encoder over them, and handlers return the bytes as they are.
+
+`run_io` always uses threads. It is for calls that mostly wait on the network
+(LLM completions), which gain nothing from another process and whose metrics
+and spans must be recorded in this one.
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Union
+
+from metrics import WORKER_TASKS, WORKER_TASK_DURATION, WORKER_PAYLOAD_BYTES, WORKER_TASKS_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+WORKER_MODE = os.getenv("WORKER_MODE", "process").lower()
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", "0")) or min(4, os.cpu_count() or 1)
+
+
+def encode_json(value: Any) -> bytes:
+    """JSON body bytes, encoded the way FastAPI's JSONResponse encodes plain data"""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def encode_parts(value: Any, depth: int) -> Union[bytes, Dict[str, Any]]:
+    """
+    JSON-encode `value`, keeping dicts up to `depth` levels as {key: parts}
+    so callers can serve or recombine members without decoding (join_parts)
+    """
+    if depth > 0 and isinstance(value, dict):
+        return {key: encode_parts(item, depth - 1) for key, item in value.items()}
+    return encode_json(value)
+
+
+def join_parts(parts: Union[bytes, Dict[str, Any]]) -> bytes:
+    """Inverse of encode_parts: one JSON document, members in their original order"""
+    if isinstance(parts, bytes):
+        return parts
+    return b"{" + b",".join(encode_json(key) + b":" + join_parts(item) for key, item in parts.items()) + b"}"
+
+
+def _call_encoded(fn: Callable, depth: int, *args) -> Union[bytes, Dict[str, Any]]:
+    return encode_parts(fn(*args), depth)
+
+
+def _call_pickled(payload: bytes) -> Any:
+    # Runs in the worker process: one pickle for the call keeps the transfer compact
+    fn, args = pickle.loads(payload)
+    return fn(*args)
+
+
+def _warm() -> int:
+    # Import the modules tasks unpickle into, so the first real task doesn't pay for it
+    import ai_analyzer  # noqa: F401
+    import ingest  # noqa: F401
+    return os.getpid()
+
+
+def _task_name(fn: Callable) -> str:
+    return getattr(fn, "__qualname__", getattr(fn, "__name__", repr(fn)))
+
+
+class WorkerPool:
+    """Lazily started process pool with a thread-pool fallback"""
+
+    def __init__(self, mode: str = WORKER_MODE, size: int = WORKER_POOL_SIZE):
+        if mode not in ("process", "thread", "inline"):
+            raise ValueError(f"WORKER_MODE must be process, thread or inline, got {mode!r}")
+        self.requested_mode = mode
+        self.mode = mode
+        self.size = max(1, size)
+        self.fallback_reason: Optional[str] = None
+        self._lock = threading.Lock()
+        self._processes: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._threads: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def _thread_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._threads is None:
+                self._threads = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.size, thread_name_prefix="analysis-worker"
+                )
+            return self._threads
+
+    def _process_pool(self) -> Optional[concurrent.futures.ProcessPoolExecutor]:
+        with self._lock:
+            if self.mode == "process" and self._processes is None:
+                try:
+                    # spawn, not fork: the API process runs threads (exporter, profiler,
+                    # executor) that must not be duplicated mid-operation
+                    self._processes = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.size, mp_context=multiprocessing.get_context("spawn")
+                    )
+                except (OSError, NotImplementedError, ImportError) as e:
+                    self._fall_back(f"process pool unavailable: {e}")
+            return self._processes
+
+    def _fall_back(self, reason: str) -> None:
+        logger.warning("Worker pool falling back to threads: %s", reason)
+        self.mode = "thread"
+        self.fallback_reason = reason
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+
+    def start(self) -> None:
+        """Start worker processes in the background so the first request doesn't wait for spawn"""
+        pool = self._process_pool()
+        if pool is not None:
+            for _ in range(self.size):
+                pool.submit(_warm)
+
+    async def run(self, fn: Callable, *args, encode_depth: Optional[int] = None) -> Any:
+        """Run fn(*args) on the pool; with `encode_depth`, returns encode_parts(result, encode_depth)"""
+        name = _task_name(fn)
+        if encode_depth is not None:
+            fn = functools.partial(_call_encoded, fn, encode_depth)
+        WORKER_TASKS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        mode = self.mode
+        try:
+            if mode == "inline":
+                return fn(*args)
+            loop = asyncio.get_running_loop()
+            pool = self._process_pool()
+            if pool is not None:
+                payload = pickle.dumps((fn, args), protocol=pickle.HIGHEST_PROTOCOL)
+                WORKER_PAYLOAD_BYTES.observe(len(payload), task=name)
+                try:
+                    return await loop.run_in_executor(pool, _call_pickled, payload)
+                except BrokenProcessPool as e:
+                    with self._lock:
+                        if self._processes is pool:
+                            self._fall_back(f"process pool broken: {e}")
+            mode = "thread"
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self._thread_pool(), functools.partial(context.run, fn, *args))
+        finally:
+            WORKER_TASKS_IN_FLIGHT.dec()
+            WORKER_TASKS.inc(pool=mode, task=name)
+            WORKER_TASK_DURATION.observe(time.perf_counter() - started, pool=mode)
+
+    async def run_io(self, fn: Callable, *args, encode_depth: Optional[int] = None) -> Any:
+        """Run a network-bound fn(*args) on a thread, keeping its metrics and spans in this process"""
+        if encode_depth is not None:
+            fn = functools.partial(_call_encoded, fn, encode_depth)
+        # The loop's default executor, so slow completions never queue behind CPU tasks
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(context.run, fn, *args))
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "requested_mode": self.requested_mode,
+            "mode": self.mode,
+            "size": self.size,
+            "fallback_reason": self.fallback_reason
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._processes is not None:
+                self._processes.shutdown(wait=False, cancel_futures=True)
+                self._processes = None
+            if self._threads is not None:
+                self._threads.shutdown(wait=False, cancel_futures=True)
+                self._threads = None
+
+
+pool = WorkerPool()
+
+
+async def run(fn: Callable, *args, encode_depth: Optional[int] = None) -> Any:
+    return await pool.run(fn, *args, encode_depth=encode_depth)
+
+
+async def run_io(fn: Callable, *args, encode_depth: Optional[int] = None) -> Any:
+    return await pool.run_io(fn, *args, encode_depth=encode_depth)
@@ -3,12 +3,35 @@ import { motion } from 'framer-motion';
 import { AreaChart, Area, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, RadarChart, PolarGrid, PolarAngleAxis, PolarRadiusAxis, Radar } from 'recharts';
 import './Dashboard.css';
 
+// Apply a JSON merge patch (RFC 7396) pushed by the server: null removes a key
+const applyMergePatch = (target, patch) => {
+  if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) return patch;
+  const result = target && typeof target === 'object' && !Array.isArray(target) ? { ...target } : {};
+  Object.entries(patch).forEach(([key, value]) => {
+    if (value === null) delete result[key];
+    else result[key] = applyMergePatch(result[key], value);
+  });
+  return result;
+};
+
 const Dashboard = ({ activeGame }) => {
   const [dashboardData, setDashboardData] = useState(null);
   const [loading, setLoading] = useState(false);
 
   useEffect(() => {
-    fetchDashboardData();
+    // Live updates: a snapshot on subscribe, then only deltas after each ingest.
+    // Falls back to a one-off fetch if the socket can't connect.
+    const socket = new WebSocket(`ws://localhost:8000/ws?topics=game:${activeGame}`);
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'snapshot' && message.data) {
+        setDashboardData(message.data);
+      } else if (message.type === 'delta') {
+        setDashboardData((current) => applyMergePatch(current, message.patch));
+      }
+    };
+    socket.onerror = () => fetchDashboardData();
+    return () => socket.close();
   }, [activeGame]);
 
   const fetchDashboardData = async () => {